@@ -0,0 +1,46 @@
+"""media blobs
+
+Revision ID: 4b0cf859e58b
+Revises: aee0894e2047
+Create Date: 2026-10-16 08:50:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b0cf859e58b'
+down_revision: Union[str, Sequence[str], None] = 'aee0894e2047'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('media_blobs',
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('content_type', sa.String(length=100), nullable=False),
+    sa.Column('size_bytes', sa.BigInteger(), nullable=False),
+    sa.Column('has_thumbnail', sa.Boolean(), nullable=False),
+    sa.Column('width', sa.Integer(), nullable=True),
+    sa.Column('height', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.PrimaryKeyConstraint('sha256')
+    )
+    # Batch mode so the foreign key can be added on SQLite too
+    with op.batch_alter_table('bulk_composer_content') as batch_op:
+        batch_op.add_column(sa.Column('media_sha256', sa.String(length=64), nullable=True))
+        batch_op.create_index(batch_op.f('ix_bulk_composer_content_media_sha256'), ['media_sha256'], unique=False)
+        batch_op.create_foreign_key('fk_bulk_composer_content_media_sha256', 'media_blobs', ['media_sha256'], ['sha256'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('bulk_composer_content') as batch_op:
+        batch_op.drop_constraint('fk_bulk_composer_content_media_sha256', type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_bulk_composer_content_media_sha256'))
+        batch_op.drop_column('media_sha256')
+    op.drop_table('media_blobs')
@@ -0,0 +1,32 @@
+"""auto reply log platform
+
+Revision ID: 612f9efa443e
+Revises: d8c1fdbd4b4a
+Create Date: 2026-10-16 08:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '612f9efa443e'
+down_revision: Union[str, Sequence[str], None] = 'd8c1fdbd4b4a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Every row logged so far came from the Instagram auto-reply
+    op.add_column('instagram_auto_reply_log', sa.Column('platform', sa.String(length=20), server_default='instagram', nullable=False))
+    op.create_index(op.f('ix_instagram_auto_reply_log_platform'), 'instagram_auto_reply_log', ['platform'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_instagram_auto_reply_log_platform'), table_name='instagram_auto_reply_log')
+    with op.batch_alter_table('instagram_auto_reply_log') as batch_op:
+        batch_op.drop_column('platform')
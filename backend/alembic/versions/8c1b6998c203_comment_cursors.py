@@ -0,0 +1,49 @@
+"""comment cursors
+
+Revision ID: 8c1b6998c203
+Revises: 612f9efa443e
+Create Date: 2026-10-16 08:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c1b6998c203'
+down_revision: Union[str, Sequence[str], None] = '612f9efa443e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('comment_cursors',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('social_account_id', sa.Integer(), nullable=False),
+    sa.Column('platform', sa.String(length=20), nullable=False),
+    sa.Column('post_id', sa.String(), nullable=False),
+    sa.Column('post_created_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('last_comment_id', sa.String(), nullable=True),
+    sa.Column('last_comment_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('last_checked_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('next_check_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['social_account_id'], ['social_accounts.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('social_account_id', 'post_id', name='uq_comment_cursor_account_post')
+    )
+    op.create_index(op.f('ix_comment_cursors_id'), 'comment_cursors', ['id'], unique=False)
+    op.create_index(op.f('ix_comment_cursors_next_check_at'), 'comment_cursors', ['next_check_at'], unique=False)
+    op.create_index(op.f('ix_comment_cursors_social_account_id'), 'comment_cursors', ['social_account_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_comment_cursors_social_account_id'), table_name='comment_cursors')
+    op.drop_index(op.f('ix_comment_cursors_next_check_at'), table_name='comment_cursors')
+    op.drop_index(op.f('ix_comment_cursors_id'), table_name='comment_cursors')
+    op.drop_table('comment_cursors')
@@ -0,0 +1,40 @@
+"""cloudinary uploads
+
+Revision ID: 958f9220fe1f
+Revises: 4b0cf859e58b
+Create Date: 2026-10-16 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '958f9220fe1f'
+down_revision: Union[str, Sequence[str], None] = '4b0cf859e58b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('cloudinary_uploads',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('content_sha256', sa.String(length=64), nullable=False),
+    sa.Column('kind', sa.String(length=20), nullable=False),
+    sa.Column('secure_url', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('content_sha256', 'kind', name='uq_cloudinary_upload_content_kind')
+    )
+    op.create_index(op.f('ix_cloudinary_uploads_content_sha256'), 'cloudinary_uploads', ['content_sha256'], unique=False)
+    op.create_index(op.f('ix_cloudinary_uploads_id'), 'cloudinary_uploads', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_cloudinary_uploads_id'), table_name='cloudinary_uploads')
+    op.drop_index(op.f('ix_cloudinary_uploads_content_sha256'), table_name='cloudinary_uploads')
+    op.drop_table('cloudinary_uploads')
@@ -0,0 +1,53 @@
+"""webhook events
+
+Revision ID: aee0894e2047
+Revises: 8c1b6998c203
+Create Date: 2026-10-16 08:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'aee0894e2047'
+down_revision: Union[str, Sequence[str], None] = '8c1b6998c203'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('webhook_events',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('source', sa.String(length=20), nullable=False),
+    sa.Column('event_type', sa.String(length=20), nullable=False),
+    sa.Column('dedup_key', sa.String(length=255), nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('next_attempt_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('processed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('lease_owner', sa.String(length=255), nullable=True),
+    sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_webhook_events_dedup_key'), 'webhook_events', ['dedup_key'], unique=True)
+    op.create_index(op.f('ix_webhook_events_id'), 'webhook_events', ['id'], unique=False)
+    op.create_index(op.f('ix_webhook_events_lease_expires_at'), 'webhook_events', ['lease_expires_at'], unique=False)
+    op.create_index(op.f('ix_webhook_events_next_attempt_at'), 'webhook_events', ['next_attempt_at'], unique=False)
+    op.create_index(op.f('ix_webhook_events_status'), 'webhook_events', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_webhook_events_status'), table_name='webhook_events')
+    op.drop_index(op.f('ix_webhook_events_next_attempt_at'), table_name='webhook_events')
+    op.drop_index(op.f('ix_webhook_events_lease_expires_at'), table_name='webhook_events')
+    op.drop_index(op.f('ix_webhook_events_id'), table_name='webhook_events')
+    op.drop_index(op.f('ix_webhook_events_dedup_key'), table_name='webhook_events')
+    op.drop_table('webhook_events')
@@ -0,0 +1,44 @@
+"""generation cache
+
+Revision ID: cfe65e74ee45
+Revises: 958f9220fe1f
+Create Date: 2026-10-16 09:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'cfe65e74ee45'
+down_revision: Union[str, Sequence[str], None] = '958f9220fe1f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('generation_cache',
+    sa.Column('cache_key', sa.String(length=64), nullable=False),
+    sa.Column('engine', sa.String(length=100), nullable=False),
+    sa.Column('prompt', sa.Text(), nullable=False),
+    sa.Column('media_sha256', sa.String(length=64), nullable=False),
+    sa.Column('seed', sa.BigInteger(), nullable=True),
+    sa.Column('finish_reason', sa.String(length=50), nullable=True),
+    sa.Column('hit_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('last_used_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['media_sha256'], ['media_blobs.sha256'], ),
+    sa.PrimaryKeyConstraint('cache_key')
+    )
+    op.create_index(op.f('ix_generation_cache_created_at'), 'generation_cache', ['created_at'], unique=False)
+    op.create_index(op.f('ix_generation_cache_last_used_at'), 'generation_cache', ['last_used_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_generation_cache_last_used_at'), table_name='generation_cache')
+    op.drop_index(op.f('ix_generation_cache_created_at'), table_name='generation_cache')
+    op.drop_table('generation_cache')
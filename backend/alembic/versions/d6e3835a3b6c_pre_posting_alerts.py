@@ -0,0 +1,54 @@
+"""pre posting alerts
+
+Revision ID: d6e3835a3b6c
+Revises: cfe65e74ee45
+Create Date: 2026-10-16 09:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd6e3835a3b6c'
+down_revision: Union[str, Sequence[str], None] = 'cfe65e74ee45'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('pre_posting_alerts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('post_kind', sa.String(length=20), nullable=False),
+    sa.Column('post_id', sa.Integer(), nullable=False),
+    sa.Column('due_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('lease_owner', sa.String(length=255), nullable=True),
+    sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('post_kind', 'post_id', name='uq_pre_posting_alert_post')
+    )
+    op.create_index(op.f('ix_pre_posting_alerts_due_at'), 'pre_posting_alerts', ['due_at'], unique=False)
+    op.create_index(op.f('ix_pre_posting_alerts_id'), 'pre_posting_alerts', ['id'], unique=False)
+    op.create_index(op.f('ix_pre_posting_alerts_lease_expires_at'), 'pre_posting_alerts', ['lease_expires_at'], unique=False)
+    op.create_index(op.f('ix_pre_posting_alerts_status'), 'pre_posting_alerts', ['status'], unique=False)
+    op.create_index(op.f('ix_pre_posting_alerts_user_id'), 'pre_posting_alerts', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_pre_posting_alerts_user_id'), table_name='pre_posting_alerts')
+    op.drop_index(op.f('ix_pre_posting_alerts_status'), table_name='pre_posting_alerts')
+    op.drop_index(op.f('ix_pre_posting_alerts_lease_expires_at'), table_name='pre_posting_alerts')
+    op.drop_index(op.f('ix_pre_posting_alerts_id'), table_name='pre_posting_alerts')
+    op.drop_index(op.f('ix_pre_posting_alerts_due_at'), table_name='pre_posting_alerts')
+    op.drop_table('pre_posting_alerts')
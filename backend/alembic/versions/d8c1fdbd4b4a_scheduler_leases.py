@@ -0,0 +1,43 @@
+"""scheduler leases
+
+Revision ID: d8c1fdbd4b4a
+Revises: 284c357a3e64
+Create Date: 2026-10-16 08:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8c1fdbd4b4a'
+down_revision: Union[str, Sequence[str], None] = '284c357a3e64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('scheduler_leases',
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('owner', sa.String(length=255), nullable=False),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+    for table_name in ['bulk_composer_content', 'scheduled_posts']:
+        op.add_column(table_name, sa.Column('lease_owner', sa.String(length=255), nullable=True))
+        op.add_column(table_name, sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True))
+        op.create_index(op.f(f'ix_{table_name}_lease_expires_at'), table_name, ['lease_expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table_name in ['scheduled_posts', 'bulk_composer_content']:
+        op.drop_index(op.f(f'ix_{table_name}_lease_expires_at'), table_name=table_name)
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.drop_column('lease_expires_at')
+            batch_op.drop_column('lease_owner')
+    op.drop_table('scheduler_leases')
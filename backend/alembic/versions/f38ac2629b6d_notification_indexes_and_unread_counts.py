@@ -0,0 +1,55 @@
+"""notification indexes and unread counts
+
+Revision ID: f38ac2629b6d
+Revises: d6e3835a3b6c
+Create Date: 2026-10-16 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f38ac2629b6d'
+down_revision: Union[str, Sequence[str], None] = 'd6e3835a3b6c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built concurrently so large notification tables stay writable during the migration
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_notifications_user_created', 'notifications', ['user_id', 'created_at', 'id'],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        op.create_index(
+            'ix_notifications_user_unread', 'notifications', ['user_id', 'is_read'],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+
+    op.create_table(
+        'notification_unread_counts',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('unread_count', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+    op.execute(
+        """
+        INSERT INTO notification_unread_counts (user_id, unread_count)
+        SELECT user_id, count(*) FROM notifications WHERE is_read = false GROUP BY user_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('notification_unread_counts')
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_notifications_user_unread', table_name='notifications', postgresql_concurrently=True)
+        op.drop_index('ix_notifications_user_created', table_name='notifications', postgresql_concurrently=True)
@@ -164,11 +164,13 @@ async def get_ai_service_status(current_user: User = Depends(get_current_user)):
         
         # Check Stability AI service
         try:
-            from app.services.fb_stability_service import stability_service
+            from app.services.stability_service import stability_service
             stability_available = stability_service.is_configured()
         except ImportError:
             stability_available = False
         
+        from app.services.generation_cache import generation_cache
+
         return {
             "groq_service": {
                 "available": groq_available,
@@ -179,7 +181,8 @@ async def get_ai_service_status(current_user: User = Depends(get_current_user)):
                 "available": stability_available,
                 "status": "healthy" if stability_available else "unavailable",
                 "model": "stable-diffusion-v1-6",
-                "features": ["text-to-image", "facebook-optimized-dimensions"]
+                "features": ["text-to-image", "facebook-optimized-dimensions"],
+                "generation_cache": generation_cache.stats()
             },
             "supported_platforms": ["facebook", "instagram", "twitter"],
             "supported_content_types": ["post", "comment", "reply", "story"],
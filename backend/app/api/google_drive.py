@@ -1,6 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Request as FastAPIRequest
 from fastapi.responses import StreamingResponse, HTMLResponse
 from typing import Optional, List
+from sqlalchemy.orm import Session
+import asyncio
+import httpx
 import io
 import base64
 import logging
@@ -17,6 +20,8 @@ from ..database import get_db
 from ..models.user import User
 from ..api.auth import get_current_user
 from ..config import get_settings
+from ..services.http_client import http_client_service
+from ..services.media_store import media_store
 
 logger = logging.getLogger(__name__)
 
@@ -31,8 +36,15 @@ SCOPES = [
 # Get settings
 settings = get_settings()
 
+DRIVE_FILES_URL = "https://www.googleapis.com/drive/v3/files/{file_id}"
+DRIVE_CHUNK_SIZE = 256 * 1024
+
 def get_google_drive_service():
     """Get authenticated Google Drive service."""
+    return build('drive', 'v3', credentials=get_google_drive_credentials())
+
+def get_google_drive_credentials() -> Credentials:
+    """Load (and refresh if needed) Google Drive credentials, running the OAuth flow when there are none."""
     creds = None
     
     # First, try to use environment variables for tokens
@@ -106,7 +118,7 @@ def get_google_drive_service():
             except Exception as e:
                 logger.error(f"Failed to save credentials: {e}")
     
-    return build('drive', 'v3', credentials=creds)
+    return creds
 
 @router.get("/auth")
 async def get_auth_token(current_user: User = Depends(get_current_user)):
@@ -274,7 +286,7 @@ async def download_file(
     file_id: str,
     current_user: User = Depends(get_current_user)
 ):
-    """Download a file from Google Drive."""
+    """Download a file from Google Drive as base64 JSON (small files; use /stream or /import for large media)."""
     try:
         service = get_google_drive_service()
         
@@ -310,6 +322,96 @@ async def download_file(
             detail=f"Failed to download file from Google Drive: {str(e)}"
         )
 
+async def _open_drive_media(file_id: str, range_header: Optional[str] = None) -> httpx.Response:
+    """Start a streamed ``alt=media`` download on the shared HTTP client (caller must close it)."""
+    creds = await asyncio.to_thread(get_google_drive_credentials)
+    client = http_client_service.client
+    for attempt in range(2):
+        headers = {"Authorization": f"Bearer {creds.token}"}
+        if range_header:
+            headers["Range"] = range_header
+        upstream = await client.send(
+            client.build_request("GET", DRIVE_FILES_URL.format(file_id=file_id), params={"alt": "media"}, headers=headers),
+            stream=True
+        )
+        if upstream.status_code == 401 and attempt == 0 and creds.refresh_token:
+            # Stale access token (e.g. from the environment); refresh once and retry
+            await upstream.aclose()
+            await asyncio.to_thread(creds.refresh, Request())
+            continue
+        break
+    if upstream.status_code >= 400:
+        detail = (await upstream.aread()).decode(errors="replace")[:500]
+        await upstream.aclose()
+        status_code = upstream.status_code if upstream.status_code in (404, 416) else 502
+        raise HTTPException(status_code=status_code, detail=f"Google Drive download failed: {detail}")
+    return upstream
+
+async def _iter_upstream(upstream: httpx.Response):
+    try:
+        async for chunk in upstream.aiter_bytes(DRIVE_CHUNK_SIZE):
+            yield chunk
+    finally:
+        await upstream.aclose()
+
+@router.get("/stream/{file_id}")
+async def stream_file(
+    file_id: str,
+    request: FastAPIRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """Stream a file from Google Drive without buffering it (supports Range requests)."""
+    upstream = await _open_drive_media(file_id, request.headers.get("range"))
+    headers = {
+        name: upstream.headers[name]
+        for name in ("content-length", "content-range", "accept-ranges", "etag", "last-modified")
+        if name in upstream.headers
+    }
+    headers.setdefault("accept-ranges", "bytes")
+    return StreamingResponse(
+        _iter_upstream(upstream),
+        status_code=upstream.status_code,
+        media_type=upstream.headers.get("content-type", "application/octet-stream"),
+        headers=headers
+    )
+
+@router.post("/import/{file_id}")
+async def import_file(
+    file_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Copy a Google Drive file into the media store server-side, streaming it to disk."""
+    try:
+        service = await asyncio.to_thread(get_google_drive_service)
+        file_metadata = await asyncio.to_thread(
+            service.files().get(fileId=file_id, fields="id, name, mimeType, size").execute
+        )
+        content_type = file_metadata.get("mimeType", "application/octet-stream")
+        upstream = await _open_drive_media(file_id)
+        try:
+            blob = await media_store.import_stream(db, _iter_upstream(upstream), content_type)
+        finally:
+            await upstream.aclose()
+        logger.info(f"📥 Imported Google Drive file {file_id} ({blob.size_bytes} bytes) as {blob.sha256}")
+        return {
+            "success": True,
+            "sha256": blob.sha256,
+            "fileName": file_metadata.get("name", "unknown"),
+            "mimeType": blob.content_type,
+            "size": blob.size_bytes,
+            "media_url": media_store.url_for(blob.sha256),
+            "thumbnail_url": media_store.thumbnail_url_for(blob)
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error importing Google Drive file {file_id}: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to import file from Google Drive: {str(e)}"
+        )
+
 @router.post("/upload")
 async def upload_file(
     file: UploadFile = File(...),
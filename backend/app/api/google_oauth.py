@@ -1,7 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
-import httpx
 import secrets
 import string
 import logging
@@ -13,6 +12,7 @@ from ..models.social_account import SocialAccount
 from ..schemas.social_auth import GoogleOAuthRequest, GoogleOAuthResponse, GoogleUserInfo
 from ..schemas.auth import UserResponse
 from ..config import get_settings
+from ..services.http_client import http_client_service
 from ..api.auth import create_access_token, get_password_hash, get_current_user
 
 router = APIRouter(prefix="/auth/google", tags=["Google OAuth"])
@@ -53,7 +53,7 @@ def generate_unique_username(base_username: str, db: Session) -> str:
 
 async def get_google_user_info(access_token: str) -> GoogleUserInfo:
     """Get user information from Google using the access token."""
-    async with httpx.AsyncClient() as client:
+    async with http_client_service.session() as client:
         response = await client.get(
             GOOGLE_USERINFO_URL,
             headers={"Authorization": f"Bearer {access_token}"}
@@ -85,7 +85,7 @@ async def exchange_code_for_token(code: str, redirect_uri: str) -> dict:
         "redirect_uri": redirect_uri,
     }
     
-    async with httpx.AsyncClient() as client:
+    async with http_client_service.session() as client:
         response = await client.post(GOOGLE_TOKEN_URL, data=token_data)
         
         if response.status_code != 200:
@@ -0,0 +1,94 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy.orm import Session
+from pathlib import Path
+from typing import Optional, Tuple
+import logging
+
+from app.database import get_db
+from app.services.media_store import media_store
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+CHUNK_SIZE = 64 * 1024
+
+
+def parse_range(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single ``bytes=`` range into inclusive (start, end). None means the whole file."""
+    if not range_header or not range_header.startswith("bytes="):
+        return None
+    spec = range_header[len("bytes="):].split(",")[0].strip()
+    start_str, _, end_str = spec.partition("-")
+    try:
+        if start_str == "":
+            # Suffix range: the last N bytes
+            length = int(end_str)
+            if length <= 0:
+                raise ValueError
+            start, end = max(size - length, 0), size - 1
+        else:
+            start = int(start_str)
+            end = int(end_str) if end_str else size - 1
+    except ValueError:
+        raise HTTPException(status_code=416, detail="Invalid range", headers={"Content-Range": f"bytes */{size}"})
+    if start >= size or start > end:
+        raise HTTPException(status_code=416, detail="Range not satisfiable", headers={"Content-Range": f"bytes */{size}"})
+    return start, min(end, size - 1)
+
+
+def iter_file(path: Path, start: int, length: int):
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def stream_file(request: Request, path: Path, content_type: str, etag: str):
+    """Stream a file with HTTP Range and ETag support."""
+    if not path.exists():
+        raise HTTPException(status_code=404, detail="Media not found")
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": f'"{etag}"',
+        # Content-addressed: the bytes behind a URL never change
+        "Cache-Control": "public, max-age=31536000, immutable",
+    }
+    if request.headers.get("if-none-match") == f'"{etag}"':
+        return Response(status_code=304, headers=headers)
+
+    size = path.stat().st_size
+    byte_range = parse_range(request.headers.get("range"), size)
+    if byte_range is None:
+        start, end, status_code = 0, size - 1, 200
+    else:
+        start, end = byte_range
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    length = end - start + 1 if size else 0
+    headers["Content-Length"] = str(length)
+    return StreamingResponse(iter_file(path, start, length), status_code=status_code, media_type=content_type, headers=headers)
+
+
+@router.get("/media/{sha256}")
+async def get_media(sha256: str, request: Request, db: Session = Depends(get_db)):
+    """Stream a media blob by its SHA-256 (supports Range requests)."""
+    blob = media_store.get(db, sha256)
+    if not blob:
+        raise HTTPException(status_code=404, detail="Media not found")
+    return stream_file(request, media_store.path_for(blob.sha256), blob.content_type, blob.sha256)
+
+
+@router.get("/media/{sha256}/thumbnail")
+async def get_media_thumbnail(sha256: str, request: Request, db: Session = Depends(get_db)):
+    """Serve the small JPEG thumbnail of an image blob."""
+    blob = media_store.get(db, sha256)
+    if not blob or not blob.has_thumbnail:
+        raise HTTPException(status_code=404, detail="Thumbnail not found")
+    return stream_file(request, media_store.thumbnail_path_for(blob.sha256), "image/jpeg", f"{blob.sha256}-thumb")
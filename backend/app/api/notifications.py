@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect
 from sqlalchemy.orm import Session
 from typing import List, Optional
 import json
@@ -27,6 +27,12 @@ class NotificationResponse(BaseModel):
     error_message: Optional[str]
     post_id: Optional[str]
 
+class NotificationPage(BaseModel):
+    success: bool = True
+    data: List[NotificationResponse]
+    next_cursor: Optional[str] = None
+    unread_count: int
+
 class NotificationPreferencesResponse(BaseModel):
     browser_notifications_enabled: bool
     pre_posting_enabled: bool
@@ -39,42 +45,65 @@ class NotificationPreferencesUpdate(BaseModel):
     success_enabled: Optional[bool] = None
     failure_enabled: Optional[bool] = None
 
-@router.get("/notifications", response_model=List[NotificationResponse])
+@router.get("/notifications", response_model=NotificationPage)
 async def get_notifications(
-    limit: int = 50,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
     offset: int = 0,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get user notifications"""
+    """Get user notifications, newest first. Pass ``next_cursor`` back as ``cursor`` for the next page."""
     try:
         notifications = await notification_service.get_user_notifications(
             db=db,
             user_id=current_user.id,
             limit=limit,
-            offset=offset
+            offset=offset,
+            cursor=cursor
         )
         
-        return [
-            NotificationResponse(
-                id=str(notification.id),
-                type=notification.type.value,
-                platform=notification.platform.value,
-                strategy_name=notification.strategy_name,
-                message=notification.message,
-                is_read=notification.is_read,
-                created_at=notification.created_at.isoformat(),
-                scheduled_time=notification.scheduled_time.isoformat() if notification.scheduled_time else None,
-                error_message=notification.error_message,
-                post_id=str(notification.post_id) if notification.post_id else None
-            )
-            for notification in notifications
-        ]
+        return NotificationPage(
+            data=[
+                NotificationResponse(
+                    id=str(notification.id),
+                    type=notification.type.value,
+                    platform=notification.platform.value,
+                    strategy_name=notification.strategy_name,
+                    message=notification.message,
+                    is_read=notification.is_read,
+                    created_at=notification.created_at.isoformat(),
+                    scheduled_time=notification.scheduled_time.isoformat() if notification.scheduled_time else None,
+                    error_message=notification.error_message,
+                    post_id=str(notification.post_id) if notification.post_id else None
+                )
+                for notification in notifications
+            ],
+            next_cursor=notification_service.encode_cursor(notifications[-1]) if len(notifications) == limit else None,
+            unread_count=await notification_service.get_unread_count(db, current_user.id)
+        )
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting notifications for user {current_user.id}: {e}")
         raise HTTPException(status_code=500, detail="Failed to get notifications")
 
+@router.get("/notifications/unread-count")
+async def get_unread_count(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Unread notification count for the bell badge"""
+    try:
+        return {
+            "success": True,
+            "unread_count": await notification_service.get_unread_count(db, current_user.id)
+        }
+    except Exception as e:
+        logger.error(f"Error getting unread count for user {current_user.id}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to get unread count")
+
 @router.post("/notifications/{notification_id}/mark-read")
 async def mark_notification_read(
     notification_id: str,
@@ -214,7 +243,7 @@ async def websocket_notifications(
             return
         
         await websocket.accept()
-        await notification_service.add_websocket_connection(user.id, websocket)
+        connection = await notification_service.add_websocket_connection(user.id, websocket)
         
         logger.info(f"WebSocket connected for user {user.id}")
         
@@ -230,7 +259,7 @@ async def websocket_notifications(
         except Exception as e:
             logger.error(f"WebSocket error for user {user.id}: {e}")
         finally:
-            await notification_service.remove_websocket_connection(user.id)
+            await notification_service.remove_websocket_connection(connection)
             
     except Exception as e:
         logger.error(f"WebSocket connection error: {e}")
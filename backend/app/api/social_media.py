@@ -1,12 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Body, Query, BackgroundTasks
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from app.database import get_db
 from app.api.auth import get_current_user
 from app.models.user import User
 from app.models.social_account import SocialAccount
 from app.models.post import Post, PostStatus, PostType
 from app.models.automation_rule import AutomationRule, RuleType, TriggerType
+from app.models.media_blob import MediaBlob
 from app.models.bulk_composer_content import BulkComposerContent, BulkComposerStatus
 from app.schemas.social_media import (
     SocialAccountResponse, PostCreate, PostResponse, PostUpdate,
@@ -16,11 +18,16 @@ from app.schemas.social_media import (
     InstagramAutoReplyToggleRequest, SuccessResponse,
     LinkedInConnectRequest
 )
-from pydantic import BaseModel, Field, model_validator
+from pydantic import AliasChoices, BaseModel, Field, model_validator
 from datetime import datetime, timedelta, timezone
+import asyncio
+import json
 import logging
 from app.services.instagram_service import instagram_service
-from app.services.cloudinary_service import cloudinary_service
+from app.services.cloudinary_upload_service import cloudinary_upload_service
+from app.services.carousel_service import carousel_generation_service
+from app.services.http_client import http_client_service
+from app.services.media_store import media_store
 from uuid import uuid4
 from app.services.linkedin_service import LinkedInService
 import pytz
@@ -162,7 +169,8 @@ class InstagramImageGenerationRequest(BaseModel):
 
 class InstagramCarouselGenerationRequest(BaseModel):
     """Request model for Instagram carousel generation."""
-    image_prompt: str = Field(..., min_length=1, max_length=500, description="Prompt for carousel images")
+    # The web client sends the prompt as "prompt"
+    image_prompt: str = Field(..., min_length=1, max_length=500, validation_alias=AliasChoices("image_prompt", "prompt"), description="Prompt for carousel images")
     count: int = Field(default=3, ge=3, le=7, description="Number of images to generate (3-7)")
     post_type: str = Field(default="feed", description="Type of post for sizing (feed, story, square, etc.)")
 
@@ -278,7 +286,7 @@ async def get_facebook_status(
         try:
             page_info = None
             if acc.access_token:
-                async with __import__('httpx').AsyncClient() as client:
+                async with http_client_service.session() as client:
                     resp = await client.get(
                         f"https://graph.facebook.com/v23.0/{acc.platform_user_id}",
                         params={
@@ -1481,7 +1489,7 @@ async def connect_instagram(
         
         # Use the new service to get Instagram accounts with proper error handling
         try:
-            instagram_accounts = instagram_service.get_facebook_pages_with_instagram(request.access_token)
+            instagram_accounts = await instagram_service.get_facebook_pages_with_instagram(request.access_token)
         except Exception as service_error:
             # The service provides detailed troubleshooting messages
             raise HTTPException(
@@ -1652,7 +1660,7 @@ async def create_instagram_post(
         else:
             # Manual post
             try:
-                post_result = instagram_service.create_post(
+                post_result = await instagram_service.create_post(
                     instagram_user_id=instagram_user_id,
                     page_access_token=page_access_token,
                     caption=caption,
@@ -1740,7 +1748,7 @@ async def get_instagram_media(
             )
         
         # Get media from Instagram API using new service
-        media_items = instagram_service.get_user_media(
+        media_items = await instagram_service.get_user_media(
             instagram_user_id=instagram_user_id,
             page_access_token=page_access_token,
             limit=limit
@@ -1773,7 +1781,6 @@ async def generate_instagram_image(
     """Generate an image for Instagram using Stability AI."""
     try:
         from app.services.instagram_service import instagram_service
-        from app.services.cloudinary_service import cloudinary_service
         
         logger.info(f"Generating Instagram image with prompt: {request.image_prompt}")
         
@@ -1790,7 +1797,7 @@ async def generate_instagram_image(
             )
         
         # Upload to Cloudinary with Instagram-specific transforms
-        upload_result = cloudinary_service.upload_image_with_instagram_transform(
+        upload_result = await cloudinary_upload_service.upload_image(
             f"data:image/png;base64,{image_result['image_base64']}"
         )
         
@@ -1830,7 +1837,6 @@ async def upload_instagram_image(
 ):
     """Upload an image for Instagram using Cloudinary with Instagram-specific transforms."""
     try:
-        from app.services.cloudinary_service import cloudinary_service
         
         # Validate file type
         if not file.content_type.startswith('image/'):
@@ -1843,7 +1849,7 @@ async def upload_instagram_image(
         file_content = await file.read()
         
         # Upload to Cloudinary with Instagram-specific transforms
-        upload_result = cloudinary_service.upload_image_with_instagram_transform(file_content)
+        upload_result = await cloudinary_upload_service.upload_image(file_content)
         
         if not upload_result["success"]:
             raise HTTPException(
@@ -1877,7 +1883,6 @@ async def upload_instagram_video(
 ):
     """Upload a video for Instagram - saves to disk and uploads to Cloudinary."""
     try:
-        from app.services.cloudinary_service import cloudinary_service
         import os
         
         # Validate file type
@@ -1887,27 +1892,19 @@ async def upload_instagram_video(
                 detail="Only video files are allowed"
             )
         
-        # Read file content
-        file_content = await file.read()
-        
-        # Create temp_images directory if it doesn't exist
-        os.makedirs("temp_images", exist_ok=True)
-        
-        # Save file to temp_images directory for later use (like Facebook service)
-        import tempfile
-        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(file.filename)[1], dir="temp_images") as temp_file:
-            temp_file.write(file_content)
-            temp_file_path = temp_file.name
+        # Stream the upload to temp_images in chunks (hashing as it goes) for later file-based posting
+        spooled = await media_store.spool_upload(file, "temp_images", suffix=os.path.splitext(file.filename)[1])
+        temp_file_path = str(spooled.path)
         
         # Get just the filename for database storage
         saved_filename = os.path.basename(temp_file_path)
         
         logger.info(f"Video file saved to disk: {temp_file_path}")
-        logger.info(f"File size: {len(file_content)} bytes")
+        logger.info(f"File size: {spooled.size_bytes} bytes")
         logger.info(f"Saved filename: {saved_filename}")
         
-        # Upload to Cloudinary with Instagram-specific transforms
-        upload_result = cloudinary_service.upload_video_with_instagram_transform(file_content)
+        # Chunked upload from disk to Cloudinary with Instagram-specific transforms
+        upload_result = await cloudinary_upload_service.upload_large_video(temp_file_path)
         
         if not upload_result["success"]:
             # Clean up temp file if upload failed
@@ -1929,7 +1926,8 @@ async def upload_instagram_video(
                 "url": upload_result["url"],  # Cloudinary URL for immediate use
                 "filename": saved_filename,   # Saved filename for later file-based posting
                 "original_filename": file.filename,
-                "size": len(file_content),
+                "size": spooled.size_bytes,
+                "sha256": spooled.sha256,
                 "cloudinary_url": upload_result["url"],
                 "file_path": temp_file_path  # Full path for backend use
             }
@@ -1952,7 +1950,6 @@ async def upload_instagram_thumbnail(
 ):
     """Upload a thumbnail image for Instagram reels using Cloudinary with Instagram-specific transforms."""
     try:
-        from app.services.cloudinary_service import cloudinary_service
         import os
         
         # Validate file type
@@ -1962,27 +1959,19 @@ async def upload_instagram_thumbnail(
                 detail="Only image files are allowed for thumbnails"
             )
         
-        # Read file content
-        file_content = await file.read()
-        
-        # Create temp_images directory if it doesn't exist
-        os.makedirs("temp_images", exist_ok=True)
-        
-        # Save file to temp_images directory for later use
-        import tempfile
-        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(file.filename)[1], dir="temp_images") as temp_file:
-            temp_file.write(file_content)
-            temp_file_path = temp_file.name
+        # Stream the upload to temp_images in chunks for later use
+        spooled = await media_store.spool_upload(file, "temp_images", suffix=os.path.splitext(file.filename)[1])
+        temp_file_path = str(spooled.path)
         
         # Get just the filename for database storage
         saved_filename = os.path.basename(temp_file_path)
         
         logger.info(f"Thumbnail file saved to disk: {temp_file_path}")
-        logger.info(f"File size: {len(file_content)} bytes")
+        logger.info(f"File size: {spooled.size_bytes} bytes")
         logger.info(f"Saved filename: {saved_filename}")
         
-        # Upload to Cloudinary with Instagram-specific transforms for thumbnails
-        upload_result = cloudinary_service.upload_thumbnail_with_instagram_transform(file_content)
+        # Upload the file from disk to Cloudinary with Instagram-specific transforms
+        upload_result = await cloudinary_upload_service.upload_thumbnail(temp_file_path)
         
         if not upload_result["success"]:
             # Clean up temp file if upload failed
@@ -2004,7 +1993,8 @@ async def upload_instagram_thumbnail(
                 "url": upload_result["url"],  # Cloudinary URL for immediate use
                 "filename": saved_filename,   # Saved filename for later file-based posting
                 "original_filename": file.filename,
-                "size": len(file_content),
+                "size": spooled.size_bytes,
+                "sha256": spooled.sha256,
                 "cloudinary_url": upload_result["url"],
                 "file_path": temp_file_path  # Full path for backend use
             }
@@ -2145,17 +2135,29 @@ async def generate_bulk_captions(
         )
 
 
+async def _carousel_caption(prompt: str) -> str:
+    """Caption for an AI carousel; empty when caption generation is unavailable or fails."""
+    from app.services.groq_service import groq_service
+    if not groq_service.is_available():
+        return ""
+    try:
+        result = await groq_service.generate_instagram_post(prompt)
+        return result.get("content", "") if result.get("success") else ""
+    except Exception as e:
+        logger.warning(f"Carousel caption generation failed: {e}")
+        return ""
+
+
 @router.post("/social/instagram/generate-carousel")
 async def generate_instagram_carousel(
     request: InstagramCarouselGenerationRequest,
     current_user: User = Depends(get_current_user)
 ):
-    """Generate Instagram carousel images using AI."""
+    """Generate Instagram carousel images using AI (images are generated concurrently)."""
     try:
-        result = await instagram_service.generate_carousel_images_with_ai(
-            prompt=request.image_prompt,
-            count=request.count,
-            post_type=request.post_type
+        result, caption = await asyncio.gather(
+            carousel_generation_service.generate(request.image_prompt, request.count, request.post_type),
+            _carousel_caption(request.image_prompt)
         )
         
         if not result["success"]:
@@ -2167,12 +2169,13 @@ async def generate_instagram_carousel(
         return {
             "success": True,
             "image_urls": result["image_urls"],
-            "caption": result["caption"],
+            "caption": caption,
             "count": result["count"],
-            "prompt": result["prompt"],
+            "failed": result["failed"],
+            "prompt": request.image_prompt,
             "width": result["width"],
             "height": result["height"],
-            "post_type": result["post_type"]
+            "post_type": request.post_type
         }
         
     except HTTPException:
@@ -2185,6 +2188,47 @@ async def generate_instagram_carousel(
         )
 
 
+@router.post("/social/instagram/generate-carousel/stream")
+async def stream_instagram_carousel(
+    request: InstagramCarouselGenerationRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """Generate Instagram carousel images, streaming per-image progress as server-sent events.
+
+    Emits a ``progress`` event per image and a final ``done`` event with the
+    same payload as ``/social/instagram/generate-carousel``.
+    """
+    events: asyncio.Queue = asyncio.Queue()
+
+    async def run():
+        try:
+            result, caption = await asyncio.gather(
+                carousel_generation_service.generate(
+                    request.image_prompt, request.count, request.post_type, on_progress=events.put_nowait
+                ),
+                _carousel_caption(request.image_prompt)
+            )
+            result.update(caption=caption, prompt=request.image_prompt, post_type=request.post_type)
+        except Exception as e:
+            logger.error(f"Error generating Instagram carousel: {str(e)}", exc_info=True)
+            result = {"success": False, "error": str(e)}
+        events.put_nowait({"event": "done", **result})
+
+    async def stream():
+        task = asyncio.create_task(run())
+        try:
+            while True:
+                event = await events.get()
+                name = event.pop("event", "progress")
+                yield f"event: {name}\ndata: {json.dumps(event)}\n\n"
+                if name == "done":
+                    break
+        finally:
+            task.cancel()
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
 @router.post("/social/instagram/post-carousel")
 async def create_instagram_carousel_post(
     request: InstagramCarouselPostRequest,
@@ -2685,27 +2729,48 @@ async def get_bulk_composer_content(
         )
         if social_account_id:
             query = query.filter(BulkComposerContent.social_account_id == social_account_id)
+        
         content = query.order_by(BulkComposerContent.scheduled_datetime.desc()).all()
+        blobs = {
+            blob.sha256: blob for blob in db.query(MediaBlob).filter(
+                MediaBlob.sha256.in_({item.media_sha256 for item in content if item.media_sha256})
+            ).all()
+        }
+        
+        def media_urls(item):
+            """Lightweight (media_url, thumbnail_url) pair; full media is fetched lazily."""
+            blob = blobs.get(item.media_sha256)
+            if blob:
+                return media_store.url_for(blob.sha256), media_store.thumbnail_url_for(blob)
+            if item.media_file:
+                # URL, or inline base64 not yet moved to the media store by the scheduler's backfill
+                return item.media_file, item.media_file
+            return None, None
+        
+        data = []
+        for item in content:
+            media_url, thumbnail_url = media_urls(item)
+            data.append({
+                "id": item.id,
+                "caption": item.caption,
+                "scheduled_date": item.scheduled_date,
+                "scheduled_time": item.scheduled_time,
+                "status": item.status,
+                "has_media": bool(item.media_sha256 or item.media_file),
+                "media_file": media_url,
+                "media_url": media_url,
+                "thumbnail_url": thumbnail_url,
+                "media_content_type": blobs[item.media_sha256].content_type if item.media_sha256 in blobs else None,
+                "media_filename": item.media_filename,
+                "facebook_post_id": item.facebook_post_id,
+                "error_message": item.error_message,
+                "created_at": item.created_at.isoformat() if item.created_at else None,
+                "schedule_batch_id": item.schedule_batch_id
+            })
         
         return {
             "success": True,
-            "data": [
-                {
-                    "id": item.id,
-                    "caption": item.caption,
-                    "scheduled_date": item.scheduled_date,
-                    "scheduled_time": item.scheduled_time,
-                    "status": item.status,
-                    "has_media": bool(item.media_file),
-                    "media_file": item.media_file,
-                    "media_filename": item.media_filename,
-                    "facebook_post_id": item.facebook_post_id,
-                    "error_message": item.error_message,
-                    "created_at": item.created_at.isoformat() if item.created_at else None,
-                    "schedule_batch_id": item.schedule_batch_id
-                }
-                for item in content
-            ]
+            "data": data
         }
     
     except Exception as e:
@@ -2735,9 +2800,15 @@ async def delete_bulk_composer_content(
                 detail="Content not found"
             )
         
+        was_scheduled = content.status == BulkComposerStatus.SCHEDULED.value
         db.delete(content)
         db.commit()
         
+        # Let the scheduler drop the deleted post's due time
+        if was_scheduled:
+            from app.services.bulk_composer_scheduler import bulk_composer_scheduler
+            bulk_composer_scheduler.notify_schedule_changed()
+        
         return SuccessResponse(
             message="Content deleted successfully"
         )
@@ -2752,125 +2823,127 @@ async def delete_bulk_composer_content(
         )
 
 
+async def _prepare_bulk_composer_post(post: BulkComposerPost) -> Dict[str, Any]:
+    """Validate one bulk composer post and upload its media (phase one of bulk scheduling)."""
+    if not (post.caption and post.scheduled_date and post.scheduled_time):
+        return {"success": False, "error": "Missing required fields", "caption": post.caption}
+
+    # Parse as IST, then convert to UTC for storage
+    try:
+        ist = pytz.timezone("Asia/Kolkata")
+        scheduled_datetime = ist.localize(
+            datetime.strptime(f"{post.scheduled_date} {post.scheduled_time}", "%Y-%m-%d %H:%M")
+        ).astimezone(pytz.utc)
+    except Exception as e:
+        return {"success": False, "error": f"Invalid date/time: {e}", "caption": post.caption}
+    if scheduled_datetime <= datetime.now(pytz.utc):
+        return {"success": False, "error": f"Scheduled time is in the past: {scheduled_datetime}", "caption": post.caption}
+
+    # Handle media upload if present
+    media_url = None
+    stored = None
+    if post.media_file:
+        if post.media_file.startswith("data:"):
+            # Keep our own content-addressed copy; rows only reference it by digest
+            stored = await media_store.astore_data_url(post.media_file)
+            if post.media_file.startswith("data:image"):
+                upload_result = await cloudinary_upload_service.upload_image(post.media_file)
+            elif post.media_file.startswith("data:video"):
+                upload_result = await cloudinary_upload_service.upload_video(post.media_file)
+            else:
+                upload_result = {"success": True, "url": post.media_file}
+            if not upload_result.get("success"):
+                return {"success": False, "error": upload_result.get("error", "Cloudinary upload failed"), "caption": post.caption}
+            media_url = upload_result["url"]
+        else:
+            # Assume it's already a URL
+            media_url = post.media_file
+
+    return {
+        "success": True,
+        "stored": stored,
+        "row": {
+            "caption": post.caption,
+            "media_file": media_url,
+            "media_sha256": stored.sha256 if stored else None,
+            "media_filename": post.media_filename,
+            "scheduled_date": post.scheduled_date,
+            "scheduled_time": post.scheduled_time,
+            "scheduled_datetime": scheduled_datetime,
+        }
+    }
+
+
 @router.post("/social/bulk-composer/schedule")
 async def schedule_bulk_composer_posts(
     request: BulkComposerRequest,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Schedule multiple posts for the bulk composer."""
+    """Schedule multiple posts for the bulk composer.
+
+    Phase one validates every post and uploads media concurrently; phase two
+    inserts all valid posts in a single transaction.
+    """
     try:
-        results = []
         schedule_batch_id = str(uuid4())  # Unique batch ID for this scheduling action
-        for post in request.posts:
-            try:
-                # Validate required fields
-                if not (post.caption and post.scheduled_date and post.scheduled_time):
-                    results.append({
-                        "success": False, 
-                        "error": "Missing required fields", 
-                        "caption": post.caption
-                    })
-                    continue
 
-                # Parse scheduled datetime
-                try:
-                    import pytz
-                    ist = pytz.timezone("Asia/Kolkata")
-                    # Parse as IST, then convert to UTC for storage
-                    scheduled_datetime = ist.localize(
-                        datetime.strptime(f"{post.scheduled_date} {post.scheduled_time}", "%Y-%m-%d %H:%M")
-                    )
-                    scheduled_datetime = scheduled_datetime.astimezone(pytz.utc)
-                    # Validate that the scheduled time is in the future
-                    now = datetime.now(pytz.utc)
-                    if scheduled_datetime <= now:
-                        results.append({
-                            "success": False, 
-                            "error": f"Scheduled time is in the past: {scheduled_datetime}", 
-                            "caption": post.caption
-                        })
-                        continue
-                except Exception as e:
-                    results.append({
-                        "success": False, 
-                        "error": f"Invalid date/time: {e}", 
-                        "caption": post.caption
-                    })
-                    continue
+        async def prepare(post: BulkComposerPost) -> Dict[str, Any]:
+            try:
+                return await _prepare_bulk_composer_post(post)
+            except Exception as e:
+                logger.error(f"Error preparing bulk composer post: {e}")
+                return {"success": False, "error": str(e), "caption": post.caption}
 
-                # Handle media upload if present
-                media_url = None
-                if post.media_file:
-                    # If it's a base64 string, upload to Cloudinary
-                    if isinstance(post.media_file, str) and post.media_file.startswith("data:image"):
-                        upload_result = cloudinary_service.upload_image_with_instagram_transform(post.media_file)
-                        if upload_result.get("success"):
-                            media_url = upload_result["url"]
-                        else:
-                            results.append({
-                                "success": False, 
-                                "error": upload_result.get("error", "Cloudinary upload failed"), 
-                                "caption": post.caption
-                            })
-                            continue
-                    elif isinstance(post.media_file, str) and post.media_file.startswith("data:video"):
-                        upload_result = cloudinary_service.upload_video_with_instagram_transform(post.media_file)
-                        if upload_result.get("success"):
-                            media_url = upload_result["url"]
-                        else:
-                            results.append({
-                                "success": False, 
-                                "error": upload_result.get("error", "Cloudinary upload failed"), 
-                                "caption": post.caption
-                            })
-                            continue
-                    else:
-                        # Assume it's already a URL
-                        media_url = post.media_file
+        prepared = await asyncio.gather(*(prepare(post) for post in request.posts))
+        valid = [item for item in prepared if item["success"]]
 
-                # Save to DB
-                new_post = BulkComposerContent(
-                    user_id=current_user.id,
-                    social_account_id=request.social_account_id,
-                    caption=post.caption,
-                    media_file=media_url,
-                    media_filename=post.media_filename,
-                    media_generated=False,  # Default to False for uploaded media
-                    scheduled_date=post.scheduled_date,
-                    scheduled_time=post.scheduled_time,
-                    scheduled_datetime=scheduled_datetime,
-                    status=BulkComposerStatus.SCHEDULED.value,
-                    schedule_batch_id=schedule_batch_id  # Assign batch ID
-                )
-                db.add(new_post)
+        new_posts = []
+        if valid:
+            try:
+                media_store.register_many(db, [item["stored"] for item in valid if item["stored"]])
+                new_posts = [
+                    BulkComposerContent(
+                        user_id=current_user.id,
+                        social_account_id=request.social_account_id,
+                        media_generated=False,  # Default to False for uploaded media
+                        status=BulkComposerStatus.SCHEDULED.value,
+                        schedule_batch_id=schedule_batch_id,  # Assign batch ID
+                        **item["row"]
+                    )
+                    for item in valid
+                ]
+                db.add_all(new_posts)
+                db.flush()
+                new_ids = [new_post.id for new_post in new_posts]
                 db.commit()
-                db.refresh(new_post)
-                
-                # Schedule pre-posting notification (10 minutes before)
-                try:
-                    from app.services.notification_service import notification_service
-                    await notification_service.schedule_pre_posting_alert(db, new_post.id)
-                except Exception as notif_error:
-                    logger.error(f"Failed to schedule pre-posting alert: {notif_error}")
-                
-                results.append({
-                    "success": True, 
-                    "id": new_post.id, 
-                    "caption": post.caption,
-                    "schedule_batch_id": schedule_batch_id
-                })
-                
+                # Reload the batch in one query instead of one refresh per row
+                new_posts = db.query(BulkComposerContent).filter(BulkComposerContent.id.in_(new_ids)).all()
             except Exception as e:
-                logger.error(f"Error scheduling post: {e}")
-                results.append({
-                    "success": False, 
-                    "error": str(e), 
-                    "caption": post.caption
-                })
+                db.rollback()
+                logger.error(f"Error saving bulk composer posts: {e}")
+                for item in valid:
+                    item.update({"success": False, "error": f"Failed to save post: {e}"})
+                new_posts, new_ids = [], []
+            for item, post_id in zip(valid, new_ids):
+                item.update({"id": post_id, "caption": item["row"]["caption"], "schedule_batch_id": schedule_batch_id})
+
+        results = [{key: value for key, value in item.items() if key not in ("row", "stored")} for item in prepared]
+
+        # Schedule pre-posting notifications (10 minutes before) for the new posts only
+        if new_posts:
+            try:
+                from app.services.notification_service import notification_service
+                await notification_service.schedule_pre_posting_alerts(db, new_posts)
+            except Exception as notif_error:
+                logger.error(f"Failed to schedule pre-posting alerts: {notif_error}")
+
         # Determine overall success
         failed_posts = [r for r in results if not r["success"]]
         scheduled_posts = [r for r in results if r["success"]]
+        if scheduled_posts:
+            from app.services.bulk_composer_scheduler import bulk_composer_scheduler
+            bulk_composer_scheduler.notify_schedule_changed()
         if failed_posts:
             return {
                 "success": False,
@@ -3574,13 +3647,8 @@ async def sync_instagram_posts(
         
         # Fetch all media from Instagram API
         from app.services.instagram_service import instagram_service
-        import asyncio
         
-        # Run the synchronous method in a thread pool since it's not async
-        loop = asyncio.get_event_loop()
-        media_items = await loop.run_in_executor(
-            None, 
-            instagram_service.get_user_media, 
+        media_items = await instagram_service.get_user_media(
             instagram_user_id, 
             page_access_token, 
             100
@@ -3734,7 +3802,7 @@ async def debug_instagram_api_test(
         # Test 1: Basic account info
         try:
             from app.services.instagram_service import instagram_service
-            account_info = instagram_service._get_enhanced_instagram_details(
+            account_info = await instagram_service._get_enhanced_instagram_details(
                 instagram_user_id, 
                 page_access_token
             )
@@ -3750,7 +3818,7 @@ async def debug_instagram_api_test(
         
         # Test 2: Get media (read permission)
         try:
-            media_items = instagram_service.get_user_media(
+            media_items = await instagram_service.get_user_media(
                 instagram_user_id, 
                 page_access_token, 
                 5
@@ -3848,12 +3916,7 @@ async def debug_instagram_sync_test(
         
         # Test getting media from Instagram API
         from app.services.instagram_service import instagram_service
-        import asyncio
-        
-        loop = asyncio.get_event_loop()
-        media_items = await loop.run_in_executor(
-            None, 
-            instagram_service.get_user_media, 
+        media_items = await instagram_service.get_user_media(
             instagram_user_id, 
             page_access_token, 
             10  # Just get 10 items for testing
@@ -4276,6 +4339,80 @@ def get_scheduled_posts(current_user: User = Depends(get_current_user), db: Sess
         for post in posts
     ]
 
+# Rows per INSERT flush when saving large Instagram bulk schedules
+INSTAGRAM_BULK_INSERT_CHUNK_SIZE = 500
+
+
+async def _prepare_instagram_bulk_post(idx: int, post: dict, ist) -> Dict[str, Any]:
+    """Parse one Instagram bulk-schedule item and upload its reel media (phase one of bulk scheduling)."""
+    caption = post.get("caption", "")
+    scheduled_date = post.get("scheduled_date")
+    scheduled_time = post.get("scheduled_time")
+    post_type = post.get("post_type", "photo")
+
+    # Combine date and time as IST
+    dt = ist.localize(datetime.strptime(f"{scheduled_date} {scheduled_time}", "%Y-%m-%d %H:%M"))
+
+    # Set media fields by post type
+    image_url = None
+    media_urls = None
+    video_url = None
+    reel_thumbnail_url = None
+
+    if post_type == "photo":
+        image_url = post.get("media_file") or post.get("mediaPreview") or post.get("image_url")
+    elif post_type == "carousel":
+        media_urls = post.get("carousel_images")
+    elif post_type == "reel":
+        video_url = post.get("media_file") or post.get("video_url")
+        # Handle thumbnail for reels
+        reel_thumbnail_url = post.get("thumbnail_url") or post.get("thumbnail_file") or post.get("reel_thumbnail_url")
+
+        # Upload the video and its thumbnail side by side
+        uploads = {}
+        if isinstance(video_url, str) and video_url.startswith("data:video"):
+            uploads["video"] = cloudinary_upload_service.upload_video(video_url)
+        if isinstance(reel_thumbnail_url, str) and reel_thumbnail_url.startswith("data:image"):
+            uploads["thumbnail"] = cloudinary_upload_service.upload_thumbnail(reel_thumbnail_url)
+        upload_results = dict(zip(uploads, await asyncio.gather(*uploads.values())))
+        upload_result = upload_results.get("video")
+        thumbnail_upload_result = upload_results.get("thumbnail")
+
+        if upload_result is not None:
+            if not upload_result.get("success"):
+                raise Exception(f"Video upload failed: {upload_result.get('error', 'Unknown error')}")
+            video_url = upload_result["url"]
+        if thumbnail_upload_result is not None:
+            if thumbnail_upload_result.get("success"):
+                reel_thumbnail_url = thumbnail_upload_result["url"]
+            else:
+                logger.warning(f"Failed to upload thumbnail for post {idx}: {thumbnail_upload_result.get('error')}")
+                # Continue without thumbnail rather than failing the entire post
+
+    return {
+        "row": {
+            "prompt": caption,
+            "scheduled_datetime": dt,
+            "post_type": PostType(post_type.lower()),
+            "post_time": scheduled_time,
+            "image_url": image_url,
+            "media_urls": media_urls,
+            "video_url": video_url,
+            "reel_thumbnail_url": reel_thumbnail_url,
+        },
+        "response": {
+            "caption": caption,
+            "scheduled_date": scheduled_date,
+            "scheduled_time": scheduled_time,
+            "scheduled_datetime": dt.isoformat(),
+            "status": "scheduled",
+            "post_type": post_type,
+            "video_url": video_url,
+            "reel_thumbnail_url": reel_thumbnail_url
+        }
+    }
+
+
 @router.post("/social/instagram/bulk-schedule")
 async def bulk_schedule_instagram_posts(
     social_account_id: int,
@@ -4296,102 +4433,72 @@ async def bulk_schedule_instagram_posts(
     if not social_account:
         raise HTTPException(status_code=404, detail="Instagram account not found")
 
-    for idx, post in enumerate(posts):
-        try:
-            caption = post.get("caption", "")
-            scheduled_date = post.get("scheduled_date")
-            scheduled_time = post.get("scheduled_time")
-            post_type = post.get("post_type", "photo")
-            # Add media fields as needed (image_url, media_urls, video_url, etc.)
-
-            # Combine date and time as IST
-            dt = ist.localize(datetime.strptime(f"{scheduled_date} {scheduled_time}", "%Y-%m-%d %H:%M"))
-
-            # Set image_url for photo posts
-            image_url = None
-            media_urls = None
-            video_url = None
-            reel_thumbnail_url = None  # Add thumbnail URL field
-            
-            if post_type == "photo":
-                image_url = post.get("media_file") or post.get("mediaPreview") or post.get("image_url")
-            elif post_type == "carousel":
-                media_urls = post.get("carousel_images")
-            elif post_type == "reel":
-                video_url = post.get("media_file") or post.get("video_url")
-                # Handle thumbnail for reels
-                reel_thumbnail_url = post.get("thumbnail_url") or post.get("thumbnail_file") or post.get("reel_thumbnail_url")
-                
-                if isinstance(video_url, str) and video_url.startswith("data:video"):
-                    upload_result = cloudinary_service.upload_video_with_instagram_transform(video_url)
-                    if upload_result.get("success"):
-                        video_url = upload_result["url"]
-                    else:
-                        # handle error, e.g. skip or mark as failed
-                        continue
-                
-                # Handle thumbnail upload if it's a base64 data URL
-                if isinstance(reel_thumbnail_url, str) and reel_thumbnail_url.startswith("data:image"):
-                    thumbnail_upload_result = cloudinary_service.upload_thumbnail_with_instagram_transform(reel_thumbnail_url)
-                    if thumbnail_upload_result.get("success"):
-                        reel_thumbnail_url = thumbnail_upload_result["url"]
-                    else:
-                        logger.warning(f"Failed to upload thumbnail for post {idx}: {thumbnail_upload_result.get('error')}")
-                        # Continue without thumbnail rather than failing the entire post
+    def failure(idx: int, post: dict, error: str) -> dict:
+        return {
+            "index": idx,
+            "error": error,
+            "caption": post.get("caption", ""),
+            "scheduled_date": post.get("scheduled_date"),
+            "scheduled_time": post.get("scheduled_time")
+        }
 
-            scheduled_post = ScheduledPost(
-                user_id=current_user.id,
-                social_account_id=social_account_id,
-                prompt=caption,
-                scheduled_datetime=dt,
-                post_type=PostType(post_type.lower()),
-                platform="instagram",
-                status="scheduled",
-                is_active=True,
-                frequency=FrequencyType.DAILY,  # or set as needed
-                post_time=scheduled_time,
-                image_url=image_url,
-                media_urls=media_urls,
-                video_url=video_url,
-                reel_thumbnail_url=reel_thumbnail_url,  # Add thumbnail URL to database
-            )
-            db.add(scheduled_post)
-            scheduled_posts.append({
-                "caption": caption,
-                "scheduled_date": scheduled_date,
-                "scheduled_time": scheduled_time,
-                "scheduled_datetime": dt.isoformat(),
-                "status": "scheduled",
-                "post_type": post_type,
-                "video_url": video_url,
-                "reel_thumbnail_url": reel_thumbnail_url  # Include in response
-            })
-        except Exception as e:
-            failed_posts.append({
-                "index": idx,
-                "error": str(e),
-                "caption": post.get("caption", ""),
-                "scheduled_date": post.get("scheduled_date"),
-                "scheduled_time": post.get("scheduled_time")
-            })
+    # Phase one: parse every item and upload media concurrently
+    prepared = await asyncio.gather(
+        *(_prepare_instagram_bulk_post(idx, post, ist) for idx, post in enumerate(posts)),
+        return_exceptions=True
+    )
+    valid = []
+    for idx, (post, item) in enumerate(zip(posts, prepared)):
+        if isinstance(item, Exception):
+            failed_posts.append(failure(idx, post, str(item)))
+        else:
+            valid.append((idx, post, item))
 
-    db.commit()
-    
-    # Schedule pre-posting notifications for all successfully created posts
+    # Phase two: insert in chunks within a single transaction
+    new_posts = []
     try:
-        from app.services.notification_service import notification_service
-        for scheduled_post in db.query(ScheduledPost).filter(
-            ScheduledPost.user_id == current_user.id,
-            ScheduledPost.platform == "instagram",
-            ScheduledPost.status == "scheduled"
-        ).all():
-            try:
-                await notification_service.schedule_pre_posting_alert(db, scheduled_post.id)
-            except Exception as notif_error:
-                logger.error(f"Failed to schedule pre-posting alert for Instagram post {scheduled_post.id}: {notif_error}")
+        for start in range(0, len(valid), INSTAGRAM_BULK_INSERT_CHUNK_SIZE):
+            chunk = [
+                ScheduledPost(
+                    user_id=current_user.id,
+                    social_account_id=social_account_id,
+                    platform="instagram",
+                    status="scheduled",
+                    is_active=True,
+                    frequency=FrequencyType.DAILY,  # or set as needed
+                    **item["row"]
+                )
+                for _, _, item in valid[start:start + INSTAGRAM_BULK_INSERT_CHUNK_SIZE]
+            ]
+            db.add_all(chunk)
+            db.flush()
+            new_posts.extend(chunk)
+        new_ids = [scheduled_post.id for scheduled_post in new_posts]
+        db.commit()
     except Exception as e:
-        logger.error(f"Error scheduling pre-posting notifications: {e}")
-    
+        db.rollback()
+        logger.error(f"Error saving Instagram bulk schedule: {e}")
+        failed_posts.extend(failure(idx, post, f"Failed to save post: {e}") for idx, post, _ in valid)
+        failed_posts.sort(key=lambda failed: failed["index"])
+        valid, new_ids = [], []
+
+    for (_, _, item), post_id in zip(valid, new_ids):
+        scheduled_posts.append({"id": post_id, **item["response"]})
+
+    # Wake the Instagram scheduler so it picks up the new due times
+    if scheduled_posts:
+        from app.services.scheduler_service import scheduler_service
+        scheduler_service.notify_schedule_changed()
+
+    # Schedule pre-posting notifications for the posts created by this request only
+    if new_ids:
+        try:
+            from app.services.notification_service import notification_service
+            new_posts = db.query(ScheduledPost).filter(ScheduledPost.id.in_(new_ids)).all()
+            await notification_service.schedule_pre_posting_alerts(db, new_posts)
+        except Exception as e:
+            logger.error(f"Error scheduling pre-posting notifications: {e}")
+
     return {
         "success": len(failed_posts) == 0,
         "scheduled_posts": scheduled_posts,
@@ -4417,6 +4524,9 @@ async def update_bulk_composer_content(
     content.caption = request.caption
     db.commit()
     db.refresh(content)
+    # Wake the scheduler so it re-reads the row (and its due time) after the edit
+    from app.services.bulk_composer_scheduler import bulk_composer_scheduler
+    bulk_composer_scheduler.notify_schedule_changed(content.scheduled_datetime)
     return {
         "success": True,
         "id": content.id,
@@ -1,8 +1,16 @@
-from fastapi import APIRouter, Request, Query, Depends
-from app.services.instagram_auto_reply_service import handle_incoming_comment_webhook, handle_incoming_dm_webhook
+from fastapi import APIRouter, Request, Query, Depends, HTTPException
+from sqlalchemy.orm import Session
+from typing import Optional
+from app.config import get_settings
+from app.database import get_db
+from app.services.webhook_queue_service import webhook_queue_service
+import hashlib
+import hmac
+import json
 import logging
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
 router = APIRouter()
 
 def get_verify_token() -> str:
@@ -27,31 +35,46 @@ async def verify_webhook(
         logger.error("❌ Instagram webhook verification failed")
         return {"error": "Verification failed"}
 
+def verify_signature(body: bytes, signature_header: Optional[str]) -> bool:
+    """Check Meta's X-Hub-Signature-256 header against the configured app secrets."""
+    secrets = [secret for secret in (settings.facebook_app_secret, settings.instagram_app_secret) if secret]
+    if not secrets:
+        # Nothing to verify against (local development)
+        return True
+    if not signature_header or not signature_header.startswith("sha256="):
+        return False
+    signature = signature_header[len("sha256="):]
+    return any(
+        hmac.compare_digest(hmac.new(secret.encode(), body, hashlib.sha256).hexdigest(), signature)
+        for secret in secrets
+    )
+
 @router.post("/webhook/instagram")
-async def instagram_webhook(request: Request):
-    """Handle incoming Instagram webhooks for comments and DMs."""
+async def instagram_webhook(request: Request, db: Session = Depends(get_db)):
+    """Queue incoming Instagram comment and DM webhooks and acknowledge immediately.
+    
+    Events are processed by the webhook queue consumers; Meta only needs a fast 200.
+    """
+    body = await request.body()
+    if not verify_signature(body, request.headers.get("X-Hub-Signature-256")):
+        logger.error("❌ Instagram webhook signature verification failed")
+        raise HTTPException(status_code=403, detail="Invalid signature")
+    
     try:
-        data = await request.json()
-        logger.info(f"📨 Received Instagram webhook: {data}")
-        
-        # Check if this is a comment webhook
-        if "entry" in data:
-            for entry in data.get("entry", []):
-                for change in entry.get("changes", []):
-                    if change.get("field") == "comments":
-                        logger.info("🔄 Processing Instagram comment webhook")
-                        await handle_incoming_comment_webhook(data)
-                        return {"status": "processed"}
-                    
-                    # Check if this is a DM webhook
-                    if change.get("field") == "messages":
-                        logger.info("🔄 Processing Instagram DM webhook")
-                        result = await handle_incoming_dm_webhook(data)
-                        return result
-        
+        data = json.loads(body)
+    except ValueError:
+        logger.error("❌ Instagram webhook body is not valid JSON")
+        raise HTTPException(status_code=400, detail="Invalid JSON")
+    
+    if not isinstance(data, dict) or "entry" not in data:
         logger.info("📭 No relevant webhook data found")
         return {"status": "ignored"}
-        
+    
+    try:
+        queued = webhook_queue_service.enqueue(db, data)
     except Exception as e:
-        logger.error(f"❌ Error processing Instagram webhook: {e}")
-        return {"status": "error", "detail": str(e)} 
\ No newline at end of file
+        # Not stored: a non-200 makes Meta redeliver the event
+        logger.error(f"❌ Error queueing Instagram webhook: {e}")
+        raise HTTPException(status_code=500, detail="Failed to queue webhook")
+    
+    return {"status": "queued", "queued": queued}
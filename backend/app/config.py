@@ -38,9 +38,14 @@ class Settings(BaseSettings):
 
     # Groq AI Integration
     groq_api_key: str | None = os.getenv("GROQ_API_KEY")
+    groq_max_concurrency: int = int(os.getenv("GROQ_MAX_CONCURRENCY", "8"))
+    groq_timeout_seconds: float = float(os.getenv("GROQ_TIMEOUT_SECONDS", "60"))
 
     # Stability AI Integration
     stability_api_key: str | None = os.getenv("STABILITY_API_KEY")
+    stability_max_concurrency: int = int(os.getenv("STABILITY_MAX_CONCURRENCY", "4"))
+    stability_max_retries: int = int(os.getenv("STABILITY_MAX_RETRIES", "3"))
+    stability_timeout_seconds: float = float(os.getenv("STABILITY_TIMEOUT_SECONDS", "120"))
 
     # IMGBB Integration
     imgbb_api_key: str | None = os.getenv("IMGBB_API_KEY")
@@ -65,9 +70,93 @@ class Settings(BaseSettings):
     smtp_password: str | None = os.getenv("SMTP_PASSWORD")
     from_email: str | None = os.getenv("FROM_EMAIL")
 
+    # Shared outbound HTTP client (Graph API and other providers)
+    http_max_connections: int = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+    http_max_keepalive_connections: int = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    http_keepalive_expiry_seconds: float = float(os.getenv("HTTP_KEEPALIVE_EXPIRY_SECONDS", "30"))
+    http_max_requests_per_host: int = int(os.getenv("HTTP_MAX_REQUESTS_PER_HOST", "20"))
+    http_timeout_seconds: float = float(os.getenv("HTTP_TIMEOUT_SECONDS", "60"))
+    http_connect_timeout_seconds: float = float(os.getenv("HTTP_CONNECT_TIMEOUT_SECONDS", "10"))
+
+    # Bulk composer publishing
+    bulk_publish_concurrency: int = int(os.getenv("BULK_PUBLISH_CONCURRENCY", "20"))
+    bulk_publish_per_account_concurrency: int = int(os.getenv("BULK_PUBLISH_PER_ACCOUNT_CONCURRENCY", "3"))
+
+    # Due-time schedulers: how many upcoming due times to keep in memory and
+    # how long to sleep at most when nothing is due (safety sweep)
+    scheduler_lookahead_size: int = int(os.getenv("SCHEDULER_LOOKAHEAD_SIZE", "100"))
+    scheduler_max_idle_seconds: int = int(os.getenv("SCHEDULER_MAX_IDLE_SECONDS", "300"))
+    # How long a scheduler instance owns a claimed due row before others may take it over
+    scheduler_lease_seconds: int = int(os.getenv("SCHEDULER_LEASE_SECONDS", "900"))
+
+    # Number of replied comment ids kept in memory in front of the auto-reply log
+    replied_comment_cache_size: int = int(os.getenv("REPLIED_COMMENT_CACHE_SIZE", "50000"))
+    # Comment sweep interval per post: active in the last day, in the last week, older
+    comment_sweep_hot_seconds: int = int(os.getenv("COMMENT_SWEEP_HOT_SECONDS", "60"))
+    comment_sweep_warm_seconds: int = int(os.getenv("COMMENT_SWEEP_WARM_SECONDS", "900"))
+    comment_sweep_cold_seconds: int = int(os.getenv("COMMENT_SWEEP_COLD_SECONDS", "3600"))
+
+    # Webhook ingestion queue
+    webhook_consumer_count: int = int(os.getenv("WEBHOOK_CONSUMER_COUNT", "4"))
+    webhook_max_attempts: int = int(os.getenv("WEBHOOK_MAX_ATTEMPTS", "5"))
+    webhook_retry_base_seconds: int = int(os.getenv("WEBHOOK_RETRY_BASE_SECONDS", "30"))
+    webhook_lease_seconds: int = int(os.getenv("WEBHOOK_LEASE_SECONDS", "300"))
+
+    # Pre-posting alert queue
+    pre_posting_alert_batch_size: int = int(os.getenv("PRE_POSTING_ALERT_BATCH_SIZE", "200"))
+    pre_posting_alert_max_attempts: int = int(os.getenv("PRE_POSTING_ALERT_MAX_ATTEMPTS", "3"))
+    pre_posting_alert_retry_base_seconds: int = int(os.getenv("PRE_POSTING_ALERT_RETRY_BASE_SECONDS", "15"))
+    pre_posting_alert_lease_seconds: int = int(os.getenv("PRE_POSTING_ALERT_LEASE_SECONDS", "300"))
+
+    # Real-time notifications: per-connection send queue, and the pub/sub backplane ("memory" or "redis")
+    websocket_send_queue_size: int = int(os.getenv("WEBSOCKET_SEND_QUEUE_SIZE", "256"))
+    websocket_send_timeout_seconds: float = float(os.getenv("WEBSOCKET_SEND_TIMEOUT_SECONDS", "10"))
+    pubsub_backend: str = os.getenv("PUBSUB_BACKEND", "memory").lower()
+    redis_url: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    pubsub_channel: str = os.getenv("PUBSUB_CHANNEL", "notifications")
+    # Publish outcome notifications are buffered this long (or up to this many rows) and written in one insert
+    notification_buffer_window_seconds: float = float(os.getenv("NOTIFICATION_BUFFER_WINDOW_SECONDS", "2"))
+    notification_buffer_max_size: int = int(os.getenv("NOTIFICATION_BUFFER_MAX_SIZE", "500"))
+    notification_buffer_max_retries: int = int(os.getenv("NOTIFICATION_BUFFER_MAX_RETRIES", "5"))
+
+    # Retention purge: per-table TTLs (0 keeps rows forever), batch size and PostgreSQL partition management
+    notification_retention_days: int = int(os.getenv("NOTIFICATION_RETENTION_DAYS", "30"))
+    reply_log_retention_days: int = int(os.getenv("REPLY_LOG_RETENTION_DAYS", "90"))
+    failed_post_retention_days: int = int(os.getenv("FAILED_POST_RETENTION_DAYS", "30"))
+    temp_media_retention_hours: int = int(os.getenv("TEMP_MEDIA_RETENTION_HOURS", "24"))
+    retention_interval_seconds: int = int(os.getenv("RETENTION_INTERVAL_SECONDS", "3600"))
+    retention_batch_size: int = int(os.getenv("RETENTION_BATCH_SIZE", "1000"))
+    retention_batch_pause_seconds: float = float(os.getenv("RETENTION_BATCH_PAUSE_SECONDS", "0.2"))
+    retention_use_partitions: bool = os.getenv("RETENTION_USE_PARTITIONS", "False").lower() == "true"
+    retention_partitions_ahead: int = int(os.getenv("RETENTION_PARTITIONS_AHEAD", "2"))
+
     # Backend base URL for OAuth callbacks
     backend_base_url: str = os.getenv("BACKEND_BASE_URL", "https://localhost:8000")
 
+    # Content-addressed media store (files keyed by SHA-256) and its public URL base
+    media_store_path: str = os.getenv("MEDIA_STORE_PATH", "media_store")
+    media_public_base_url: str = os.getenv("MEDIA_PUBLIC_BASE_URL", os.getenv("BACKEND_BASE_URL", "https://localhost:8000"))
+    media_thumbnail_size: int = int(os.getenv("MEDIA_THUMBNAIL_SIZE", "320"))
+    # Uploads are spooled to disk in chunks of this size; large videos go to Cloudinary in chunks too
+    upload_spool_chunk_size: int = int(os.getenv("UPLOAD_SPOOL_CHUNK_SIZE", str(1024 * 1024)))
+    cloudinary_upload_chunk_size: int = int(os.getenv("CLOUDINARY_UPLOAD_CHUNK_SIZE", str(20 * 1024 * 1024)))
+    # Concurrent Cloudinary uploads, and how many content-hash -> URL entries to keep in memory
+    cloudinary_max_concurrency: int = int(os.getenv("CLOUDINARY_MAX_CONCURRENCY", "8"))
+    cloudinary_upload_cache_size: int = int(os.getenv("CLOUDINARY_UPLOAD_CACHE_SIZE", "10000"))
+    # "cloudinary" uses Cloudinary; "local" resizes/crops Instagram images with Pillow and serves them from
+    # /api/media, which needs a MEDIA_PUBLIC_BASE_URL that Instagram can reach (not localhost)
+    image_transform_backend: str = os.getenv("IMAGE_TRANSFORM_BACKEND", "cloudinary").lower()
+    image_transform_workers: int = int(os.getenv("IMAGE_TRANSFORM_WORKERS", str(os.cpu_count() or 2)))
+    image_max_output_bytes: int = int(os.getenv("IMAGE_MAX_OUTPUT_BYTES", str(8 * 1024 * 1024)))
+
+    # Cache of AI-generated images keyed by their generation parameters
+    generation_cache_enabled: bool = os.getenv("GENERATION_CACHE_ENABLED", "True").lower() == "true"
+    generation_cache_ttl_seconds: int = int(os.getenv("GENERATION_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+    generation_cache_max_entries: int = int(os.getenv("GENERATION_CACHE_MAX_ENTRIES", "5000"))
+    # Concurrent carousel image generations, and how long to wait for stragglers once enough images exist
+    carousel_generation_concurrency: int = int(os.getenv("CAROUSEL_GENERATION_CONCURRENCY", "4"))
+    carousel_straggler_grace_seconds: int = int(os.getenv("CAROUSEL_STRAGGLER_GRACE_SECONDS", "30"))
+
     # Environment
     environment: str = os.getenv("ENVIRONMENT", "development")
     debug: bool = os.getenv("DEBUG", "True").lower() == "true"
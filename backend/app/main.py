@@ -5,7 +5,9 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.responses import JSONResponse
 from app.config import get_settings
 from app.database import init_db, verify_db_connection
-from app.api import auth, social_media, ai, google_drive, webhook, google_oauth
+from app.api import auth, social_media, ai, google_drive, webhook, google_oauth, media
+from app.services.retention_service import retention_service
+from app.services.websocket_hub import websocket_hub
 import logging
 import asyncio
 import os
@@ -102,6 +104,12 @@ async def startup_event():
         logger.error(f"Database initialization error: {e}")
         # Don't fail startup for database issues
     
+    # Local image transforms need a media URL Instagram can fetch
+    try:
+        from app.services.image_transform_service import image_transform_service
+        image_transform_service.check_config()
+    except Exception as e:
+        logger.error(f"Failed to check image transform settings: {e}")
 
     
     # Start bulk composer scheduler for scheduled posts
@@ -115,14 +123,19 @@ async def startup_event():
     # Start auto-reply scheduler for Facebook comments
     try:
         from app.services.auto_reply_service import auto_reply_service
-        from app.database import get_db
+        from app.services.lease_service import lease_service
+        from app.database import SessionLocal
         async def auto_reply_scheduler():
             while True:
+                db = SessionLocal()
                 try:
-                    db = next(get_db())
-                    await auto_reply_service.process_auto_replies(db)
+                    # Only one replica sweeps comments, otherwise each would reply
+                    if lease_service.acquire_leadership(db, "facebook_auto_reply", ttl_seconds=180):
+                        await auto_reply_service.process_auto_replies(db)
                 except Exception as e:
                     logger.error(f"Error in auto-reply scheduler: {e}")
+                finally:
+                    db.close()
                 await asyncio.sleep(60)  
         asyncio.create_task(auto_reply_scheduler())
         logger.info("Auto-reply scheduler started for Facebook comments")
@@ -137,6 +150,35 @@ async def startup_event():
     except Exception as e:
         logger.error(f"Failed to start Instagram scheduler service: {e}")
 
+    # Start webhook ingestion queue consumers
+    try:
+        from app.services.webhook_queue_service import webhook_queue_service
+        asyncio.create_task(webhook_queue_service.start())
+        logger.info("Webhook queue consumers started")
+    except Exception as e:
+        logger.error(f"Failed to start webhook queue: {e}")
+
+    # Start the WebSocket hub (and its pub/sub subscription)
+    try:
+        await websocket_hub.start()
+    except Exception as e:
+        logger.error(f"Failed to start WebSocket hub: {e}")
+
+    # Start retention purge loop
+    try:
+        asyncio.create_task(retention_service.start())
+        logger.info("Retention purge loop started")
+    except Exception as e:
+        logger.error(f"Failed to start retention purge loop: {e}")
+
+    # Start pre-posting alert loop
+    try:
+        from app.services.pre_posting_alert_service import pre_posting_alert_service
+        asyncio.create_task(pre_posting_alert_service.start())
+        logger.info("Pre-posting alert loop started")
+    except Exception as e:
+        logger.error(f"Failed to start pre-posting alert loop: {e}")
+
     logger.info("Automation Dashboard API started successfully")
 
 
@@ -163,6 +205,60 @@ async def shutdown_event():
     except Exception as e:
         logger.error(f"Error stopping Instagram scheduler service: {e}")
 
+    # Stop webhook queue consumers
+    try:
+        from app.services.webhook_queue_service import webhook_queue_service
+        webhook_queue_service.stop()
+        logger.info("Webhook queue stopped")
+    except Exception as e:
+        logger.error(f"Error stopping webhook queue: {e}")
+
+    # Store and push notifications still waiting in the buffer
+    try:
+        from app.services.notification_buffer import notification_buffer
+        await notification_buffer.flush()
+        logger.info("Notification buffer flushed")
+    except Exception as e:
+        logger.error(f"Error flushing notification buffer: {e}")
+
+    # Close WebSocket connections and the pub/sub subscription
+    try:
+        await websocket_hub.stop()
+        logger.info("WebSocket hub stopped")
+    except Exception as e:
+        logger.error(f"Error stopping WebSocket hub: {e}")
+
+    # Stop retention purge loop
+    try:
+        retention_service.stop()
+        logger.info("Retention purge loop stopped")
+    except Exception as e:
+        logger.error(f"Error stopping retention purge loop: {e}")
+
+    # Stop pre-posting alert loop
+    try:
+        from app.services.pre_posting_alert_service import pre_posting_alert_service
+        pre_posting_alert_service.stop()
+        logger.info("Pre-posting alert loop stopped")
+    except Exception as e:
+        logger.error(f"Error stopping pre-posting alert loop: {e}")
+
+    # Release the Cloudinary upload workers
+    try:
+        from app.services.cloudinary_upload_service import cloudinary_upload_service
+        cloudinary_upload_service.shutdown()
+        logger.info("Cloudinary upload workers stopped")
+    except Exception as e:
+        logger.error(f"Error stopping Cloudinary upload workers: {e}")
+
+    # Close pooled outbound HTTP connections
+    try:
+        from app.services.http_client import http_client_service
+        await http_client_service.aclose()
+        logger.info("Shared HTTP client closed")
+    except Exception as e:
+        logger.error(f"Error closing shared HTTP client: {e}")
+
 
 # Health check endpoint
 @app.get("/")
@@ -183,7 +279,9 @@ async def health_check():
         "status": "healthy",
         "environment": settings.environment,
         "debug": settings.debug,
-        "database": "connected"
+        "database": "connected",
+        "websockets": websocket_hub.stats(),
+        "retention": retention_service.stats()
     }
 
 
@@ -223,6 +321,7 @@ app.include_router(ai.router, prefix="/api")
 app.include_router(google_drive.router)
 app.include_router(webhook.router, prefix="/api")
 app.include_router(google_oauth.router, prefix="/api")
+app.include_router(media.router, prefix="/api")
 
 # Import and include notification router
 from app.api import notifications
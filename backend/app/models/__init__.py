@@ -7,7 +7,14 @@ from .bulk_composer_content import BulkComposerContent, BulkComposerStatus
 from .scheduled_post import ScheduledPost, FrequencyType, PostType
 from .global_auto_reply_status import GlobalAutoReplyStatus
 from .dm_auto_reply_status import DmAutoReplyStatus
-from .instagram_auto_reply_log import InstagramAutoReplyLog
+from .instagram_auto_reply_log import AutoReplyLog, InstagramAutoReplyLog
 from app.database import Base
 from .single_instagram_post import SingleInstagramPost
-from .notification import Notification, NotificationPreferences
\ No newline at end of file
+from .notification import Notification, NotificationPreferences, NotificationUnreadCount
+from .scheduler_lease import SchedulerLease
+from .comment_cursor import CommentCursor
+from .webhook_event import WebhookEvent, WebhookEventStatus
+from .media_blob import MediaBlob
+from .cloudinary_upload import CloudinaryUpload
+from .generation_cache_entry import GenerationCacheEntry
+from .pre_posting_alert import PrePostingAlert, PrePostingAlertStatus
@@ -22,7 +22,8 @@ class BulkComposerContent(Base):
     
     # Content data
     caption = Column(Text, nullable=False)
-    media_file = Column(Text, nullable=True)  # Base64 encoded media
+    media_file = Column(Text, nullable=True)  # Media URL (legacy rows may still hold base64)
+    media_sha256 = Column(String(64), ForeignKey("media_blobs.sha256"), nullable=True, index=True)  # Media store reference
     media_filename = Column(String(255), nullable=True)
     media_generated = Column(Boolean, default=False)  # Whether media was AI-generated
     
@@ -39,6 +40,10 @@ class BulkComposerContent(Base):
     last_publish_attempt = Column(DateTime(timezone=True), nullable=True)
     error_message = Column(Text, nullable=True)
     
+    # Publishing lease so only one scheduler instance handles a due row
+    lease_owner = Column(String(255), nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True, index=True)
+    
     # Metadata
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
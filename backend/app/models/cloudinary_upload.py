@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, UniqueConstraint
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class CloudinaryUpload(Base):
+    """URL of media we already transformed and uploaded, keyed by content hash and transform."""
+    __tablename__ = "cloudinary_uploads"
+    __table_args__ = (
+        UniqueConstraint("content_sha256", "kind", name="uq_cloudinary_upload_content_kind"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    content_sha256 = Column(String(64), nullable=False, index=True)
+    kind = Column(String(20), nullable=False)  # "image", "video", "large_video", "thumbnail"; "local_" prefix for local transforms
+    secure_url = Column(Text, nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class CommentCursor(Base):
+    """Per-post position of the auto-reply comment sweep.
+
+    Remembers the newest comment seen on a post and when the post should be
+    checked next, so sweeps only revisit posts that are due for their tier.
+    """
+    __tablename__ = "comment_cursors"
+    __table_args__ = (
+        UniqueConstraint("social_account_id", "post_id", name="uq_comment_cursor_account_post"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    social_account_id = Column(Integer, ForeignKey("social_accounts.id"), nullable=False, index=True)
+    platform = Column(String(20), nullable=False)
+    post_id = Column(String, nullable=False)  # Facebook post ID or Instagram media ID
+
+    # Activity
+    post_created_at = Column(DateTime(timezone=True), nullable=True)
+    last_comment_id = Column(String, nullable=True)
+    last_comment_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Sweep bookkeeping
+    last_checked_at = Column(DateTime(timezone=True), nullable=True)
+    next_check_at = Column(DateTime(timezone=True), nullable=True, index=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
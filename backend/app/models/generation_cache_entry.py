@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Text, ForeignKey
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class GenerationCacheEntry(Base):
+    """AI-generated image cached by its generation parameters; the image itself lives in the media store."""
+    __tablename__ = "generation_cache"
+
+    cache_key = Column(String(64), primary_key=True)  # SHA-256 of engine + generation parameters
+    engine = Column(String(100), nullable=False)
+    prompt = Column(Text, nullable=False)
+    media_sha256 = Column(String(64), ForeignKey("media_blobs.sha256"), nullable=False)
+    seed = Column(BigInteger, nullable=True)
+    finish_reason = Column(String(50), nullable=True)
+
+    hit_count = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    last_used_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
@@ -1,9 +1,20 @@
 from sqlalchemy import Column, Integer, String, DateTime, func
 from app.database import Base
 
-class InstagramAutoReplyLog(Base):
+class AutoReplyLog(Base):
+    """Comments we have already auto-replied to, for every platform."""
     __tablename__ = "instagram_auto_reply_log"
     id = Column(Integer, primary_key=True)
     comment_id = Column(String, unique=True, index=True, nullable=False)
-    instagram_user_id = Column(String, nullable=False)
-    replied_at = Column(DateTime(timezone=True), server_default=func.now()) 
\ No newline at end of file
+    platform = Column(String(20), nullable=False, default="instagram", server_default="instagram", index=True)
+    # Instagram user id or Facebook page id that replied (column name kept for existing rows)
+    account_id = Column("instagram_user_id", String, nullable=False)
+    replied_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    @property
+    def instagram_user_id(self):
+        return self.account_id
+
+
+# Backwards-compatible name
+InstagramAutoReplyLog = AutoReplyLog
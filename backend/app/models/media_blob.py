@@ -0,0 +1,17 @@
+from sqlalchemy import Column, String, Integer, BigInteger, Boolean, DateTime
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class MediaBlob(Base):
+    """Metadata of a media file in the content-addressed media store."""
+    __tablename__ = "media_blobs"
+
+    sha256 = Column(String(64), primary_key=True)  # Hex digest of the content, also its storage key
+    content_type = Column(String(100), nullable=False)
+    size_bytes = Column(BigInteger, nullable=False)
+    has_thumbnail = Column(Boolean, default=False, nullable=False)
+    width = Column(Integer, nullable=True)
+    height = Column(Integer, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, Boolean, DateTime, ForeignKey, Enum, Integer
+from sqlalchemy import Column, String, Text, Boolean, DateTime, ForeignKey, Enum, Integer, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -17,6 +17,11 @@ class NotificationPlatform(enum.Enum):
 
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (
+        # Keyset pagination (newest first) and unread counts per user
+        Index("ix_notifications_user_created", "user_id", "created_at", "id"),
+        Index("ix_notifications_user_unread", "user_id", "is_read"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -46,4 +51,13 @@ class NotificationPreferences(Base):
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     # Relationships
-    user = relationship("User", back_populates="notification_preferences")
\ No newline at end of file
+    user = relationship("User", back_populates="notification_preferences")
+
+
+class NotificationUnreadCount(Base):
+    """Per-user unread counter, kept in step with notification inserts and reads."""
+    __tablename__ = "notification_unread_counts"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    unread_count = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,37 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, UniqueConstraint
+from sqlalchemy.sql import func
+from app.database import Base
+import enum
+
+
+class PrePostingAlertStatus(enum.Enum):
+    PENDING = "pending"
+    SENT = "sent"
+    SKIPPED = "skipped"  # Post no longer scheduled or alerts disabled at send time
+    FAILED = "failed"
+
+
+class PrePostingAlert(Base):
+    """A "your post goes out in 10 minutes" notification waiting to be sent."""
+    __tablename__ = "pre_posting_alerts"
+    __table_args__ = (
+        UniqueConstraint("post_kind", "post_id", name="uq_pre_posting_alert_post"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    post_kind = Column(String(20), nullable=False)  # "scheduled_post" or "bulk_composer"
+    post_id = Column(Integer, nullable=False)
+
+    # Delivery state
+    due_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    status = Column(String(20), default=PrePostingAlertStatus.PENDING.value, nullable=False, index=True)
+    attempts = Column(Integer, default=0, nullable=False)
+    last_error = Column(Text, nullable=True)
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Lease so only one instance delivers an alert
+    lease_owner = Column(String(255), nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True, index=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -55,6 +55,10 @@ class ScheduledPost(Base):
     last_executed = Column(DateTime(timezone=True), nullable=True)
     next_execution = Column(DateTime(timezone=True), nullable=True)
     
+    # Publishing lease so only one scheduler instance handles a due row
+    lease_owner = Column(String(255), nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True, index=True)
+    
     # Metadata
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, String, DateTime
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class SchedulerLease(Base):
+    """Named leadership lease used to elect a single scheduler instance."""
+    __tablename__ = "scheduler_leases"
+    
+    name = Column(String(100), primary_key=True)
+    owner = Column(String(255), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
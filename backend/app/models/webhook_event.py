@@ -0,0 +1,36 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON
+from sqlalchemy.sql import func
+from app.database import Base
+import enum
+
+
+class WebhookEventStatus(enum.Enum):
+    PENDING = "pending"
+    PROCESSING = "processing"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class WebhookEvent(Base):
+    """Raw webhook event waiting to be processed by the webhook consumers."""
+    __tablename__ = "webhook_events"
+
+    id = Column(Integer, primary_key=True, index=True)
+    source = Column(String(20), nullable=False)  # e.g. "instagram"
+    event_type = Column(String(20), nullable=False)  # "comment" or "dm"
+    # Comment/message id based key; redelivered events are dropped on insert
+    dedup_key = Column(String(255), unique=True, nullable=False, index=True)
+    payload = Column(JSON, nullable=False)
+
+    # Processing state
+    status = Column(String(20), default=WebhookEventStatus.PENDING.value, nullable=False, index=True)
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    last_error = Column(Text, nullable=True)
+    processed_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Consumer lease so only one instance handles an event at a time
+    lease_owner = Column(String(255), nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True, index=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,14 +1,18 @@
 import logging
-import httpx
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Set
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
 from app.models.automation_rule import AutomationRule, RuleType
 from app.models.social_account import SocialAccount
 from app.models.post import Post, PostStatus
+from app.models.comment_cursor import CommentCursor
 from app.services.facebook_service import facebook_service
 from app.services.groq_service import groq_service
 from app.services.facebook_message_auto_reply_service import facebook_message_auto_reply_service
+from app.services.http_client import http_client_service
+from app.services.graph_batch import graph_batch_service
+from app.services.replied_comment_store import replied_comment_store
+from app.services.comment_cursor_service import comment_cursor_service, parse_graph_timestamp
 
 logger = logging.getLogger(__name__)
 
@@ -72,50 +76,26 @@ class AutoReplyService:
             
             logger.info(f"✅ Found connected social account: {social_account.display_name}")
             
-            # Fetch all posts from Facebook for this page
-            async with httpx.AsyncClient() as client:
-                fb_posts_resp = await client.get(
-                    f"{self.graph_api_base}/{social_account.platform_user_id}/posts",
-                    params={
-                        "access_token": social_account.access_token,
-                        "fields": "id",
-                        "limit": 100  # adjust as needed
-                    }
-                )
-                if fb_posts_resp.status_code == 200:
-                    fb_posts_data = fb_posts_resp.json()
-                    selected_post_ids = [p["id"] for p in fb_posts_data.get("data", [])]
-                    logger.info(f"Found {len(selected_post_ids)} posts for page {social_account.platform_user_id} (from Facebook API)")
-                else:
-                    logger.error(f"Failed to fetch posts from Facebook: {fb_posts_resp.text}")
-                    selected_post_ids = []
+            # Start tracking posts published since the newest post we already know
+            await self._sync_post_cursors(social_account, db)
             
-            # If selected_post_ids is empty, process all posts for this page
-            if not selected_post_ids:
-                logger.info(f"No specific posts selected for rule {rule.id}, processing all posts for this page.")
-                # Fetch all published/scheduled posts for this social account
-                posts = db.query(Post).filter(
-                    Post.social_account_id == social_account.id,
-                    Post.status.in_([PostStatus.PUBLISHED, PostStatus.SCHEDULED])
-                ).all()
-                selected_post_ids = [post.platform_post_id for post in posts if post.platform_post_id]
-                logger.info(f"Found {len(selected_post_ids)} posts for page {social_account.platform_user_id}")
-            else:
-                logger.info(f"📋 Processing {len(selected_post_ids)} selected posts for auto-reply")
             # Get the last check time for this rule
             last_check = rule.last_execution_at or (datetime.utcnow() - timedelta(minutes=10))
-            logger.info(f"⏰ Last check: {last_check}, checking comments since then")
-            # Process comments for each selected post
-            for post_id in selected_post_ids:
-                logger.info(f"📝 Processing comments for post: {post_id}")
+            
+            # Only revisit posts whose sweep tier says they are due
+            due_cursors = comment_cursor_service.due_cursors(db, social_account.id)
+            if due_cursors:
+                logger.info(f"📋 Checking {len(due_cursors)} due posts for auto-reply")
                 await self._process_post_comments(
-                    post_id=post_id,
+                    cursors=due_cursors,
                     page_id=social_account.platform_user_id,
                     access_token=social_account.access_token,
                     rule=rule,
                     last_check=last_check,
                     db=db
                 )
+            else:
+                logger.info(f"📭 No posts due for a comment check on page {social_account.platform_user_id}")
             
             # Update last execution time
             rule.last_execution_at = datetime.utcnow()
@@ -125,36 +105,82 @@ class AutoReplyService:
         except Exception as e:
             logger.error(f"❌ Error processing rule {rule.id}: {e}")
     
+    async def _sync_post_cursors(self, social_account: SocialAccount, db: Session):
+        """Register comment cursors for page posts we are not tracking yet."""
+        latest_post_time = comment_cursor_service.latest_post_time(db, social_account.id)
+        params = {
+            "access_token": social_account.access_token,
+            "fields": "id,created_time",
+            "limit": 100
+        }
+        if latest_post_time:
+            params["since"] = int(latest_post_time.timestamp())
+        
+        async with http_client_service.session() as client:
+            fb_posts_resp = await client.get(
+                f"{self.graph_api_base}/{social_account.platform_user_id}/posts",
+                params=params
+            )
+        
+        if fb_posts_resp.status_code == 200:
+            posts = [
+                (p["id"], parse_graph_timestamp(p.get("created_time")))
+                for p in fb_posts_resp.json().get("data", [])
+            ]
+            logger.info(f"Found {len(posts)} new posts for page {social_account.platform_user_id} (from Facebook API)")
+        else:
+            logger.error(f"Failed to fetch posts from Facebook: {fb_posts_resp.text}")
+            posts = []
+        
+        # First sweep without Facebook results: fall back to the posts we published
+        if not posts and latest_post_time is None:
+            db_posts = db.query(Post).filter(
+                Post.social_account_id == social_account.id,
+                Post.status.in_([PostStatus.PUBLISHED, PostStatus.SCHEDULED])
+            ).all()
+            posts = [(post.platform_post_id, post.created_at) for post in db_posts if post.platform_post_id]
+            logger.info(f"Found {len(posts)} posts for page {social_account.platform_user_id}")
+        
+        comment_cursor_service.ensure_cursors(db, social_account, posts)
+    
     async def _process_post_comments(
         self, 
-        post_id: str, 
+        cursors: List[CommentCursor], 
         page_id: str, 
         access_token: str, 
         rule: AutomationRule,
         last_check: datetime,
         db: Session
     ):
-        """Process comments for a specific post."""
+        """Process new comments on the given posts using batched Graph lookups."""
         try:
-            since_param = int(last_check.timestamp())
-            
-            async with httpx.AsyncClient() as client:
-                # Get comments on this post since last check
-                comments_resp = await client.get(
-                    f"{self.graph_api_base}/{post_id}/comments",
-                    params={
-                        "access_token": access_token,
-                        "since": since_param,
+            # Get comments on each post since its cursor
+            relative_urls = [
+                graph_batch_service.relative_url(
+                    f"{cursor.post_id}/comments",
+                    {
+                        "since": int(comment_cursor_service.since(cursor, last_check).timestamp()),
                         "fields": "id,message,from,created_time,parent"
                     }
                 )
-                
-                if comments_resp.status_code != 200:
-                    logger.error(f"Failed to get comments for post {post_id}: {comments_resp.text}")
-                    return
-                
-                comments_data = comments_resp.json()
-                comments = comments_data.get("data", [])
+                for cursor in cursors
+            ]
+            bodies = await graph_batch_service.execute(relative_urls, access_token)
+            
+            # Posts whose lookup failed are left out and stay due for the next sweep
+            comments_by_post = {
+                cursor.post_id: body.get("data", [])
+                for cursor, body in zip(cursors, bodies) if body is not None
+            }
+            
+            # Collect the latest comment of each conversation thread
+            candidates = []
+            for cursor in cursors:
+                post_id = cursor.post_id
+                comments = comments_by_post.get(post_id)
+                if comments is None:
+                    logger.error(f"Failed to get comments for post {post_id}")
+                    continue
                 
                 logger.info(f"Found {len(comments)} new comments for post {post_id}")
                 
@@ -173,28 +199,52 @@ class AutoReplyService:
                         logger.info(f"⏭️ Skipping comment from our own page")
                         continue
                     
+                    candidates.append(latest_comment)
+            
+            if candidates:
+                # Look up already answered comments in one query and parents in batched requests
+                replied_ids = replied_comment_store.filter_handled(db, [comment["id"] for comment in candidates])
+                parent_ids = [
+                    comment["parent"]["id"] for comment in candidates
+                    if comment.get("parent") and comment["id"] not in replied_ids
+                ]
+                parents = await graph_batch_service.get_objects(
+                    parent_ids, access_token, params={"fields": "from,message"}
+                ) if parent_ids else {}
+            
+                for latest_comment in candidates:
+                    parent = parents.get(latest_comment["parent"]["id"]) if latest_comment.get("parent") else None
+                
                     # Check if we should reply to this comment
-                    should_reply = await self._should_reply_to_comment(
+                    should_reply = self._should_reply_to_comment(
                         latest_comment, 
-                        thread_comments, 
-                        access_token,
+                        replied_ids,
+                        parent,
                         page_id
                     )
-                    
+                
                     if should_reply:
                         logger.info(f"✅ Will reply to comment {latest_comment['id']}")
                         # Generate and post AI reply
                         await self._generate_and_post_reply(
                             comment=latest_comment,
+                            parent=parent,
                             access_token=access_token,
                             rule=rule,
-                            page_id=page_id
+                            page_id=page_id,
+                            db=db
                         )
                     else:
                         logger.info(f"⏭️ Skipping comment {latest_comment['id']} - no reply needed")
             
+            # Cursors only move on once their comments were handled, so a failed reply pass is retried next sweep
+            for cursor in cursors:
+                if cursor.post_id in comments_by_post:
+                    comment_cursor_service.advance(cursor, comments_by_post[cursor.post_id], "created_time")
+            db.commit()
+            
         except Exception as e:
-            logger.error(f"Error processing comments for post {post_id}: {e}")
+            logger.error(f"Error processing comments for {len(cursors)} posts: {e}")
     
     def _group_comments_by_thread(self, comments: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
         """
@@ -219,11 +269,11 @@ class AutoReplyService:
         
         return threads
     
-    async def _should_reply_to_comment(
+    def _should_reply_to_comment(
         self, 
         latest_comment: Dict[str, Any], 
-        thread_comments: List[Dict[str, Any]], 
-        access_token: str,
+        replied_ids: Set[str], 
+        parent: Optional[Dict[str, Any]],
         page_id: str
     ) -> bool:
         """
@@ -237,10 +287,9 @@ class AutoReplyService:
         """
         try:
             comment_id = latest_comment["id"]
-            commenter_id = latest_comment["from"]["id"]
             
             # Check if we already replied to this specific comment
-            if await self._has_replied_to_comment(comment_id, access_token):
+            if comment_id in replied_ids:
                 logger.info(f"Already replied to comment {comment_id}, skipping")
                 return False
             
@@ -251,32 +300,20 @@ class AutoReplyService:
             
             # If it's a reply, check if it's replying to our AI response
             parent_id = latest_comment["parent"]["id"]
+            if parent is None:
+                logger.warning(f"Could not get parent comment {parent_id}, skipping")
+                return False
             
-            # Get the parent comment to see who it's from
-            async with httpx.AsyncClient() as client:
-                parent_resp = await client.get(
-                    f"{self.graph_api_base}/{parent_id}",
-                    params={
-                        "access_token": access_token,
-                        "fields": "from,message"
-                    }
-                )
-                
-                if parent_resp.status_code == 200:
-                    parent_data = parent_resp.json()
-                    parent_from_id = parent_data.get("from", {}).get("id")
-                    parent_message = parent_data.get("message", "")
-                    
-                    # If parent is from our page and contains our AI signature, reply
-                    if parent_from_id == page_id and self._is_ai_response(parent_message):
-                        logger.info(f"Comment {comment_id} is replying to our AI response, will reply back")
-                        return True
-                    else:
-                        logger.info(f"Comment {comment_id} is replying to someone else, won't reply")
-                        return False
-                else:
-                    logger.warning(f"Could not get parent comment {parent_id}, skipping")
-                    return False
+            parent_from_id = parent.get("from", {}).get("id")
+            parent_message = parent.get("message", "")
+            
+            # If parent is from our page and contains our AI signature, reply
+            if parent_from_id == page_id and self._is_ai_response(parent_message):
+                logger.info(f"Comment {comment_id} is replying to our AI response, will reply back")
+                return True
+            else:
+                logger.info(f"Comment {comment_id} is replying to someone else, won't reply")
+                return False
                     
         except Exception as e:
             logger.error(f"Error determining if should reply to comment {latest_comment.get('id')}: {e}")
@@ -321,52 +358,14 @@ class AutoReplyService:
         logger.info(f"❌ Not an AI response: {message[:50]}...")
         return False
     
-    async def _has_replied_to_comment(self, comment_id: str, access_token: str) -> bool:
-        """Check if we already replied to a comment."""
-        try:
-            async with httpx.AsyncClient() as client:
-                # Get replies to this comment
-                replies_resp = await client.get(
-                    f"{self.graph_api_base}/{comment_id}/comments",
-                    params={
-                        "access_token": access_token,
-                        "fields": "from,message,created_time"
-                    }
-                )
-                
-                if replies_resp.status_code == 200:
-                    replies_data = replies_resp.json()
-                    replies = replies_data.get("data", [])
-                    
-                    logger.info(f"🔍 Checking {len(replies)} replies to comment {comment_id}")
-                    
-                    # Check if any of our AI replies exist
-                    for reply in replies:
-                        reply_message = reply.get("message", "")
-                        reply_from = reply.get("from", {})
-                        reply_from_id = reply_from.get("id", "")
-                        
-                        logger.info(f"🔍 Reply from {reply_from_id}: {reply_message[:50]}...")
-                        
-                        if self._is_ai_response(reply_message):
-                            logger.info(f"✅ Found existing AI reply to comment {comment_id}")
-                            return True
-                else:
-                    logger.warning(f"❌ Failed to get replies for comment {comment_id}: {replies_resp.status_code}")
-                
-                logger.info(f"❌ No AI reply found for comment {comment_id}")
-                return False
-                
-        except Exception as e:
-            logger.error(f"❌ Error checking replies for comment {comment_id}: {e}")
-            return False
-    
     async def _generate_and_post_reply(
         self, 
         comment: Dict[str, Any], 
+        parent: Optional[Dict[str, Any]],
         access_token: str, 
         rule: AutomationRule,
-        page_id: str
+        page_id: str,
+        db: Session
     ):
         """Generate AI reply and post it to Facebook."""
         try:
@@ -376,7 +375,7 @@ class AutoReplyService:
             comment_id = comment["id"]
             
             # Get conversation context for more intelligent responses
-            conversation_context = await self._get_conversation_context(comment_id, access_token, page_id)
+            conversation_context = self._get_conversation_context(comment, parent, page_id)
             
             # Generate AI reply with user mention and context
             reply_text = await self._generate_ai_reply(
@@ -387,7 +386,7 @@ class AutoReplyService:
             )
             
             # Post reply to Facebook
-            async with httpx.AsyncClient() as client:
+            async with http_client_service.session() as client:
                 reply_resp = await client.post(
                     f"{self.graph_api_base}/{comment_id}/comments",
                     data={
@@ -402,6 +401,9 @@ class AutoReplyService:
                     logger.info(f"📝 Reply: {reply_text}")
                     logger.info(f"💬 Context: {conversation_context}")
                     
+                    # Record the reply so later sweeps (on any replica) skip this comment
+                    replied_comment_store.mark_handled(db, "facebook", page_id, comment_id)
+                    
                     # Update rule statistics
                     rule.success_count += 1
                     rule.last_success_at = datetime.utcnow()
@@ -489,57 +491,37 @@ class AutoReplyService:
             # Fallback reply
             return f"@{commenter_name} Thanks for your comment! We appreciate your engagement. 😊"
 
-    async def _get_conversation_context(self, comment_id: str, access_token: str, page_id: str) -> str:
+    def _get_conversation_context(
+        self,
+        comment: Dict[str, Any],
+        parent: Optional[Dict[str, Any]],
+        page_id: str
+    ) -> str:
         """
         Get conversation context for more intelligent AI responses.
-        Returns a summary of the conversation thread.
+        Built from the comment and parent already fetched by the batched sweep.
         """
         try:
-            async with httpx.AsyncClient() as client:
-                # Get the comment and its replies
-                comment_resp = await client.get(
-                    f"{self.graph_api_base}/{comment_id}",
-                    params={
-                        "access_token": access_token,
-                        "fields": "message,from,parent"
-                    }
-                )
-                
-                if comment_resp.status_code != 200:
-                    return ""
-                
-                comment_data = comment_resp.json()
-                conversation_context = []
-                
-                # Add the current comment
-                commenter_name = comment_data.get("from", {}).get("name", "User")
-                comment_text = comment_data.get("message", "")
-                conversation_context.append(f"{commenter_name}: {comment_text}")
-                
-                # If it's a reply, get the parent comment context
-                if comment_data.get("parent"):
-                    parent_id = comment_data["parent"]["id"]
-                    parent_resp = await client.get(
-                        f"{self.graph_api_base}/{parent_id}",
-                        params={
-                            "access_token": access_token,
-                            "fields": "message,from"
-                        }
-                    )
-                    
-                    if parent_resp.status_code == 200:
-                        parent_data = parent_resp.json()
-                        parent_from = parent_data.get("from", {})
-                        parent_name = parent_from.get("name", "Unknown")
-                        parent_message = parent_data.get("message", "")
-                        
-                        # Check if parent is from our page (AI response)
-                        if parent_from.get("id") == page_id:
-                            conversation_context.insert(0, f"AI: {parent_message}")
-                        else:
-                            conversation_context.insert(0, f"{parent_name}: {parent_message}")
+            conversation_context = []
+            
+            # Add the current comment
+            commenter_name = comment.get("from", {}).get("name", "User")
+            comment_text = comment.get("message", "")
+            conversation_context.append(f"{commenter_name}: {comment_text}")
+            
+            # If it's a reply, add the parent comment context
+            if parent:
+                parent_from = parent.get("from", {})
+                parent_name = parent_from.get("name", "Unknown")
+                parent_message = parent.get("message", "")
                 
-                return " | ".join(conversation_context)
+                # Check if parent is from our page (AI response)
+                if parent_from.get("id") == page_id:
+                    conversation_context.insert(0, f"AI: {parent_message}")
+                else:
+                    conversation_context.insert(0, f"{parent_name}: {parent_message}")
+            
+            return " | ".join(conversation_context)
                 
         except Exception as e:
             logger.error(f"Error getting conversation context: {e}")
@@ -1,21 +1,39 @@
 import asyncio
 import logging
+from collections import defaultdict
 from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Tuple
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.config import get_settings
+from app.database import get_db, SessionLocal
 from app.models.bulk_composer_content import BulkComposerContent, BulkComposerStatus
 from app.models.social_account import SocialAccount
 from app.services.facebook_service import facebook_service
-from app.services.cloudinary_service import cloudinary_service
+from app.services.cloudinary_upload_service import cloudinary_upload_service
 from app.services.notification_service import notification_service
+from app.services.due_time_queue import DueTimeQueue
+from app.services.lease_service import lease_service
+from app.services.media_store import media_store
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
 
 
 class BulkComposerScheduler:
     def __init__(self):
         self.is_running = False
-        self.check_interval = 300  # Check every 5 minutes instead of 60 seconds
+        self.check_interval = settings.scheduler_max_idle_seconds  # Safety sweep when nothing is due
+        self.lookahead_size = settings.scheduler_lookahead_size
+        self.lease_seconds = settings.scheduler_lease_seconds
+        self.due_queue = DueTimeQueue("bulk_composer", max_idle_seconds=self.check_interval)
+        self.max_concurrency = settings.bulk_publish_concurrency
+        self.per_account_concurrency = settings.bulk_publish_per_account_concurrency
+        self._global_semaphore: asyncio.Semaphore | None = None
+        self._account_semaphores: Dict[int, asyncio.Semaphore] = defaultdict(
+            lambda: asyncio.Semaphore(self.per_account_concurrency)
+        )
+        self._in_flight: set[int] = set()
         
     async def start(self):
         """Start the bulk composer scheduler."""
@@ -25,42 +43,203 @@ class BulkComposerScheduler:
         # Add initial delay to prevent immediate execution
         await asyncio.sleep(10)
         
+        asyncio.create_task(self.backfill_inline_media())
+        
         while self.is_running:
             try:
                 await self.process_due_posts()
-                await asyncio.sleep(self.check_interval)
+                self.load_upcoming_due_times()
             except Exception as e:
                 logger.error(f"Error in bulk composer scheduler: {str(e)}")
-                await asyncio.sleep(self.check_interval)
+                # Fall back to the idle sweep instead of spinning on stale due times
+                self.due_queue.reset([])
+            # Sleep until the next post is due or an endpoint changes the schedule
+            await self.due_queue.wait()
     
     def stop(self):
         """Stop the bulk composer scheduler."""
         self.is_running = False
+        self.due_queue.notify()
         logger.info("🛑 Stopping Bulk Composer Scheduler...")
     
+    def notify_schedule_changed(self, due_at: datetime | None = None):
+        """Wake the scheduler after posts were scheduled or rescheduled."""
+        self.due_queue.notify(due_at)
+    
+    def load_upcoming_due_times(self):
+        """Load the next ``lookahead_size`` due times into the due-time queue."""
+        db = SessionLocal()
+        try:
+            now = datetime.now(timezone.utc)
+            rows = db.query(BulkComposerContent.scheduled_datetime).filter(
+                BulkComposerContent.status == BulkComposerStatus.SCHEDULED.value,
+                BulkComposerContent.scheduled_datetime > now
+            ).order_by(BulkComposerContent.scheduled_datetime).limit(self.lookahead_size).all()
+            self.due_queue.reset(row.scheduled_datetime for row in rows)
+        finally:
+            db.close()
+    
+    async def backfill_inline_media(self, batch_size: int = 50) -> int:
+        """Move media still stored inline as base64 (older rows) into the media store.
+        
+        Runs in the background a batch at a time, so reads never write. Rows
+        currently leased for publishing are left for a later pass. Returns the
+        number of rows moved.
+        """
+        moved = 0
+        failed_ids: set[int] = set()
+        while self.is_running:
+            db = SessionLocal()
+            try:
+                now = datetime.now(timezone.utc)
+                rows = db.query(BulkComposerContent).filter(
+                    BulkComposerContent.media_file.like("data:%"),
+                    BulkComposerContent.id.notin_(list(failed_ids)),
+                    or_(BulkComposerContent.lease_expires_at.is_(None), BulkComposerContent.lease_expires_at < now)
+                ).order_by(BulkComposerContent.id).limit(batch_size).all()
+                if not rows:
+                    break
+                
+                stored_by_id = {}
+                for item in rows:
+                    try:
+                        stored_by_id[item.id] = await media_store.astore_data_url(item.media_file)
+                    except Exception as media_error:
+                        failed_ids.add(item.id)
+                        logger.error(f"Failed to move inline media of bulk composer content {item.id}: {media_error}")
+                
+                media_store.register_many(db, list(stored_by_id.values()))
+                for item in rows:
+                    stored = stored_by_id.get(item.id)
+                    if stored:
+                        item.media_sha256 = stored.sha256
+                        item.media_file = None
+                db.commit()
+                moved += len(stored_by_id)
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Error moving inline bulk composer media: {str(e)}")
+                break
+            finally:
+                db.close()
+        
+        if moved:
+            logger.info(f"📦 Moved inline media of {moved} bulk composer posts into the media store")
+        return moved
+    
     async def process_due_posts(self):
         """Process posts that are due to be published."""
+        db = None
         try:
-            # Get database session
+            # Only ids are loaded here; every worker re-reads its own row
             db = next(get_db())
             
-            # Find posts that are due to be published
+            # Without SKIP LOCKED (SQLite) only the elected leader publishes
+            if not lease_service.should_run(db, "bulk_composer_scheduler", self.check_interval * 2):
+                return
+            
+            # Claim due posts in batches so other replicas skip them and leases
+            # are not held by posts still queued behind the worker pool
             now = datetime.now(timezone.utc)
             logger.info(f"[DEBUG] Scheduler current UTC time: {now.isoformat()}")
-            due_posts = db.query(BulkComposerContent).filter(
-                BulkComposerContent.status == BulkComposerStatus.SCHEDULED.value,
-                BulkComposerContent.scheduled_datetime <= now
-            ).all()
-            
-            if due_posts:
-                logger.info(f"📅 Found {len(due_posts)} posts due for publishing")
-                for post in due_posts:
-                    logger.info(f"[DEBUG] Post ID {post.id} scheduled_datetime: {post.scheduled_datetime} (UTC)")
-                    await self.publish_post(post, db)
-            # Remove the else clause that logs "No posts due for publishing" every 60 seconds
+            seen_ids: set[int] = set()
+            while True:
+                claimed_ids = lease_service.claim_due_rows(
+                    db,
+                    BulkComposerContent,
+                    criteria=[
+                        BulkComposerContent.id.notin_(list(seen_ids)),
+                        BulkComposerContent.status == BulkComposerStatus.SCHEDULED.value,
+                        BulkComposerContent.scheduled_datetime <= now
+                    ],
+                    order_by=BulkComposerContent.scheduled_datetime,
+                    limit=self.max_concurrency * 2,
+                    lease_seconds=self.lease_seconds
+                )
+                # Rows claimed earlier in this sweep are excluded, so rows that stay scheduled are not retried in a loop
+                if not claimed_ids:
+                    break
+                seen_ids.update(claimed_ids)
+                
+                due_posts = db.query(
+                    BulkComposerContent.id,
+                    BulkComposerContent.social_account_id
+                ).filter(BulkComposerContent.id.in_(claimed_ids)).all()
+                logger.info(f"📅 Claimed {len(due_posts)} posts due for publishing")
+                await self.publish_posts_concurrently(due_posts)
                 
         except Exception as e:
             logger.error(f"Error processing due posts: {str(e)}")
+        finally:
+            if db:
+                db.close()
+    
+    async def publish_posts_concurrently(self, posts: List[Tuple[int, int]]):
+        """Publish (post_id, social_account_id) pairs through the bounded worker pool.
+        
+        At most ``max_concurrency`` posts are published at once overall and at most
+        ``per_account_concurrency`` per social account, so one busy page cannot
+        starve the others or trip Facebook's per-page rate limits.
+        """
+        if self._global_semaphore is None:
+            self._global_semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        tasks = []
+        for post_id, social_account_id in posts:
+            # Skip rows that a previous (still running) sweep is already publishing
+            if post_id in self._in_flight:
+                continue
+            self._in_flight.add(post_id)
+            tasks.append(asyncio.create_task(self._publish_worker(post_id, social_account_id)))
+        
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+    
+    async def _publish_worker(self, post_id: int, social_account_id: int):
+        """Publish one post using a dedicated database session."""
+        try:
+            async with self._global_semaphore, self._account_semaphores[social_account_id]:
+                db = SessionLocal()
+                try:
+                    post = db.query(BulkComposerContent).filter(
+                        BulkComposerContent.id == post_id,
+                        BulkComposerContent.status == BulkComposerStatus.SCHEDULED.value,
+                        BulkComposerContent.lease_owner == lease_service.instance_id
+                    ).first()
+                    if not post:
+                        # Deleted, already published or the lease was taken over
+                        return
+                    logger.info(f"[DEBUG] Post ID {post.id} scheduled_datetime: {post.scheduled_datetime} (UTC)")
+                    try:
+                        await self.publish_post(post, db)
+                    finally:
+                        lease_service.release(post)
+                        db.commit()
+                finally:
+                    db.close()
+        except Exception as e:
+            logger.error(f"❌ Worker failed for post {post_id}: {str(e)}")
+        finally:
+            self._in_flight.discard(post_id)
+    
+    async def resolve_media_url(self, post: BulkComposerContent) -> Tuple[str | None, str | None]:
+        """Public URL of a post's media as ``(url, error)``.
+        
+        Media is normally uploaded (or transformed) when the post is scheduled
+        and ``media_file`` holds the resulting URL, which is used as is. Only
+        media without a URL (legacy inline base64, or a stored blob) is
+        uploaded here.
+        """
+        if post.media_file and post.media_file.startswith(("http://", "https://")):
+            return post.media_file, None
+        if post.media_sha256:
+            media_source = str(media_store.path_for(post.media_sha256))
+        else:
+            media_source = post.media_file
+        upload_result = await cloudinary_upload_service.upload_image(media_source)
+        if upload_result.get("success"):
+            return upload_result["url"], None
+        return None, upload_result.get("error", "Cloudinary upload failed")
     
     async def publish_post(self, post: BulkComposerContent, db: Session):
         """Publish a single post to Facebook."""
@@ -83,14 +262,12 @@ class BulkComposerScheduler:
             post.last_publish_attempt = datetime.now(timezone.utc)
 
             # --- NEW LOGIC: Separate photo and text-only posts ---
-            if post.media_file:
+            if post.media_file or post.media_sha256:
                 # Photo post
-                upload_result = cloudinary_service.upload_image_with_instagram_transform(post.media_file)
-                if upload_result.get("success"):
-                    image_url = upload_result["url"]
-                else:
+                image_url, upload_error = await self.resolve_media_url(post)
+                if not image_url:
                     post.status = BulkComposerStatus.FAILED.value
-                    post.error_message = upload_result.get("error", "Cloudinary upload failed")
+                    post.error_message = upload_error
                     db.commit()
                     return
 
@@ -123,6 +300,7 @@ class BulkComposerScheduler:
                     await notification_service.send_success_notification(
                         db=db,
                         post_id=post.id,
+                        user_id=post.user_id,
                         platform="facebook",
                         strategy_name="Bulk Scheduled Post"
                     )
@@ -137,6 +315,7 @@ class BulkComposerScheduler:
                     await notification_service.send_failure_notification(
                         db=db,
                         post_id=post.id,
+                        user_id=post.user_id,
                         platform="facebook",
                         strategy_name="Bulk Scheduled Post",
                         error=error_message
@@ -156,25 +335,30 @@ class BulkComposerScheduler:
     
     async def retry_failed_posts(self):
         """Retry posts that failed to publish (up to 3 attempts)."""
+        db = None
         try:
             db = next(get_db())
             
-            # Find failed posts with less than 3 attempts
-            failed_posts = db.query(BulkComposerContent).filter(
+            # Reset failed posts with less than 3 attempts to scheduled; they are
+            # already past due, so the next claim picks them up
+            retried = db.query(BulkComposerContent).filter(
                 BulkComposerContent.status == BulkComposerStatus.FAILED.value,
                 BulkComposerContent.publish_attempts < 3
-            ).all()
+            ).update(
+                {"status": BulkComposerStatus.SCHEDULED.value},
+                synchronize_session=False
+            )
+            db.commit()
             
-            if failed_posts:
-                logger.info(f"🔄 Retrying {len(failed_posts)} failed posts")
-                
-                for post in failed_posts:
-                    # Reset status to scheduled for retry
-                    post.status = BulkComposerStatus.SCHEDULED.value
-                    await self.publish_post(post, db)
+            if retried:
+                logger.info(f"🔄 Retrying {retried} failed posts")
+                await self.process_due_posts()
                     
         except Exception as e:
             logger.error(f"Error retrying failed posts: {str(e)}")
+        finally:
+            if db:
+                db.close()
 
 
 # Create a singleton instance
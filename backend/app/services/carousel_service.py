@@ -0,0 +1,128 @@
+import asyncio
+import inspect
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+from app.config import get_settings
+from app.services.cloudinary_upload_service import cloudinary_upload_service
+from app.services.instagram_service import instagram_service
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Instagram carousels need at least this many images
+MIN_CAROUSEL_IMAGES = 3
+
+ProgressCallback = Callable[[Dict[str, Any]], Union[None, Awaitable[None]]]
+
+
+class CarouselGenerationService:
+    """
+    Generates the images of an AI carousel concurrently.
+
+    Each image is a "variation N" of the prompt, generated and uploaded as its
+    own task; at most ``CAROUSEL_GENERATION_CONCURRENCY`` run at once across
+    all carousels so the image provider is not flooded. Failures are tolerated
+    as long as ``min_count`` images succeed. Once that minimum is met,
+    stragglers get ``CAROUSEL_STRAGGLER_GRACE_SECONDS`` to finish before they
+    are cancelled.
+    """
+
+    def __init__(self):
+        self.concurrency = settings.carousel_generation_concurrency
+        self.straggler_grace_seconds = settings.carousel_straggler_grace_seconds
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _limiter(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._semaphore
+
+    @staticmethod
+    def variation_prompt(prompt: str, index: int) -> str:
+        return f"{prompt} - variation {index + 1}"
+
+    async def _generate_one(self, prompt: str, index: int, post_type: str) -> Dict[str, Any]:
+        async with self._limiter():
+            image_result = await instagram_service.generate_instagram_image_with_ai(
+                self.variation_prompt(prompt, index), post_type
+            )
+            if not image_result["success"]:
+                raise Exception(f"Image generation failed: {image_result.get('error')}")
+            upload_result = await cloudinary_upload_service.upload_image(
+                f"data:image/png;base64,{image_result['image_base64']}"
+            )
+            if not upload_result["success"]:
+                raise Exception(f"Image upload failed: {upload_result.get('error')}")
+            return {"url": upload_result["url"], "width": image_result.get("width"), "height": image_result.get("height")}
+
+    async def generate(
+        self,
+        prompt: str,
+        count: int,
+        post_type: str = "feed",
+        min_count: int = MIN_CAROUSEL_IMAGES,
+        on_progress: Optional[ProgressCallback] = None
+    ) -> Dict[str, Any]:
+        """Generate ``count`` carousel images, returning once the outcome is settled.
+
+        ``on_progress`` (sync or async) receives an event after every image
+        with its index, status and the running totals.
+        """
+        min_count = min(min_count, count)
+        tasks = {
+            asyncio.ensure_future(self._generate_one(prompt, index, post_type)): index
+            for index in range(count)
+        }
+        images: Dict[int, Dict[str, Any]] = {}
+        errors: List[str] = []
+        pending = set(tasks)
+        try:
+            while pending:
+                timeout = self.straggler_grace_seconds if len(images) >= min_count else None
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    logger.warning(f"⏱️ Giving up on {len(pending)} slow carousel images")
+                    break
+                for task in done:
+                    index = tasks[task]
+                    event = {"index": index, "total": count}
+                    try:
+                        images[index] = task.result()
+                        event.update(status="succeeded", url=images[index]["url"])
+                    except Exception as e:
+                        errors.append(str(e))
+                        event.update(status="failed", error=str(e))
+                        logger.error(f"❌ Carousel image {index + 1}/{count} failed: {e}")
+                    event.update(succeeded=len(images), failed=len(errors))
+                    if on_progress:
+                        outcome = on_progress(event)
+                        if inspect.isawaitable(outcome):
+                            await outcome
+                if len(images) + len(pending) < min_count:
+                    # The minimum can no longer be reached
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+
+        ordered = [images[index] for index in sorted(images)]
+        if len(ordered) < min_count:
+            return {
+                "success": False,
+                "error": f"Only {len(ordered)} of {count} carousel images were generated: {'; '.join(errors[:3])}",
+                "image_urls": [image["url"] for image in ordered]
+            }
+        logger.info(f"✅ Generated {len(ordered)}/{count} carousel images")
+        return {
+            "success": True,
+            "image_urls": [image["url"] for image in ordered],
+            "count": len(ordered),
+            "failed": len(errors),
+            "width": ordered[0]["width"],
+            "height": ordered[0]["height"]
+        }
+
+
+# Global carousel generation instance
+carousel_generation_service = CarouselGenerationService()
@@ -9,6 +9,14 @@ import os
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Reel format: 9:16 at 1080x1920, trimmed to 90s, mp4
+INSTAGRAM_VIDEO_TRANSFORMATION = [
+    {"width": 1080, "height": 1920, "crop": "fill"},
+    {"start_offset": "0", "end_offset": "90"},  # Trim to 90s
+    {"quality": "auto"},
+    {"fetch_format": "mp4"}
+]
+
 class CloudinaryService:
     """Helper for authenticated uploads to Cloudinary with Instagram transforms."""
 
@@ -55,12 +63,7 @@ class CloudinaryService:
             result = cloudinary.uploader.upload(
                 file_or_base64,
                 resource_type="video",
-                transformation=[
-                    {"width": 1080, "height": 1920, "crop": "fill"},
-                    {"start_offset": "0", "end_offset": "90"},  # Trim to 90s
-                    {"quality": "auto"},
-                    {"fetch_format": "mp4"}
-                ],
+                transformation=INSTAGRAM_VIDEO_TRANSFORMATION,
                 format="mp4"
             )
             return {"success": True, "url": result["secure_url"]}
@@ -68,6 +71,23 @@ class CloudinaryService:
             logger.error(f"Cloudinary video upload failed: {e}")
             return {"success": False, "error": str(e)}
 
+    def upload_large_video_with_instagram_transform(self, file_path: str) -> Dict:
+        """Upload a video file from disk in chunks (resumable), so it is never held in memory."""
+        if not self.is_configured():
+            return {"success": False, "error": "Cloudinary not configured"}
+        try:
+            result = cloudinary.uploader.upload_large(
+                file_path,
+                resource_type="video",
+                chunk_size=settings.cloudinary_upload_chunk_size,
+                transformation=INSTAGRAM_VIDEO_TRANSFORMATION,
+                format="mp4"
+            )
+            return {"success": True, "url": result["secure_url"]}
+        except Exception as e:
+            logger.error(f"Cloudinary chunked video upload failed: {e}")
+            return {"success": False, "error": str(e)}
+
     def upload_thumbnail_with_instagram_transform(self, image_data) -> Dict:
         """Upload a thumbnail image to Cloudinary with Instagram reel cover image requirements."""
         if not self.is_configured():
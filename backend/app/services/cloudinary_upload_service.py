@@ -0,0 +1,199 @@
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from cachetools import LRUCache
+from sqlalchemy.exc import IntegrityError
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models.cloudinary_upload import CloudinaryUpload
+from app.services.cloudinary_service import cloudinary_service
+from app.services.image_transform_service import image_transform_service
+from app.services.media_store import media_store
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Upload kinds and the (blocking) CloudinaryService method that performs each
+UPLOADERS = {
+    "image": cloudinary_service.upload_image_with_instagram_transform,
+    "video": cloudinary_service.upload_video_with_instagram_transform,
+    "large_video": cloudinary_service.upload_large_video_with_instagram_transform,
+    "thumbnail": cloudinary_service.upload_thumbnail_with_instagram_transform,
+}
+
+UploadSource = Union[bytes, str]
+
+
+class CloudinaryUploadService:
+    """
+    Non-blocking front end for ``CloudinaryService``.
+
+    Image and thumbnail transforms run locally (``ImageTransformService``) when
+    ``IMAGE_TRANSFORM_BACKEND=local``, Pillow is installed and
+    ``MEDIA_PUBLIC_BASE_URL`` is publicly reachable; the results are
+    served from our media endpoint and Cloudinary is only used for videos,
+    remote URLs, or as the configured backend.
+
+    The SDK calls run on a bounded thread pool (``CLOUDINARY_MAX_CONCURRENCY``)
+    so uploads never block the event loop, and batches are uploaded in
+    parallel. Bytes, data URLs and local files are hashed first; the
+    (hash, kind) -> secure_url mapping is persisted in ``cloudinary_uploads``
+    with an LRU in front, so identical media is uploaded once. Concurrent
+    uploads of the same content share a single request. Remote URLs are
+    passed through uncached since their content is unknown.
+    """
+
+    def __init__(self, max_workers: int = settings.cloudinary_max_concurrency):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="cloudinary")
+        self._cache: LRUCache = LRUCache(maxsize=settings.cloudinary_upload_cache_size)
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Tuple[str, str], asyncio.Future] = {}
+
+    # --- Hashing ---------------------------------------------------------
+
+    @staticmethod
+    def _hash_file(path: str) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @classmethod
+    def content_hash(cls, source: UploadSource) -> Optional[str]:
+        """SHA-256 of the media behind ``source``, or None if it cannot be known locally."""
+        if isinstance(source, (bytes, bytearray)):
+            return hashlib.sha256(source).hexdigest()
+        if isinstance(source, str):
+            if source.startswith("data:"):
+                data, _ = media_store.decode_data_url(source)
+                return hashlib.sha256(data).hexdigest()
+            if not source.startswith(("http://", "https://")) and os.path.isfile(source):
+                return cls._hash_file(source)
+        return None
+
+    # --- Persistent cache ------------------------------------------------
+
+    def _lookup(self, key: Tuple[str, str]) -> Optional[str]:
+        with self._lock:
+            url = self._cache.get(key)
+        if url:
+            return url
+        db = SessionLocal()
+        try:
+            row = db.query(CloudinaryUpload.secure_url).filter(
+                CloudinaryUpload.content_sha256 == key[0],
+                CloudinaryUpload.kind == key[1]
+            ).first()
+        finally:
+            db.close()
+        if row:
+            with self._lock:
+                self._cache[key] = row.secure_url
+            return row.secure_url
+        return None
+
+    def _remember(self, key: Tuple[str, str], url: str):
+        with self._lock:
+            self._cache[key] = url
+        db = SessionLocal()
+        try:
+            db.add(CloudinaryUpload(content_sha256=key[0], kind=key[1], secure_url=url))
+            db.commit()
+        except IntegrityError:
+            # Recorded concurrently by another replica
+            db.rollback()
+        finally:
+            db.close()
+
+    # --- Uploads ---------------------------------------------------------
+
+    async def _run(self, func, *args):
+        # Only the SDK calls use the bounded pool; hashing and cache lookups never queue behind uploads
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def _is_local(self, kind: str, source: UploadSource) -> bool:
+        if not image_transform_service.supports(kind):
+            return False
+        return not (isinstance(source, str) and source.startswith(("http://", "https://")))
+
+    async def _process(self, kind: str, source: UploadSource) -> Dict:
+        if self._is_local(kind, source):
+            return await image_transform_service.transform(kind, source)
+        return await self._run(UPLOADERS[kind], source)
+
+    async def _upload_and_remember(self, kind: str, source: UploadSource, key: Tuple[str, str]) -> Dict:
+        result = await self._process(kind, source)
+        if result.get("success"):
+            await asyncio.to_thread(self._remember, key, result["url"])
+        return result
+
+    async def upload(self, kind: str, source: UploadSource) -> Dict:
+        """Upload ``source`` with the Instagram transform for ``kind``, reusing earlier uploads of the same content.
+
+        Returns the ``CloudinaryService`` result shape (``success``/``url`` or
+        ``error``) plus ``cached`` telling whether Cloudinary was skipped.
+        """
+        if kind not in UPLOADERS:
+            return {"success": False, "error": f"Unknown upload kind '{kind}'"}
+        local = self._is_local(kind, source)
+        if not local and not cloudinary_service.is_configured():
+            return {"success": False, "error": "Cloudinary not configured"}
+
+        try:
+            content_hash = await asyncio.to_thread(self.content_hash, source)
+        except (OSError, ValueError) as e:
+            return {"success": False, "error": f"Could not read media: {e}"}
+        if content_hash is None:
+            result = await self._process(kind, source)
+            return {**result, "cached": False}
+
+        # Local and Cloudinary outputs differ, so they are cached separately
+        key = (content_hash, f"local_{kind}" if local else kind)
+        url = await asyncio.to_thread(self._lookup, key)
+        if url:
+            logger.info(f"♻️ Reusing {key[1]} upload for {content_hash[:12]}: {url}")
+            return {"success": True, "url": url, "cached": True}
+
+        future = self._in_flight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._upload_and_remember(kind, source, key))
+            self._in_flight[key] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+            cached = False
+        else:
+            cached = True
+        result = await asyncio.shield(future)
+        return {**result, "cached": cached and result.get("success", False)}
+
+    async def upload_many(self, kind: str, sources: Iterable[UploadSource]) -> List[Dict]:
+        """Upload several sources in parallel; results are in input order."""
+        return list(await asyncio.gather(*(self.upload(kind, source) for source in sources)))
+
+    async def upload_image(self, source: UploadSource) -> Dict:
+        return await self.upload("image", source)
+
+    async def upload_video(self, source: UploadSource) -> Dict:
+        return await self.upload("video", source)
+
+    async def upload_large_video(self, file_path: str) -> Dict:
+        return await self.upload("large_video", file_path)
+
+    async def upload_thumbnail(self, source: UploadSource) -> Dict:
+        return await self.upload("thumbnail", source)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+        image_transform_service.shutdown()
+
+
+# Global Cloudinary upload service instance
+cloudinary_upload_service = CloudinaryUploadService()
@@ -0,0 +1,152 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models.comment_cursor import CommentCursor
+from app.models.social_account import SocialAccount
+from app.services.due_time_queue import to_utc
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Posts whose last activity is younger than these ages use the hot/warm sweep interval
+HOT_ACTIVITY_AGE = timedelta(days=1)
+WARM_ACTIVITY_AGE = timedelta(days=7)
+
+
+def parse_graph_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """Parse Graph API timestamps like '2025-07-06T07:55:57+0000' or '...Z'."""
+    if not value:
+        return None
+    try:
+        if value.endswith('Z'):
+            value = value[:-1] + '+00:00'
+        elif value.endswith('+0000'):
+            value = value[:-5] + '+00:00'
+        return to_utc(datetime.fromisoformat(value))
+    except ValueError:
+        logger.warning(f"Could not parse Graph timestamp '{value}'")
+        return None
+
+
+class CommentCursorService:
+    """
+    Per-post comment cursors for the auto-reply sweeps.
+
+    Each post remembers the newest comment seen and when it is next due. Posts
+    with recent activity are revisited every sweep, older ones progressively
+    less often, so polling cost follows activity instead of catalogue size.
+    """
+
+    def check_interval(self, cursor: CommentCursor, now: datetime) -> timedelta:
+        """Sweep interval for a post, tiered by the age of its last activity."""
+        # When we started tracking the post is not activity; it only stands in for an unknown post time
+        post_time = cursor.post_created_at if cursor.post_created_at is not None else cursor.created_at
+        activity_times = [
+            to_utc(value) for value in (cursor.last_comment_at, post_time)
+            if value is not None
+        ]
+        last_activity = max(activity_times) if activity_times else now
+        age = now - last_activity
+        if age < HOT_ACTIVITY_AGE:
+            return timedelta(seconds=settings.comment_sweep_hot_seconds)
+        if age < WARM_ACTIVITY_AGE:
+            return timedelta(seconds=settings.comment_sweep_warm_seconds)
+        return timedelta(seconds=settings.comment_sweep_cold_seconds)
+
+    def latest_post_time(self, db: Session, social_account_id: int) -> Optional[datetime]:
+        """Creation time of the newest post we already track for an account."""
+        latest = db.query(func.max(CommentCursor.post_created_at)).filter(
+            CommentCursor.social_account_id == social_account_id
+        ).scalar()
+        return to_utc(latest) if latest else None
+
+    def untracked_post_ids(self, db: Session, social_account_id: int, post_ids: List[str]) -> List[str]:
+        """Which of ``post_ids`` have no cursor yet."""
+        known = {
+            row.post_id for row in db.query(CommentCursor.post_id).filter(
+                CommentCursor.social_account_id == social_account_id,
+                CommentCursor.post_id.in_(post_ids)
+            ).all()
+        }
+        return [post_id for post_id in post_ids if post_id not in known]
+
+    def ensure_cursors(
+        self,
+        db: Session,
+        social_account: SocialAccount,
+        posts: Iterable[Tuple[str, Optional[datetime]]]
+    ) -> int:
+        """Start tracking posts we have not seen yet. Returns how many were added."""
+        posts = {post_id: created_at for post_id, created_at in posts if post_id}
+        if not posts:
+            return 0
+
+        untracked = set(self.untracked_post_ids(db, social_account.id, list(posts)))
+        now = datetime.now(timezone.utc)
+        new_cursors = [
+            CommentCursor(
+                social_account_id=social_account.id,
+                platform=social_account.platform,
+                post_id=post_id,
+                post_created_at=created_at,
+                next_check_at=now
+            )
+            for post_id, created_at in posts.items() if post_id in untracked
+        ]
+        if not new_cursors:
+            return 0
+
+        try:
+            db.add_all(new_cursors)
+            db.commit()
+        except IntegrityError:
+            # Another sweep registered some of these posts first
+            db.rollback()
+            return 0
+        logger.info(f"📌 Tracking {len(new_cursors)} new posts for account {social_account.id}")
+        return len(new_cursors)
+
+    def due_cursors(
+        self,
+        db: Session,
+        social_account_id: int,
+        post_ids: Optional[List[str]] = None
+    ) -> List[CommentCursor]:
+        """Cursors of an account whose next check time has passed."""
+        now = datetime.now(timezone.utc)
+        query = db.query(CommentCursor).filter(
+            CommentCursor.social_account_id == social_account_id,
+            or_(CommentCursor.next_check_at.is_(None), CommentCursor.next_check_at <= now)
+        )
+        if post_ids is not None:
+            query = query.filter(CommentCursor.post_id.in_(post_ids))
+        return query.order_by(CommentCursor.next_check_at).all()
+
+    def since(self, cursor: CommentCursor, fallback: datetime) -> datetime:
+        """Only comments newer than this need to be looked at for the post."""
+        if cursor.last_comment_at:
+            return to_utc(cursor.last_comment_at)
+        if cursor.last_checked_at:
+            return to_utc(cursor.last_checked_at)
+        return to_utc(fallback)
+
+    def advance(self, cursor: CommentCursor, comments: List[Dict], timestamp_field: str):
+        """Move a cursor past the comments just fetched and schedule its next check (caller commits)."""
+        now = datetime.now(timezone.utc)
+        for comment in comments:
+            created_at = parse_graph_timestamp(comment.get(timestamp_field))
+            if created_at and (cursor.last_comment_at is None or created_at > to_utc(cursor.last_comment_at)):
+                cursor.last_comment_at = created_at
+                cursor.last_comment_id = comment.get("id")
+        cursor.last_checked_at = now
+        cursor.next_check_at = now + self.check_interval(cursor, now)
+
+
+# Global comment cursor service instance
+comment_cursor_service = CommentCursorService()
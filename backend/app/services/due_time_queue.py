@@ -0,0 +1,63 @@
+import asyncio
+import heapq
+import logging
+from datetime import datetime, timezone
+from typing import Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def to_utc(value: datetime) -> datetime:
+    """Normalize a datetime to aware UTC (naive values are assumed to be UTC)."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+class DueTimeQueue:
+    """Min-heap of upcoming due times that a scheduler loop sleeps on.
+
+    The scheduler loads the next N due times from the database, then calls
+    ``wait()`` which sleeps until the earliest one (or ``max_idle_seconds`` as a
+    safety sweep). API endpoints call ``notify()`` when they insert or change
+    rows so the loop wakes up immediately and re-reads the schedule.
+    """
+
+    def __init__(self, name: str, max_idle_seconds: float = 300):
+        self.name = name
+        self.max_idle_seconds = max_idle_seconds
+        self._heap: List[datetime] = []
+        self._wakeup = asyncio.Event()
+
+    def reset(self, due_times: Iterable[datetime]):
+        """Replace the known due times with a fresh snapshot from the database."""
+        self._heap = [to_utc(due_at) for due_at in due_times if due_at is not None]
+        heapq.heapify(self._heap)
+
+    def notify(self, due_at: Optional[datetime] = None):
+        """Wake the scheduler, optionally registering a new due time."""
+        if due_at is not None:
+            heapq.heappush(self._heap, to_utc(due_at))
+        self._wakeup.set()
+
+    def next_due(self) -> Optional[datetime]:
+        return self._heap[0] if self._heap else None
+
+    def seconds_until_next(self) -> float:
+        """Seconds to sleep before the next due time, capped at the idle sweep."""
+        next_due = self.next_due()
+        if next_due is None:
+            return self.max_idle_seconds
+        delay = (next_due - datetime.now(timezone.utc)).total_seconds()
+        return min(max(delay, 0), self.max_idle_seconds)
+
+    async def wait(self):
+        """Sleep until the earliest due time, a notify() call or the idle sweep."""
+        timeout = self.seconds_until_next()
+        if timeout > 0:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+                logger.debug(f"[{self.name}] woken up by schedule change")
+            except asyncio.TimeoutError:
+                pass
+        self._wakeup.clear()
@@ -1,5 +1,4 @@
 import logging
-import httpx
 import json
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
@@ -7,6 +6,7 @@ from sqlalchemy.orm import Session
 from app.models.automation_rule import AutomationRule
 from app.models.social_account import SocialAccount
 from app.services.groq_service import groq_service
+from app.services.http_client import http_client_service
 import asyncio
 
 logger = logging.getLogger(__name__)
@@ -16,7 +16,6 @@ GRAPH_API_BASE = "https://graph.facebook.com/v23.0"
 class FacebookMessageAutoReplyService:
     def __init__(self):
         self.conversation_sessions = {}  # Store conversation context per user
-        self.http_client = httpx.AsyncClient()  # Reuse this client
         
     async def process_page_messages(self, page_id: str, access_token: str, rule: AutomationRule):
         """
@@ -47,7 +46,7 @@ class FacebookMessageAutoReplyService:
         """
         try:
             # Try to get messages using the page's inbox
-            async with httpx.AsyncClient() as client:
+            async with http_client_service.session() as client:
                 # First, try to get the page's conversations
                 conv_response = await client.get(
                     f"{GRAPH_API_BASE}/{page_id}/conversations",
@@ -109,7 +108,7 @@ class FacebookMessageAutoReplyService:
         This uses different endpoints that might be available.
         """
         try:
-            async with httpx.AsyncClient() as client:
+            async with http_client_service.session() as client:
                 # Try to get the page's feed and look for comments
                 feed_response = await client.get(
                     f"{GRAPH_API_BASE}/{page_id}/feed",
@@ -214,7 +213,7 @@ class FacebookMessageAutoReplyService:
                 return not await self._has_replied_to_comment(message["message_id"], access_token)
             
             # For messages, check if we've already responded
-            async with httpx.AsyncClient() as client:
+            async with http_client_service.session() as client:
                 # Get recent messages in this conversation
                 msg_response = await client.get(
                     f"{GRAPH_API_BASE}/{conversation_id}/messages",
@@ -249,7 +248,7 @@ class FacebookMessageAutoReplyService:
         Check if we've already replied to a comment.
         """
         try:
-            async with httpx.AsyncClient() as client:
+            async with http_client_service.session() as client:
                 # Get the comment and its replies
                 comment_response = await client.get(
                     f"{GRAPH_API_BASE}/{comment_id}",
@@ -285,7 +284,7 @@ class FacebookMessageAutoReplyService:
             session = self.conversation_sessions.get(user_id, [])
             
             # Also get recent messages from Facebook
-            async with httpx.AsyncClient() as client:
+            async with http_client_service.session() as client:
                 msg_response = await client.get(
                     f"{GRAPH_API_BASE}/{conversation_id}/messages",
                     params={
@@ -374,7 +373,7 @@ class FacebookMessageAutoReplyService:
         """
         try:
             # Fetch the latest message to get the user ID
-            async with httpx.AsyncClient() as client:
+            async with http_client_service.session() as client:
                 msg_response = await client.get(
                     f"{GRAPH_API_BASE}/{conversation_id}/messages",
                     params={
@@ -413,7 +412,7 @@ class FacebookMessageAutoReplyService:
         Send a comment response to a post comment.
         """
         try:
-            async with httpx.AsyncClient() as client:
+            async with http_client_service.session() as client:
                 response = await client.post(
                     f"{GRAPH_API_BASE}/{comment_id}/comments",
                     data={
@@ -1,13 +1,12 @@
 import logging
-import httpx
 import os
-import aiohttp
 from typing import Optional, Dict, Any, List
 from datetime import datetime, timedelta
 from app.config import get_settings
 from app.services.groq_service import groq_service
-from app.services.fb_stability_service import stability_service
+from app.services.stability_service import stability_service
 from app.services.image_service import image_service
+from app.services.http_client import http_client_service
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -32,7 +31,7 @@ class FacebookService:
             Dict containing the long-lived token and expiration info
         """
         try:
-            async with httpx.AsyncClient() as client:
+            async with http_client_service.session() as client:
                 response = await client.get(
                     f"{self.graph_api_base}/oauth/access_token",
                     params={
@@ -131,7 +130,7 @@ class FacebookService:
             List of pages with long-lived page access tokens
         """
         try:
-            async with httpx.AsyncClient() as client:
+            async with http_client_service.session() as client:
                 response = await client.get(
                     f"{self.graph_api_base}/me/accounts",
                     params={
@@ -170,7 +169,7 @@ class FacebookService:
             Dict containing validation result and user/page info
         """
         try:
-            async with httpx.AsyncClient() as client:
+            async with http_client_service.session() as client:
                 # First try to get basic info without email (works for both users and pages)
                 response = await client.get(
                     f"{self.graph_api_base}/me",
@@ -230,7 +229,7 @@ class FacebookService:
             List of user's Facebook pages
         """
         try:
-            async with httpx.AsyncClient() as client:
+            async with http_client_service.session() as client:
                 response = await client.get(
                     f"{self.graph_api_base}/me/accounts",
                     params={
@@ -276,7 +275,7 @@ class FacebookService:
             Dict containing post creation result
         """
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
+            async with http_client_service.session() as client:
                 endpoint = f"{self.graph_api_base}/{page_id}/feed"
                 
                 data = {
@@ -697,7 +696,7 @@ class FacebookService:
                 reply_content = reply_result["content"]
             
             # Post reply to Facebook
-            async with httpx.AsyncClient() as client:
+            async with http_client_service.session() as client:
                 response = await client.post(
                     f"{self.graph_api_base}/{comment_id}/comments",
                     data={
@@ -916,7 +915,7 @@ class FacebookService:
         since_param = int(last_checked.timestamp()) if last_checked else int((datetime.utcnow() - timedelta(minutes=10)).timestamp())
 
         # 1. Get recent posts
-        async with httpx.AsyncClient() as client:
+        async with http_client_service.session() as client:
             posts_resp = await client.get(
                 f"{self.graph_api_base}/{page_id}/posts",
                 params={"access_token": access_token, "fields": "id,created_time"}
@@ -1001,25 +1000,22 @@ class FacebookService:
             import base64
             image_binary = base64.b64decode(base64_data)
             
-            # Create form data for multipart upload using aiohttp.FormData
-            import io
-            form_data = aiohttp.FormData()
-            form_data.add_field('source', io.BytesIO(image_binary), filename='image.jpg', content_type='image/jpeg')
-            form_data.add_field('message', message)
-            form_data.add_field('access_token', access_token)
-            
             url = f"https://graph.facebook.com/v20.0/{page_id}/photos"
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, data=form_data) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        logger.info(f"Successfully posted photo to Facebook: {result.get('id')}")
-                        return result
-                    else:
-                        error_text = await response.text()
-                        logger.error(f"Facebook photo post failed: {response.status} - {error_text}")
-                        raise Exception(f"Facebook API error: {response.status} - {error_text}")
+            async with http_client_service.session() as client:
+                response = await client.post(
+                    url,
+                    data={'message': message, 'access_token': access_token},
+                    files={'source': ('image.jpg', image_binary, 'image/jpeg')}
+                )
+                if response.status_code == 200:
+                    result = response.json()
+                    logger.info(f"Successfully posted photo to Facebook: {result.get('id')}")
+                    return result
+                else:
+                    error_text = response.text
+                    logger.error(f"Facebook photo post failed: {response.status_code} - {error_text}")
+                    raise Exception(f"Facebook API error: {response.status_code} - {error_text}")
                         
         except Exception as e:
             logger.error(f"Error posting photo to Facebook: {str(e)}")
@@ -1035,17 +1031,16 @@ class FacebookService:
                 'access_token': access_token
             }
             
-            import aiohttp
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, data=data) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        logger.info(f"Successfully posted text to Facebook: {result.get('id')}")
-                        return result
-                    else:
-                        error_text = await response.text()
-                        logger.error(f"Facebook text post failed: {response.status} - {error_text}")
-                        raise Exception(f"Facebook API error: {response.status} - {error_text}")
+            async with http_client_service.session() as client:
+                response = await client.post(url, data=data)
+                if response.status_code == 200:
+                    result = response.json()
+                    logger.info(f"Successfully posted text to Facebook: {result.get('id')}")
+                    return result
+                else:
+                    error_text = response.text
+                    logger.error(f"Facebook text post failed: {response.status_code} - {error_text}")
+                    raise Exception(f"Facebook API error: {response.status_code} - {error_text}")
                         
         except Exception as e:
             logger.error(f"Error posting text to Facebook: {str(e)}")
@@ -1056,7 +1051,7 @@ class FacebookService:
         Fetch all conversations for a Facebook Page.
         """
         try:
-            async with httpx.AsyncClient() as client:
+            async with http_client_service.session() as client:
                 response = await client.get(
                     f"{self.graph_api_base}/{page_id}/conversations",
                     params={
@@ -1079,7 +1074,7 @@ class FacebookService:
         Fetch messages in a conversation.
         """
         try:
-            async with httpx.AsyncClient() as client:
+            async with http_client_service.session() as client:
                 response = await client.get(
                     f"{self.graph_api_base}/{conversation_id}/messages",
                     params={
@@ -1102,7 +1097,7 @@ class FacebookService:
         Send a reply to a conversation (Page message).
         """
         try:
-            async with httpx.AsyncClient() as client:
+            async with http_client_service.session() as client:
                 response = await client.post(
                     f"{self.graph_api_base}/{conversation_id}/messages",
                     data={
@@ -0,0 +1,170 @@
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from sqlalchemy.exc import IntegrityError
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models.generation_cache_entry import GenerationCacheEntry
+from app.services.due_time_queue import to_utc
+from app.services.media_store import media_store
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class GenerationCache:
+    """
+    Persistent cache of AI-generated images keyed by their generation parameters.
+
+    Identical requests (same engine, prompt, negative prompt, size, cfg,
+    steps, seed and style) return the stored image instead of calling the
+    API again; concurrent identical requests share one generation. Entries
+    expire after ``GENERATION_CACHE_TTL_SECONDS`` and the least recently
+    used ones are evicted beyond ``GENERATION_CACHE_MAX_ENTRIES``. Image
+    bytes are kept in the media store.
+    """
+
+    def __init__(self):
+        self.enabled = settings.generation_cache_enabled
+        self.ttl = timedelta(seconds=settings.generation_cache_ttl_seconds)
+        self.max_entries = settings.generation_cache_max_entries
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key_for(engine: str, **params: Any) -> str:
+        """Stable key for an engine and its generation parameters."""
+        canonical = json.dumps({"engine": engine, **params}, sort_keys=True, default=str)
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    # --- Storage ---------------------------------------------------------
+
+    def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        db = SessionLocal()
+        try:
+            entry = db.query(GenerationCacheEntry).filter(GenerationCacheEntry.cache_key == key).first()
+            if not entry:
+                return None
+            now = datetime.now(timezone.utc)
+            path = media_store.path_for(entry.media_sha256)
+            if (entry.created_at and to_utc(entry.created_at) + self.ttl <= now) or not path.exists():
+                db.delete(entry)
+                db.commit()
+                return None
+            entry.hit_count += 1
+            entry.last_used_at = now
+            db.commit()
+            return {
+                "success": True,
+                "image_base64": base64.b64encode(path.read_bytes()).decode(),
+                "seed": entry.seed,
+                "finish_reason": entry.finish_reason,
+            }
+        finally:
+            db.close()
+
+    def _save(self, key: str, engine: str, prompt: str, result: Dict[str, Any]):
+        stored = media_store.store_bytes(base64.b64decode(result["image_base64"]), "image/png")
+        db = SessionLocal()
+        try:
+            media_store.register(db, stored)
+            try:
+                db.add(GenerationCacheEntry(
+                    cache_key=key,
+                    engine=engine,
+                    prompt=prompt,
+                    media_sha256=stored.sha256,
+                    seed=result.get("seed"),
+                    finish_reason=result.get("finish_reason")
+                ))
+                db.commit()
+            except IntegrityError:
+                db.rollback()
+            self._evict(db)
+        finally:
+            db.close()
+
+    def _evict(self, db):
+        """Drop expired entries and the least recently used ones beyond the size limit."""
+        cutoff = datetime.now(timezone.utc) - self.ttl
+        evicted = db.query(GenerationCacheEntry).filter(
+            GenerationCacheEntry.created_at < cutoff
+        ).delete(synchronize_session=False)
+        overflow = db.query(GenerationCacheEntry).count() - self.max_entries
+        if overflow > 0:
+            stale_keys = [
+                row.cache_key for row in db.query(GenerationCacheEntry.cache_key).order_by(
+                    GenerationCacheEntry.last_used_at
+                ).limit(overflow).all()
+            ]
+            evicted += db.query(GenerationCacheEntry).filter(
+                GenerationCacheEntry.cache_key.in_(stale_keys)
+            ).delete(synchronize_session=False)
+        db.commit()
+        if evicted:
+            self.evictions += evicted
+            logger.info(f"🧹 Evicted {evicted} generation cache entries")
+
+    # --- Lookup ----------------------------------------------------------
+
+    async def get_or_generate(
+        self,
+        engine: str,
+        params: Dict[str, Any],
+        generate: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """Return a cached generation for ``params`` or run ``generate`` and cache a successful result."""
+        if not self.enabled:
+            return await generate()
+
+        key = self.key_for(engine, **params)
+        try:
+            cached = await asyncio.to_thread(self._load, key)
+        except Exception as e:
+            logger.warning(f"Generation cache lookup failed: {e}")
+            cached = None
+        if cached:
+            self.hits += 1
+            logger.info(f"♻️ Generation cache hit for {engine}: {params.get('prompt', '')[:50]}...")
+            return {**cached, "cached": True}
+
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.hits += 1
+            return {**await asyncio.shield(future), "cached": True}
+
+        self.misses += 1
+        future = asyncio.ensure_future(generate())
+        self._in_flight[key] = future
+        try:
+            result = await asyncio.shield(future)
+        finally:
+            self._in_flight.pop(key, None)
+        if result.get("success") and result.get("image_base64"):
+            try:
+                await asyncio.to_thread(self._save, key, engine, params.get("prompt", ""), result)
+            except Exception as e:
+                logger.warning(f"Could not cache generated image: {e}")
+        return {**result, "cached": False}
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "evictions": self.evictions,
+        }
+
+
+# Global generation cache instance
+generation_cache = GenerationCache()
@@ -0,0 +1,132 @@
+import asyncio
+import json
+import logging
+import random
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urlencode
+
+import httpx
+
+from app.services.http_client import http_client_service
+
+logger = logging.getLogger(__name__)
+
+# Graph API rejects batches with more than 50 operations
+MAX_BATCH_SIZE = 50
+
+# Batch-level status codes worth retrying
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class GraphBatchService:
+    """
+    Graph API batch requests.
+
+    Packs up to 50 Graph calls into a single ``POST /?batch=`` request and
+    demultiplexes the per-operation responses, so comment sweeps over many
+    posts cost one round trip per 50 objects instead of one per object.
+    """
+
+    def __init__(self, graph_api_base: str = "https://graph.facebook.com/v23.0"):
+        self.graph_api_base = graph_api_base
+        self.max_retries = 3
+
+    @staticmethod
+    def relative_url(path: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """Build a batch ``relative_url`` such as ``123/comments?fields=id``."""
+        path = path.lstrip("/")
+        if not params:
+            return path
+        return f"{path}?{urlencode(params)}"
+
+    async def execute(self, relative_urls: List[str], access_token: str) -> List[Optional[Dict[str, Any]]]:
+        """
+        Run GET operations in batches and return their decoded bodies in order.
+
+        An entry is ``None`` when that operation failed (non-200 or missing
+        response); the failure is logged and does not affect the others.
+        """
+        chunks = [relative_urls[i:i + MAX_BATCH_SIZE] for i in range(0, len(relative_urls), MAX_BATCH_SIZE)]
+        results = await asyncio.gather(*[self._execute_chunk(chunk, access_token) for chunk in chunks])
+        return [body for chunk_result in results for body in chunk_result]
+
+    async def _execute_chunk(self, relative_urls: List[str], access_token: str) -> List[Optional[Dict[str, Any]]]:
+        batch = [{"method": "GET", "relative_url": url} for url in relative_urls]
+        data = {
+            "access_token": access_token,
+            "batch": json.dumps(batch),
+            "include_headers": "false",
+        }
+
+        retry_delay = 1
+        for attempt in range(self.max_retries):
+            try:
+                response = await http_client_service.client.post(f"{self.graph_api_base}/", data=data)
+                response.raise_for_status()
+                break
+            except httpx.HTTPError as e:
+                retryable = not isinstance(e, httpx.HTTPStatusError) or e.response.status_code in RETRYABLE_STATUS_CODES
+                if not retryable or attempt == self.max_retries - 1:
+                    logger.error(f"❌ Graph batch of {len(relative_urls)} requests failed: {e}")
+                    return [None] * len(relative_urls)
+                logger.warning(f"Graph batch failed (attempt {attempt + 1}/{self.max_retries}): {e}")
+                await asyncio.sleep(retry_delay + random.uniform(0, retry_delay / 2))
+                retry_delay *= 2
+
+        return [
+            self._decode(url, item)
+            for url, item in zip(relative_urls, self._pad(response.json(), len(relative_urls)))
+        ]
+
+    @staticmethod
+    def _pad(items: Any, size: int) -> List[Any]:
+        items = items if isinstance(items, list) else []
+        return items + [None] * (size - len(items))
+
+    @staticmethod
+    def _decode(relative_url: str, item: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        # Graph returns null for operations that timed out inside the batch
+        if not item:
+            logger.warning(f"⚠️ No batch response for {relative_url}")
+            return None
+        try:
+            body = json.loads(item.get("body") or "{}")
+        except ValueError:
+            body = {}
+        if item.get("code") != 200:
+            logger.warning(f"⚠️ Batch request {relative_url} failed ({item.get('code')}): {body.get('error', body)}")
+            return None
+        return body
+
+    async def get_objects(
+        self,
+        object_ids: Iterable[str],
+        access_token: str,
+        params: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Fetch several Graph objects by id. Failed lookups map to ``None``."""
+        ids = list(dict.fromkeys(object_ids))
+        bodies = await self.execute([self.relative_url(object_id, params) for object_id in ids], access_token)
+        return dict(zip(ids, bodies))
+
+    async def get_edges(
+        self,
+        object_ids: Iterable[str],
+        edge: str,
+        access_token: str,
+        params: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Optional[List[Dict[str, Any]]]]:
+        """Fetch the same edge (e.g. ``comments``) of several objects.
+
+        Returns the ``data`` list per object id, or ``None`` where the lookup failed.
+        """
+        ids = list(dict.fromkeys(object_ids))
+        bodies = await self.execute([self.relative_url(f"{object_id}/{edge}", params) for object_id in ids], access_token)
+        return {
+            object_id: (body.get("data", []) if body is not None else None)
+            for object_id, body in zip(ids, bodies)
+        }
+
+
+# Global Graph batch instance
+graph_batch_service = GraphBatchService()
@@ -1,5 +1,8 @@
+import asyncio
+import hashlib
+import json
 import logging
-from groq import Groq
+from groq import AsyncGroq
 from typing import Optional, Dict, Any
 from app.config import get_settings
 import re
@@ -13,6 +16,10 @@ class GroqService:
     
     def __init__(self):
         self.client = None
+        # Bounds concurrent completions so a burst of auto-replies cannot exhaust rate limits
+        self._semaphore = asyncio.Semaphore(settings.groq_max_concurrency)
+        # Completions currently in flight, keyed by a hash of their request parameters
+        self._in_flight: Dict[str, asyncio.Task] = {}
         self._initialize_client()
     
     def _initialize_client(self):
@@ -22,13 +29,45 @@ class GroqService:
                 logger.warning("Groq API key not configured")
                 return
             
-            self.client = Groq(api_key=settings.groq_api_key)
+            self.client = AsyncGroq(
+                api_key=settings.groq_api_key,
+                timeout=settings.groq_timeout_seconds
+            )
             logger.info("Groq client initialized successfully")
             
         except Exception as e:
             logger.error(f"Failed to initialize Groq client: {e}")
             self.client = None
     
+    async def _create_completion(self, **params):
+        """
+        Create a chat completion without blocking the event loop.
+        
+        Concurrent calls with identical parameters are coalesced: the first caller
+        starts the request and later callers await the same result.
+        """
+        key = hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._run_completion(params))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._forget_in_flight(key, done))
+        else:
+            logger.info("Coalescing identical in-flight Groq completion")
+        # Shield so one caller being cancelled does not cancel the shared request
+        return await asyncio.shield(task)
+    
+    async def _run_completion(self, params: Dict[str, Any]):
+        async with self._semaphore:
+            return await self.client.chat.completions.create(**params)
+    
+    def _forget_in_flight(self, key: str, task: asyncio.Task):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Mark the exception as retrieved in case every waiting caller was cancelled
+        if not task.cancelled():
+            task.exception()
+    
     async def generate_facebook_post(
         self, 
         prompt: str, 
@@ -54,7 +93,7 @@ class GroqService:
             system_prompt = self._get_facebook_system_prompt(content_type, max_length)
             
             # Generate content using Groq
-            completion = self.client.chat.completions.create(
+            completion = await self._create_completion(
                 model="llama3-70b-8192",  # Fast and efficient model
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -180,7 +219,7 @@ Guidelines:
 
 Generate a personalized response to the following comment:"""
             
-            completion = self.client.chat.completions.create(
+            completion = await self._create_completion(
                 model="llama3-70b-8192",
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -272,7 +311,7 @@ Generate a personalized response to the following comment:"""
         """
 
             # Generate content using Groq
-            completion = self.client.chat.completions.create(
+            completion = await self._create_completion(
                 model="llama3-70b-8192",  # Fast and efficient model
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -352,7 +391,7 @@ Generate a caption that follows the custom strategy template."""
             user_prompt = f"Create a Facebook caption for: {context}" if context else "Create a Facebook caption following the custom strategy."
 
             # Generate content using Groq
-            completion = self.client.chat.completions.create(
+            completion = await self._create_completion(
                 model="llama-3.1-8b-instant",
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -476,7 +515,7 @@ Make sure the caption is engaging, on-brand, and encourages interaction. Keep it
 """
 
             # Generate content using Groq
-            completion = self.client.chat.completions.create(
+            completion = await self._create_completion(
                 model="llama3-70b-8192",
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -0,0 +1,90 @@
+import asyncio
+import logging
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+import httpx
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+GRAPH_API_HOST = "graph.facebook.com"
+
+
+class HostLimitedTransport(httpx.AsyncBaseTransport):
+    """Transport wrapper that caps concurrent in-flight requests per host."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, max_per_host: int):
+        self._transport = transport
+        self._semaphores: Dict[str, asyncio.Semaphore] = defaultdict(
+            lambda: asyncio.Semaphore(max_per_host)
+        )
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        async with self._semaphores[request.url.host]:
+            return await self._transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+class HttpClientService:
+    """
+    Application-wide pooled HTTP client.
+
+    All Graph API (and other outbound) calls share one ``httpx.AsyncClient`` so
+    connections are kept alive and reused instead of paying a TCP+TLS handshake
+    per request. HTTP/2 is used when the ``h2`` package is installed.
+    """
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _build_client(self) -> httpx.AsyncClient:
+        try:
+            import h2  # noqa: F401
+            http2 = True
+        except ImportError:
+            logger.warning("h2 not installed; shared HTTP client falls back to HTTP/1.1")
+            http2 = False
+
+        transport = HostLimitedTransport(
+            httpx.AsyncHTTPTransport(
+                http2=http2,
+                retries=1,
+                limits=httpx.Limits(
+                    max_connections=settings.http_max_connections,
+                    max_keepalive_connections=settings.http_max_keepalive_connections,
+                    keepalive_expiry=settings.http_keepalive_expiry_seconds,
+                ),
+            ),
+            max_per_host=settings.http_max_requests_per_host,
+        )
+        return httpx.AsyncClient(
+            transport=transport,
+            timeout=httpx.Timeout(settings.http_timeout_seconds, connect=settings.http_connect_timeout_seconds),
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = self._build_client()
+        return self._client
+
+    @asynccontextmanager
+    async def session(self):
+        """Yield the shared client. Unlike ``async with httpx.AsyncClient()`` it is not closed on exit."""
+        yield self.client
+
+    async def aclose(self):
+        """Close pooled connections (called on application shutdown)."""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+
+# Global HTTP client instance
+http_client_service = HttpClientService()
@@ -0,0 +1,189 @@
+import asyncio
+import io
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Tuple, Union
+from urllib.parse import urlparse
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.services.media_store import media_store
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+try:
+    from PIL import Image, ImageFilter, ImageOps
+except ImportError:  # Local transforms are optional; Cloudinary is used instead
+    Image = None
+
+# Output size per transform, matching the Cloudinary transforms in cloudinary_service
+PRESETS: Dict[str, Tuple[int, int]] = {
+    "image": (1080, 1080),  # Instagram feed, 1:1
+    "thumbnail": (1080, 1920),  # Reel cover, 9:16
+}
+
+MAX_INPUT_PIXELS = 50_000_000
+# The crop window is chosen on a copy no larger than this, which is plenty for an edge map
+SALIENCY_SIZE = 256
+JPEG_QUALITIES = (90, 85, 80, 70, 60, 50)
+LOOPBACK_HOSTNAMES = {"localhost", "127.0.0.1", "0.0.0.0", "::1"}
+
+
+def is_public_url(url: str) -> bool:
+    """Whether a URL could be fetched from outside this machine (i.e. is not a loopback address)."""
+    hostname = (urlparse(url).hostname or "").lower()
+    return bool(hostname) and hostname not in LOOPBACK_HOSTNAMES and not hostname.endswith(".localhost")
+
+
+def _best_window(profile: list, window: int) -> int:
+    """Start of the ``window``-long run of ``profile`` with the largest sum."""
+    if window >= len(profile):
+        return 0
+    total = best = sum(profile[:window])
+    best_start = 0
+    for start in range(1, len(profile) - window + 1):
+        total += profile[start + window - 1] - profile[start - 1]
+        if total > best:
+            best, best_start = total, start
+    return best_start
+
+
+def smart_crop_box(image, target_width: int, target_height: int) -> Tuple[int, int, int, int]:
+    """Crop box with the target aspect ratio that keeps the most detailed region (like ``gravity: auto``)."""
+    width, height = image.size
+    target_ratio = target_width / target_height
+    if width / height > target_ratio:
+        crop_width, crop_height = round(height * target_ratio), height
+    else:
+        crop_width, crop_height = width, round(width / target_ratio)
+    if (crop_width, crop_height) == (width, height):
+        return 0, 0, width, height
+
+    scale = min(1.0, SALIENCY_SIZE / max(width, height))
+    small_size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    edges = image.convert("L").resize(small_size).filter(ImageFilter.FIND_EDGES)
+    if crop_width < width:
+        # Column means of the edge map, then the best horizontal window
+        profile = list(edges.resize((small_size[0], 1), Image.BOX).getdata())
+        left = round(_best_window(profile, max(1, round(crop_width * scale))) / scale)
+        left = min(left, width - crop_width)
+        return left, 0, left + crop_width, crop_height
+    profile = list(edges.resize((1, small_size[1]), Image.BOX).getdata())
+    top = round(_best_window(profile, max(1, round(crop_height * scale))) / scale)
+    top = min(top, height - crop_height)
+    return 0, top, crop_width, top + crop_height
+
+
+def transform_image(source: Union[bytes, str], preset: str, max_bytes: int) -> bytes:
+    """Fill-crop an image to a preset size and re-encode it as JPEG under ``max_bytes``.
+
+    Runs in a worker process, so it only takes picklable arguments (raw bytes
+    or a file path).
+    """
+    target_width, target_height = PRESETS[preset]
+    with Image.open(source if isinstance(source, str) else io.BytesIO(source)) as opened:
+        if opened.width * opened.height > MAX_INPUT_PIXELS:
+            raise ValueError(f"Image too large ({opened.width}x{opened.height})")
+        image = ImageOps.exif_transpose(opened)
+        if image.mode in ("RGBA", "LA", "P"):
+            image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, (255, 255, 255))
+            background.paste(image, mask=image.split()[-1])
+            image = background
+        else:
+            image = image.convert("RGB")
+
+    image = image.crop(smart_crop_box(image, target_width, target_height))
+    image = image.resize((target_width, target_height), Image.LANCZOS)
+
+    for quality in JPEG_QUALITIES:
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG", quality=quality, optimize=True, progressive=True)
+        if buffer.tell() <= max_bytes:
+            break
+    else:
+        raise ValueError(f"Could not encode image under {max_bytes} bytes")
+    return buffer.getvalue()
+
+
+class ImageTransformService:
+    """
+    Local replacement for Cloudinary's Instagram image transforms.
+
+    Transforms run in a process pool (``IMAGE_TRANSFORM_WORKERS``) so they are
+    CPU-parallel and never hold the GIL of the API process. Results go to the
+    content-addressed media store and are served from ``/api/media``, which
+    Instagram fetches directly. Opt in with ``IMAGE_TRANSFORM_BACKEND=local``;
+    it stays off while ``MEDIA_PUBLIC_BASE_URL`` points at localhost.
+    """
+
+    def __init__(self):
+        self.max_workers = settings.image_transform_workers
+        self.max_output_bytes = settings.image_max_output_bytes
+        self.requested = settings.image_transform_backend == "local"
+        self.public_base_url = is_public_url(settings.media_public_base_url)
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def enabled(self) -> bool:
+        return Image is not None and self.requested and self.public_base_url
+
+    def check_config(self):
+        """Log why local transforms are off when they were requested (called at startup)."""
+        if not self.requested:
+            return
+        if not self.public_base_url:
+            logger.warning(
+                f"IMAGE_TRANSFORM_BACKEND=local ignored: MEDIA_PUBLIC_BASE_URL ({settings.media_public_base_url}) "
+                "is not reachable by Instagram; using Cloudinary transforms"
+            )
+        elif Image is None:
+            logger.warning("IMAGE_TRANSFORM_BACKEND=local ignored: Pillow is not installed; using Cloudinary transforms")
+        else:
+            logger.info(f"Instagram images are transformed locally and served from {settings.media_public_base_url}")
+
+    def supports(self, kind: str) -> bool:
+        return self.enabled and kind in PRESETS
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def _store(self, data: bytes) -> str:
+        stored = media_store.store_bytes(data, "image/jpeg")
+        db = SessionLocal()
+        try:
+            media_store.register(db, stored)
+        finally:
+            db.close()
+        return stored.sha256
+
+    async def transform(self, kind: str, source: Union[bytes, str]) -> Dict:
+        """Transform bytes, a data URL or a local file and store the result.
+
+        Returns ``{"success", "url"}`` like ``CloudinaryService``, with the URL
+        pointing at our media endpoint.
+        """
+        try:
+            if isinstance(source, str) and source.startswith("data:"):
+                source, _ = await asyncio.to_thread(media_store.decode_data_url, source)
+            loop = asyncio.get_running_loop()
+            data = await loop.run_in_executor(self._pool(), transform_image, source, kind, self.max_output_bytes)
+            sha256 = await asyncio.to_thread(self._store, data)
+            url = media_store.url_for(sha256)
+            logger.info(f"🖼️ Transformed {kind} locally: {url}")
+            return {"success": True, "url": url}
+        except Exception as e:
+            logger.error(f"Local {kind} transform failed: {e}")
+            return {"success": False, "error": str(e)}
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+# Global image transform instance
+image_transform_service = ImageTransformService()
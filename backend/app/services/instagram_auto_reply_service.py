@@ -1,13 +1,16 @@
 import logging
 import asyncio
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Set
 from sqlalchemy.orm import Session
 from app.models.automation_rule import AutomationRule, RuleType
 from app.models.social_account import SocialAccount
 from app.models.post import Post
 from app.services.instagram_service import instagram_service, get_access_token_for_user, has_auto_reply, mark_auto_replied
 from app.services.groq_service import groq_service
+from app.services.replied_comment_store import replied_comment_store
+from app.services.comment_cursor_service import comment_cursor_service, parse_graph_timestamp
+from app.services.graph_batch import graph_batch_service
 from app.database import get_db
 import random
 
@@ -103,33 +106,59 @@ class InstagramAutoReplyService:
                 logger.error(f"❌ No page access token found for Instagram account {social_account.id}")
                 return
             
-            # Process comments for each selected post with distribution logic
+            # Start tracking newly selected posts, reading their publish time in one batch
+            untracked_ids = comment_cursor_service.untracked_post_ids(db, social_account.id, selected_post_ids)
+            if untracked_ids:
+                media = await graph_batch_service.get_objects(
+                    untracked_ids, page_access_token, params={"fields": "timestamp"}
+                )
+                comment_cursor_service.ensure_cursors(db, social_account, [
+                    (media_id, parse_graph_timestamp((media.get(media_id) or {}).get("timestamp")))
+                    for media_id in untracked_ids
+                ])
+            
+            # Only revisit posts whose sweep tier says they are due
+            due_cursors = comment_cursor_service.due_cursors(db, social_account.id, post_ids=selected_post_ids)
+            if not due_cursors:
+                logger.info(f"📭 No selected Instagram posts due for a comment check")
+            
+            # Process comments for each due post with distribution logic
             total_replies = 0
             max_replies_per_execution = 3  # Limit replies per execution to avoid spam
             
-            # Shuffle the post IDs to distribute replies across different posts
-            shuffled_post_ids = list(selected_post_ids)
-            random.shuffle(shuffled_post_ids)
+            # Shuffle the posts to distribute replies across different posts
+            random.shuffle(due_cursors)
+            
+            # Fetch comments for all due posts in batched Graph requests
+            comments_by_post = await instagram_service.get_comments_for_media(
+                [cursor.post_id for cursor in due_cursors], page_access_token, limit=25
+            ) if due_cursors else {}
             
-            for post_id in shuffled_post_ids:
+            for cursor in due_cursors:
                 if total_replies >= max_replies_per_execution:
                     logger.info(f"🛑 Reached maximum replies per execution ({max_replies_per_execution})")
                     break
+                
+                post_id = cursor.post_id
+                if post_id not in comments_by_post:
+                    # Lookup failed; the cursor stays due and is retried next sweep
+                    continue
                     
                 logger.info(f"📝 Processing comments for Instagram post: {post_id}")
                 replies_for_post = await self._process_post_comments(
                     post_id=post_id,
+                    comments=comments_by_post[post_id],
                     instagram_user_id=social_account.platform_user_id,
                     page_access_token=page_access_token,
                     rule=rule,
-                    last_check=last_check,
+                    last_check=comment_cursor_service.since(cursor, last_check),
                     db=db,
                     max_replies=max_replies_per_execution - total_replies
                 )
                 total_replies += replies_for_post
                 
-                if total_replies >= max_replies_per_execution:
-                    break
+                # Only processed posts move on; ones cut off by the reply limit stay due
+                comment_cursor_service.advance(cursor, comments_by_post[post_id], "timestamp")
             
             # Update last execution time
             rule.last_execution_at = datetime.utcnow()
@@ -142,6 +171,7 @@ class InstagramAutoReplyService:
     async def _process_post_comments(
         self, 
         post_id: str, 
+        comments: List[Dict[str, Any]],
         instagram_user_id: str,
         page_access_token: str, 
         rule: AutomationRule,
@@ -149,23 +179,15 @@ class InstagramAutoReplyService:
         db: Session,
         max_replies: int
     ):
-        """Process comments for a specific Instagram post."""
+        """Process the already fetched comments of a specific Instagram post."""
         try:
-            # Get comments for this Instagram post
-            comments_result = await instagram_service.get_comments(
-                instagram_user_id=instagram_user_id,
-                page_access_token=page_access_token,
-                media_id=post_id,
-                limit=25
-            )
-            
-            if not comments_result:
+            if not comments:
                 logger.info(f"📭 No comments found for Instagram post {post_id}")
                 return 0
             
             # Filter comments since last check
             recent_comments = []
-            for comment in comments_result:
+            for comment in comments:
                 try:
                     # Parse timestamp - Instagram uses ISO format
                     timestamp_str = comment.get('timestamp', '')
@@ -188,6 +210,9 @@ class InstagramAutoReplyService:
             
             logger.info(f"Found {len(recent_comments)} new comments for Instagram post {post_id}")
             
+            # Look up which of these comments were already answered in one query
+            handled_ids = replied_comment_store.filter_handled(db, [c.get('id') for c in recent_comments])
+            
             # Process each recent comment
             replies_for_post = 0
             for comment in recent_comments:
@@ -207,11 +232,10 @@ class InstagramAutoReplyService:
                     continue
                 
                 # Check if we should reply to this comment
-                should_reply = await self._should_reply_to_comment(
+                should_reply = self._should_reply_to_comment(
                     comment, 
-                    page_access_token,
                     instagram_user_id,
-                    db
+                    handled_ids
                 )
                 
                 if should_reply:
@@ -234,12 +258,11 @@ class InstagramAutoReplyService:
             logger.error(f"Error processing comments for Instagram post {post_id}: {e}")
             return 0
     
-    async def _should_reply_to_comment(
+    def _should_reply_to_comment(
         self, 
         comment: Dict[str, Any], 
-        page_access_token: str,
         instagram_user_id: str,
-        db: Session
+        handled_ids: Set[str]
     ) -> bool:
         """
         Determine if we should reply to an Instagram comment.
@@ -268,7 +291,7 @@ class InstagramAutoReplyService:
                 return False
             
             # Check if we already replied to this comment
-            if await has_auto_reply(comment_id, instagram_user_id, db):
+            if comment_id in handled_ids:
                 logger.info(f"Already replied to comment {comment_id}, skipping")
                 return False
             
@@ -339,49 +362,9 @@ class InstagramAutoReplyService:
         logger.info(f"❌ Not an AI response: {message[:50]}...")
         return False
     
-    async def _has_replied_to_comment(self, comment_id: str, page_access_token: str) -> bool:
-        """Check if we already replied to an Instagram comment."""
-        try:
-            # Store replied comment IDs with timestamps to allow expiration
-            # This prevents duplicate replies to the same comment
-            
-            # For now, we'll use a simple in-memory cache with expiration (in production, use database)
-            # In a real implementation, you'd store this in a database table
-            if not hasattr(self, '_replied_comments'):
-                self._replied_comments = {}
-            
-            # Check if comment was replied to recently (within 24 hours)
-            if comment_id in self._replied_comments:
-                reply_time = self._replied_comments[comment_id]
-                if datetime.utcnow() - reply_time < timedelta(hours=24):
-                    logger.info(f"Already replied to comment {comment_id} recently")
-                    return True
-                else:
-                    # Remove expired entry
-                    del self._replied_comments[comment_id]
-                    logger.info(f"Removed expired reply tracking for comment {comment_id}")
-            
-            return False
-                
-        except Exception as e:
-            logger.error(f"❌ Error checking replies for Instagram comment {comment_id}: {e}")
-            return False
-    
-    def _mark_comment_as_replied(self, comment_id: str):
-        """Mark a comment as replied to prevent duplicate replies."""
-        if not hasattr(self, '_replied_comments'):
-            self._replied_comments = {}
-        self._replied_comments[comment_id] = datetime.utcnow()
-        logger.info(f"Marked comment {comment_id} as replied at {datetime.utcnow()}")
-    
     def reset_replied_comments_cache(self):
-        """Reset the replied comments cache for testing purposes."""
-        if hasattr(self, '_replied_comments'):
-            self._replied_comments.clear()
-            logger.info("🧹 Reset replied comments cache")
-        else:
-            self._replied_comments = {}
-            logger.info("🧹 Initialized empty replied comments cache")
+        """Reset the in-memory replied comments index (the database log is kept)."""
+        replied_comment_store.clear_cache()
     
     async def _generate_and_post_reply(
         self, 
@@ -536,6 +519,7 @@ async def handle_incoming_comment_webhook(data):
     from app.models.social_account import SocialAccount
     from app.database import SessionLocal
     logger.info(f"[WEBHOOK] Received Instagram comment webhook: {data}")
+    errors = []
     for entry in data.get("entry", []):
         for change in entry.get("changes", []):
             if change.get("field") == "comments":
@@ -590,18 +574,24 @@ async def handle_incoming_comment_webhook(data):
                             logger.info(f"[WEBHOOK] Marked comment {comment_id} as replied.")
                         else:
                             logger.error(f"[WEBHOOK] Failed to post reply to comment {comment_id}: {api_response}")
+                            errors.append(f"Reply to comment {comment_id} failed: {api_response.get('error')}")
                     except Exception as e:
                         logger.error(f"[WEBHOOK] Exception during reply logic for comment {comment_id}: {e}")
                         logger.error(traceback.format_exc())
+                        errors.append(f"Reply to comment {comment_id} failed: {e}")
+    # Errors are reported so the webhook queue retries the event
+    if errors:
+        return {"status": "error", "detail": "; ".join(errors)}
+    return {"status": "processed"}
 
 async def handle_incoming_dm_webhook(data):
     """Process incoming Instagram webhook for new DMs and auto-reply if enabled."""
     import traceback
     from app.models.dm_auto_reply_status import DmAutoReplyStatus
     from app.models.social_account import SocialAccount
-    from app.database import get_db
+    from app.database import SessionLocal
 
-    db = next(get_db())
+    db = SessionLocal()
     logger.info("[WEBHOOK] === Start processing Instagram DM webhook ===")
     logger.debug(f"[WEBHOOK] Raw webhook data: {data}")
     try:
@@ -609,6 +599,7 @@ async def handle_incoming_dm_webhook(data):
             logger.error(f"[WEBHOOK] Invalid webhook payload: {data}")
             return {"status": "error", "detail": "Invalid payload structure"}
 
+        errors = []
         for entry in data.get("entry", []):
             for change in entry.get("changes", []):
                 value = change.get("value", {})
@@ -647,7 +638,7 @@ async def handle_incoming_dm_webhook(data):
                     continue
 
                 try:
-                    page_access_token = await get_access_token_for_user(recipient_id)
+                    page_access_token = get_access_token_for_user(recipient_id)
 
                     logger.info(f"[WEBHOOK] Generating AI reply for DM {message_id}...")
                     ai_result = await groq_service.generate_dm_reply(message_text)
@@ -677,18 +668,25 @@ async def handle_incoming_dm_webhook(data):
                             db.rollback()
                     else:
                         logger.error(f"[WEBHOOK] Failed to send DM auto-reply to {sender_id} for message {message_id}: {send_result}")
+                        errors.append(f"DM reply to {message_id} failed: {send_result.get('error')}")
 
                 except Exception as e:
                     logger.error(f"[WEBHOOK] Exception during DM reply logic for message {message_id}: {e}")
                     logger.error(traceback.format_exc())
+                    errors.append(f"DM reply to {message_id} failed: {e}")
 
         logger.info("[WEBHOOK] === Finished processing Instagram DM webhook ===")
+        # Errors are reported so the webhook queue retries the event
+        if errors:
+            return {"status": "error", "detail": "; ".join(errors)}
         return {"status": "processed"}
 
     except Exception as e:
         logger.error(f"[WEBHOOK] Fatal error in DM webhook handler: {e}")
         logger.error(traceback.format_exc())
         return {"status": "error", "detail": str(e)}
+    finally:
+        db.close()
 
 async def enable_global_auto_reply(instagram_user_id: str, user):
     from app.models.global_auto_reply_status import GlobalAutoReplyStatus
@@ -696,24 +694,29 @@ async def enable_global_auto_reply(instagram_user_id: str, user):
     with SessionLocal() as db:
         GlobalAutoReplyStatus.set_enabled(user.id, instagram_user_id, True, db)
     page_access_token = get_access_token_for_user(instagram_user_id)
-    posts = instagram_service.get_user_media(instagram_user_id, page_access_token, limit=100)
+    posts = await instagram_service.get_user_media(instagram_user_id, page_access_token, limit=100)
     total_posts = len(posts)
     global_auto_reply_progress[instagram_user_id] = {"status": "processing", "current_post": 0, "total_posts": total_posts, "current_comment": 0, "total_comments": 0}
     logger.info(f"Processing {total_posts} posts for auto-reply")
+    comments_by_media = await instagram_service.get_comments_for_media(
+        [post.get('id') for post in posts], page_access_token, limit=100
+    )
     for i, post in enumerate(posts, 1):
         media_id = post.get('id')
         logger.info(f"Processing post {i}/{total_posts}: {media_id}")
-        comments = await instagram_service.get_comments(instagram_user_id, page_access_token, media_id=media_id, limit=100)
+        comments = comments_by_media.get(media_id, [])
         logger.info(f"Found {len(comments)} comments for post {media_id}")
         total_comments = len(comments)
         global_auto_reply_progress[instagram_user_id].update({"current_post": i, "total_posts": total_posts, "current_comment": 0, "total_comments": total_comments, "current_media_id": media_id})
+        with SessionLocal() as db:
+            handled_ids = replied_comment_store.filter_handled(db, [c.get('id') for c in comments])
         for j, comment in enumerate(comments, 1):
             logger.info(f"Processing comment {j}/{len(comments)}: {comment.get('id')}")
             global_auto_reply_progress[instagram_user_id]["current_comment"] = j
             commenter_id = comment.get('from', {}).get('id')
             if commenter_id == instagram_user_id:
                 continue  # Don't reply to own comment
-            if not await has_auto_reply(comment['id'], instagram_user_id, next(get_db())):
+            if comment['id'] not in handled_ids:
                 # Extract commenter name and create context
                 commenter_name = comment.get("from", {}).get("username", "there")
                 context = f"Instagram comment by {commenter_name}: {comment['text']}"
@@ -725,7 +728,8 @@ async def enable_global_auto_reply(instagram_user_id: str, user):
                     page_access_token=page_access_token,
                     message=reply
                 )
-                await mark_auto_replied(comment['id'], instagram_user_id, next(get_db()))
+                with SessionLocal() as db:
+                    await mark_auto_replied(comment['id'], instagram_user_id, db)
     global_auto_reply_progress[instagram_user_id] = {"status": "done", "details": f"Processed {total_posts} posts."}
     # Start background monitoring (could be a background task, webhook, or polling)
     # await start_monitoring_comments(instagram_user_id, user) # Removed as per edit hint
@@ -766,15 +770,17 @@ async def poll_new_posts_and_comments(instagram_user_id: str, user, interval: in
         my_ig_user_id = account.platform_user_id if account else None
         while GlobalAutoReplyStatus.is_enabled(user.id, instagram_user_id, db):
             page_access_token = await get_access_token_for_user(instagram_user_id)
-            posts = instagram_service.get_user_media(instagram_user_id, page_access_token, limit=100)
-            for post in posts:
-                media_id = post.get('id')
-                comments = await instagram_service.get_comments(instagram_user_id, page_access_token, media_id=media_id, limit=100)
+            posts = await instagram_service.get_user_media(instagram_user_id, page_access_token, limit=100)
+            comments_by_media = await instagram_service.get_comments_for_media(
+                [post.get('id') for post in posts], page_access_token, limit=100
+            )
+            for comments in comments_by_media.values():
+                handled_ids = replied_comment_store.filter_handled(db, [c.get('id') for c in comments])
                 for comment in comments:
                     commenter_id = comment.get('from', {}).get('id')
                     if commenter_id == my_ig_user_id:
                         continue  # Don't reply to own comment
-                    if not await has_auto_reply(comment['id'], instagram_user_id, db):
+                    if comment['id'] not in handled_ids:
                         # Extract commenter name and create context
                         commenter_name = comment.get("from", {}).get("username", "there")
                         context = f"Instagram comment by {commenter_name}: {comment['text']}"
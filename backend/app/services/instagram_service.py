@@ -1,25 +1,24 @@
-import requests
+import asyncio
 import logging
+import random
+import httpx
 from typing import Dict, List, Optional, Tuple, Any
 from datetime import datetime, timedelta
+from urllib.parse import urlparse
 from app.config import get_settings
 from app.services.groq_service import groq_service
 from app.services.stability_service import stability_service
-from app.services.cloudinary_service import cloudinary_service
+from app.services.cloudinary_upload_service import cloudinary_upload_service
+from app.services.http_client import http_client_service
+from app.services.graph_batch import graph_batch_service
 import os
-import time
 import functools
 from cachetools import TTLCache
 
 # --- Instagram Auto-Reply Utilities ---
 from app.models.social_account import SocialAccount
 from app.database import get_db
-import threading
-from app.models.instagram_auto_reply_log import InstagramAutoReplyLog
-
-# In-memory set for replied comment IDs (thread-safe)
-_replied_comment_ids = set()
-_replied_comment_ids_lock = threading.Lock()
+from app.services.replied_comment_store import replied_comment_store
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -27,11 +26,14 @@ settings = get_settings()
 # Cache for API responses (5 minutes TTL)
 _api_cache = TTLCache(maxsize=100, ttl=300)
 
+# Graph API status codes worth retrying; other 4xx errors fail immediately
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
 
 def cache_api_response(func):
-    """Decorator to cache API responses for 5 minutes."""
+    """Decorator to cache async API responses for 5 minutes."""
     @functools.wraps(func)
-    def wrapper(*args, **kwargs):
+    async def wrapper(*args, **kwargs):
         args_str = str(args)
         kwargs_str = str(sorted(kwargs.items()))
         cache_key = f"{func.__name__}:{hash(args_str + kwargs_str)}"
@@ -40,12 +42,23 @@ def cache_api_response(func):
             logger.debug(f"Cache hit for {func.__name__}")
             return _api_cache[cache_key]
         
-        result = func(*args, **kwargs)
+        result = await func(*args, **kwargs)
         _api_cache[cache_key] = result
         return result
     return wrapper
 
 
+def _graph_error_message(error: httpx.HTTPError) -> Tuple[str, Dict]:
+    """Extract the Graph API error message (and raw error body) from an HTTP error."""
+    if isinstance(error, httpx.HTTPStatusError):
+        try:
+            error_data = error.response.json()
+        except ValueError:
+            error_data = {}
+        return error_data.get('error', {}).get('message', str(error)), error_data
+    return str(error), {}
+
+
 class InstagramService:
     """Service for Instagram API operations and integrations."""
     
@@ -54,30 +67,50 @@ class InstagramService:
         self.graph_url = "https://graph.facebook.com/v18.0"
         self.app_id = settings.facebook_app_id
         self.app_secret = settings.facebook_app_secret
-        self._session = requests.Session()
-        self._session.timeout = 30
+        self.request_timeout = 30
+        # Reel container status polling
+        self.container_poll_attempts = 10
+        self.container_poll_interval = 3
     
-    def _make_request(self, method: str, url: str, **kwargs) -> requests.Response:
-        """Make HTTP request with error handling and retries."""
+    async def _make_request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Make HTTP request with error handling and non-blocking retries."""
         max_retries = 3
         retry_delay = 1
+        kwargs.setdefault('timeout', self.request_timeout)
         
         for attempt in range(max_retries):
             try:
-                response = self._session.request(method, url, **kwargs)
+                response = await http_client_service.client.request(method, url, **kwargs)
                 response.raise_for_status()
                 return response
-            except requests.exceptions.RequestException as e:
-                if attempt == max_retries - 1:
+            except httpx.HTTPError as e:
+                retryable = not isinstance(e, httpx.HTTPStatusError) or e.response.status_code in RETRYABLE_STATUS_CODES
+                if not retryable or attempt == max_retries - 1:
                     raise e
                 logger.warning(f"Request failed (attempt {attempt + 1}/{max_retries}): {e}")
-                time.sleep(retry_delay)
+                # Exponential backoff with jitter, without blocking the event loop
+                await asyncio.sleep(retry_delay + random.uniform(0, retry_delay / 2))
                 retry_delay *= 2
         
-        raise requests.exceptions.RequestException("All retry attempts failed")
+        raise httpx.HTTPError("All retry attempts failed")
+    
+    async def _wait_for_container(self, creation_id: str, page_access_token: str) -> bool:
+        """Poll a media container until Instagram has finished processing it."""
+        for attempt in range(self.container_poll_attempts):
+            status_response = await self._make_request('GET', f"{self.graph_url}/{creation_id}", 
+                                                       params={'access_token': page_access_token, 'fields': 'status_code'})
+            status_data = status_response.json()
+            status_code = status_data.get('status_code')
+            if status_code in ('FINISHED', 'READY', 'PUBLISHED'):
+                return True
+            if status_code in ('ERROR', 'EXPIRED'):
+                logger.error(f"Instagram container {creation_id} processing failed: {status_data}")
+                return False
+            await asyncio.sleep(self.container_poll_interval)
+        return False
     
     @cache_api_response
-    def exchange_for_long_lived_token(self, short_lived_token: str, app_id: str, app_secret: str) -> Tuple[str, datetime]:
+    async def exchange_for_long_lived_token(self, short_lived_token: str, app_id: str, app_secret: str) -> Tuple[str, datetime]:
         """Exchange short-lived token for long-lived token (60 days)"""
         try:
             url = f"{self.graph_url}/oauth/access_token"
@@ -88,7 +121,7 @@ class InstagramService:
                 'fb_exchange_token': short_lived_token
             }
             
-            response = self._make_request('GET', url, params=params)
+            response = await self._make_request('GET', url, params=params)
             data = response.json()
             long_lived_token = data['access_token']
             expires_in = data.get('expires_in', 5184000)
@@ -97,18 +130,18 @@ class InstagramService:
             logger.info("Successfully exchanged for long-lived token")
             return long_lived_token, expires_at
             
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Token exchange failed: {e}")
             raise Exception(f"Failed to exchange token: {str(e)}")
     
     @cache_api_response
-    def verify_token_permissions(self, access_token: str) -> Dict:
+    async def verify_token_permissions(self, access_token: str) -> Dict:
         """Verify token has required permissions"""
         try:
             url = f"{self.graph_url}/me/permissions"
             params = {'access_token': access_token}
             
-            response = self._make_request('GET', url, params=params)
+            response = await self._make_request('GET', url, params=params)
             permissions_data = response.json()
             granted_permissions = [
                 perm['permission'] for perm in permissions_data.get('data', [])
@@ -133,8 +166,8 @@ class InstagramService:
                 'has_all_required': len(missing_permissions) == 0
             }
             
-        except requests.exceptions.RequestException as e:
-            if "400" in str(e):
+        except httpx.HTTPError as e:
+            if isinstance(e, httpx.HTTPStatusError) and e.response.status_code == 400:
                 logger.info("Instagram token detected - /me/permissions not available for Instagram tokens")
                 return {
                     'granted': ['instagram_basic', 'pages_read_engagement'],
@@ -146,10 +179,10 @@ class InstagramService:
                 raise Exception(f"Failed to verify permissions: {str(e)}")
     
     @cache_api_response
-    def get_facebook_pages_with_instagram(self, access_token: str) -> List[Dict]:
+    async def get_facebook_pages_with_instagram(self, access_token: str) -> List[Dict]:
         """Get Facebook Pages with Instagram Business accounts"""
         try:
-            perm_check = self.verify_token_permissions(access_token)
+            perm_check = await self.verify_token_permissions(access_token)
             if not perm_check['has_all_required']:
                 missing = ', '.join(perm_check['missing'])
                 raise Exception(f"Missing required permissions: {missing}. Please re-authorize the app.")
@@ -160,14 +193,14 @@ class InstagramService:
                 'fields': 'id,name,access_token,instagram_business_account{id,username,name,profile_picture_url,followers_count,media_count}'
             }
             
-            response = self._make_request('GET', url, params=params)
+            response = await self._make_request('GET', url, params=params)
             pages_data = response.json()
             pages = pages_data.get('data', [])
             
             if not pages:
                 raise Exception("No Facebook Pages found. You need Admin access to at least one Facebook Page.")
             
-            instagram_accounts = []
+            linked_pages = []
             pages_without_instagram = []
             
             for page in pages:
@@ -175,27 +208,35 @@ class InstagramService:
                 instagram_account = page.get('instagram_business_account')
                 
                 if instagram_account:
-                    page_token = page.get('access_token')
-                    if page_token:
-                        enhanced_account = self._get_enhanced_instagram_details(
-                            instagram_account['id'], 
-                            page_token
-                        )
-                        
-                        instagram_accounts.append({
-                            'platform_id': instagram_account['id'],
-                            'username': instagram_account.get('username', ''),
-                            'display_name': instagram_account.get('name', ''),
-                            'page_name': page_name,
-                            'page_id': page['id'],
-                            'followers_count': enhanced_account.get('followers_count', 0),
-                            'media_count': enhanced_account.get('media_count', 0),
-                            'profile_picture': enhanced_account.get('profile_picture_url', ''),
-                            'page_access_token': page_token
-                        })
+                    if page.get('access_token'):
+                        linked_pages.append(page)
                 else:
                     pages_without_instagram.append(page_name)
             
+            # Fetch account details for every linked page concurrently
+            enhanced_accounts = await asyncio.gather(*[
+                self._get_enhanced_instagram_details(
+                    page['instagram_business_account']['id'], 
+                    page['access_token']
+                )
+                for page in linked_pages
+            ])
+            
+            instagram_accounts = []
+            for page, enhanced_account in zip(linked_pages, enhanced_accounts):
+                instagram_account = page['instagram_business_account']
+                instagram_accounts.append({
+                    'platform_id': instagram_account['id'],
+                    'username': instagram_account.get('username', ''),
+                    'display_name': instagram_account.get('name', ''),
+                    'page_name': page.get('name', 'Unknown Page'),
+                    'page_id': page['id'],
+                    'followers_count': enhanced_account.get('followers_count', 0),
+                    'media_count': enhanced_account.get('media_count', 0),
+                    'profile_picture': enhanced_account.get('profile_picture_url', ''),
+                    'page_access_token': page['access_token']
+                })
+            
             if not instagram_accounts:
                 troubleshooting_msg = self._generate_troubleshooting_message(pages_without_instagram)
                 raise Exception(troubleshooting_msg)
@@ -203,15 +244,14 @@ class InstagramService:
             logger.info(f"Found {len(instagram_accounts)} Instagram Business accounts")
             return instagram_accounts
             
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Failed to fetch Instagram accounts: {e}")
-            if hasattr(e, 'response') and e.response:
-                error_data = e.response.json() if e.response.content else {}
-                error_msg = error_data.get('error', {}).get('message', str(e))
+            if isinstance(e, httpx.HTTPStatusError):
+                error_msg, _ = _graph_error_message(e)
                 raise Exception(f"Graph API Error: {error_msg}")
             raise Exception(f"Network error: {str(e)}")
     
-    def _get_enhanced_instagram_details(self, instagram_user_id: str, page_access_token: str) -> Dict:
+    async def _get_enhanced_instagram_details(self, instagram_user_id: str, page_access_token: str) -> Dict:
         """Get additional Instagram account details"""
         try:
             url = f"{self.graph_url}/{instagram_user_id}"
@@ -220,10 +260,10 @@ class InstagramService:
                 'fields': 'followers_count,media_count,profile_picture_url,biography'
             }
             
-            response = self._make_request('GET', url, params=params)
+            response = await self._make_request('GET', url, params=params)
             return response.json()
             
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.warning(f"Failed to get enhanced Instagram details: {e}")
             return {}
     
@@ -284,7 +324,7 @@ class InstagramService:
             final_video_url = None
             if is_reel:
                 if video_file_path and os.path.exists(video_file_path):
-                    upload_result = cloudinary_service.upload_video_with_instagram_transform(video_file_path)
+                    upload_result = await cloudinary_upload_service.upload_video(video_file_path)
                     if not upload_result["success"]:
                         return {"success": False, "error": f"Failed to upload video file: {upload_result.get('error', 'Unknown error')}"}
                     final_video_url = upload_result["url"]
@@ -311,13 +351,13 @@ class InstagramService:
                 if thumbnail_url and thumbnail_url.strip():
                     final_thumbnail_url = thumbnail_url.strip()
                 elif thumbnail_file_path and os.path.exists(thumbnail_file_path):
-                    upload_result = cloudinary_service.upload_image_with_instagram_transform(thumbnail_file_path)
+                    upload_result = await cloudinary_upload_service.upload_image(thumbnail_file_path)
                     if upload_result["success"]:
                         final_thumbnail_url = upload_result["url"]
                 elif thumbnail_filename:
                     thumb_path = os.path.join("temp_images", thumbnail_filename)
                     if os.path.exists(thumb_path):
-                        upload_result = cloudinary_service.upload_image_with_instagram_transform(thumb_path)
+                        upload_result = await cloudinary_upload_service.upload_image(thumb_path)
                         if upload_result["success"]:
                             final_thumbnail_url = upload_result["url"]
                 
@@ -332,15 +372,13 @@ class InstagramService:
                 
                 # Validate URL format
                 try:
-                    from urllib.parse import urlparse
                     parsed_url = urlparse(image_url)
                     if not parsed_url.scheme or not parsed_url.netloc:
                         return {"success": False, "error": "Invalid image URL format"}
                     
                     # Test if URL is accessible
-                    import requests
                     try:
-                        test_response = requests.head(image_url, timeout=10)
+                        test_response = await http_client_service.client.head(image_url, timeout=10)
                         if test_response.status_code != 200:
                             logger.warning(f"Image URL returned status {test_response.status_code}: {image_url}")
                     except Exception as url_test_error:
@@ -357,18 +395,15 @@ class InstagramService:
             logger.info(f"Media URL: {media_url}")
             
             try:
-                response = self._make_request('POST', media_url, data=media_params)
+                response = await self._make_request('POST', media_url, data=media_params)
                 media_result = response.json()
                 logger.info(f"Media creation response: {media_result}")
                 creation_id = media_result.get('id')
-            except requests.exceptions.RequestException as e:
+            except httpx.HTTPStatusError as e:
                 logger.error(f"Instagram media creation failed: {e}")
-                if hasattr(e, 'response') and e.response:
-                    error_data = e.response.json() if e.response.content else {}
-                    error_msg = error_data.get('error', {}).get('message', str(e))
-                    logger.error(f"Instagram API error details: {error_data}")
-                    return {"success": False, "error": f"Instagram API Error: {error_msg}"}
-                raise e
+                error_msg, error_data = _graph_error_message(e)
+                logger.error(f"Instagram API error details: {error_data}")
+                return {"success": False, "error": f"Instagram API Error: {error_msg}"}
             
             if not creation_id:
                 return {"success": False, "error": "No creation ID returned from Instagram API."}
@@ -381,19 +416,10 @@ class InstagramService:
             }
             
             # For reels, wait for processing
-            if is_reel:
-                max_attempts = 10
-                for attempt in range(max_attempts):
-                    status_response = self._make_request('GET', f"{self.graph_url}/{creation_id}", 
-                                                      params={'access_token': page_access_token, 'fields': 'status_code'})
-                    status_data = status_response.json()
-                    if status_data.get('status_code') in ('FINISHED', 'READY', 'PUBLISHED'):
-                        break
-                    time.sleep(3)
-                else:
-                    return {"success": False, "error": "Media not ready to publish after waiting."}
+            if is_reel and not await self._wait_for_container(creation_id, page_access_token):
+                return {"success": False, "error": "Media not ready to publish after waiting."}
             
-            publish_response = self._make_request('POST', publish_url, data=publish_params)
+            publish_response = await self._make_request('POST', publish_url, data=publish_params)
             publish_result = publish_response.json()
             
             return {
@@ -403,14 +429,14 @@ class InstagramService:
                 "reel_thumbnail_url": final_thumbnail_url if is_reel else None
             }
             
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Network error creating Instagram post: {e}")
             return {"success": False, "error": f"Network error: {str(e)}"}
         except Exception as e:
             logger.error(f"Unexpected error creating Instagram post: {e}")
             return {"success": False, "error": f"Unexpected error: {str(e)}"}
     
-    def get_user_media(self, instagram_user_id: str, page_access_token: str, limit: int = 25) -> List[Dict]:
+    async def get_user_media(self, instagram_user_id: str, page_access_token: str, limit: int = 25) -> List[Dict]:
         """Get user's Instagram media"""
         try:
             url = f"{self.graph_url}/{instagram_user_id}/media"
@@ -420,11 +446,11 @@ class InstagramService:
                 'limit': limit
             }
             
-            response = self._make_request('GET', url, params=params)
+            response = await self._make_request('GET', url, params=params)
             media_data = response.json()
             return media_data.get('data', [])
             
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Failed to get user media: {e}")
             return []
     
@@ -491,15 +517,16 @@ class InstagramService:
                 if not url.startswith(('http://', 'https://')):
                     return {"success": False, "error": f"Image {i+1} URL must be a valid HTTP/HTTPS URL"}
             
-            # Create child media objects
-            children_creation_ids = []
-            for url in image_urls:
-                child_response = self._make_request('POST', f"{self.graph_url}/{instagram_user_id}/media", data={
+            # Create child media objects concurrently (gather keeps the image order)
+            child_responses = await asyncio.gather(*[
+                self._make_request('POST', f"{self.graph_url}/{instagram_user_id}/media", data={
                     'access_token': page_access_token,
                     'image_url': url,
                     'is_carousel_item': 'true'
                 })
-                children_creation_ids.append(child_response.json()['id'])
+                for url in image_urls
+            ])
+            children_creation_ids = [child_response.json()['id'] for child_response in child_responses]
             
             # Create carousel container
             media_url = f"{self.graph_url}/{instagram_user_id}/media"
@@ -512,7 +539,7 @@ class InstagramService:
             for idx, cid in enumerate(children_creation_ids):
                 media_params[f'children[{idx}]'] = cid
             
-            media_response = self._make_request('POST', media_url, data=media_params)
+            media_response = await self._make_request('POST', media_url, data=media_params)
             media_data = media_response.json()
             creation_id = media_data['id']
             
@@ -523,7 +550,7 @@ class InstagramService:
                 'creation_id': creation_id
             }
             
-            publish_response = self._make_request('POST', publish_url, data=publish_params)
+            publish_response = await self._make_request('POST', publish_url, data=publish_params)
             publish_data = publish_response.json()
             
             return {
@@ -533,20 +560,39 @@ class InstagramService:
                 'image_count': len(image_urls)
             }
             
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Failed to create Instagram carousel: {e}")
-            if hasattr(e, 'response') and e.response:
-                try:
-                    error_data = e.response.json()
-                    error_msg = error_data.get('error', {}).get('message', str(e))
-                except ValueError:
-                    error_msg = str(e)
+            if isinstance(e, httpx.HTTPStatusError):
+                error_msg, _ = _graph_error_message(e)
                 return {'success': False, 'error': f"Carousel creation failed: {error_msg}"}
             return {'success': False, 'error': f"Network error: {str(e)}"}
         except Exception as e:
             logger.error(f"Unexpected error creating Instagram carousel: {e}")
             return {"success": False, "error": f"Unexpected error: {str(e)}"}
     
+    async def get_comments_for_media(self, media_ids: List[str], page_access_token: str,
+                                     limit: int = 25) -> Dict[str, List[Dict]]:
+        """Get comments for several media items in batched Graph requests.
+
+        Returns the comments per media id (each tagged with its ``media_id``);
+        media whose lookup failed are left out.
+        """
+        comments_by_media = await graph_batch_service.get_edges(
+            media_ids,
+            "comments",
+            page_access_token,
+            params={'fields': 'id,text,from,timestamp', 'limit': limit}
+        )
+        results = {}
+        for media_id, comments in comments_by_media.items():
+            if comments is None:
+                logger.warning(f"Failed to get comments for media {media_id}")
+                continue
+            for comment in comments:
+                comment['media_id'] = media_id
+            results[media_id] = comments
+        return results
+    
     async def get_comments(self, instagram_user_id: str, page_access_token: str, 
                           media_id: str = None, limit: int = 25) -> List[Dict]:
         """Get comments for Instagram media."""
@@ -559,7 +605,7 @@ class InstagramService:
                     'limit': limit
                 }
                 
-                response = self._make_request('GET', url, params=params)
+                response = await self._make_request('GET', url, params=params)
                 data = response.json()
                 return data.get('data', [])
             else:
@@ -571,36 +617,21 @@ class InstagramService:
                     'limit': limit
                 }
                 
-                response = self._make_request('GET', url, params=params)
+                response = await self._make_request('GET', url, params=params)
                 media_data = response.json()
                 media_list = media_data.get('data', [])
                 
-                all_comments = []
-                for media in media_list:
-                    media_id = media['id']
-                    comments_url = f"{self.graph_url}/{media_id}/comments"
-                    comments_params = {
-                        'access_token': page_access_token,
-                        'fields': 'id,text,from,timestamp',
-                        'limit': 10
-                    }
-                    
-                    try:
-                        comments_response = self._make_request('GET', comments_url, params=comments_params)
-                        comments_data = comments_response.json()
-                        comments = comments_data.get('data', [])
-                        
-                        for comment in comments:
-                            comment['media_id'] = media_id
-                        
-                        all_comments.extend(comments)
-                    except requests.exceptions.RequestException as e:
-                        logger.warning(f"Failed to get comments for media {media_id}: {e}")
-                        continue
+                # Fetch comments for all media in batched requests
+                comments_by_media = await self.get_comments_for_media(
+                    [media['id'] for media in media_list], page_access_token, 10
+                )
                 
+                all_comments = []
+                for comments in comments_by_media.values():
+                    all_comments.extend(comments)
                 return all_comments
                 
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Failed to get Instagram comments: {e}")
             return []
     
@@ -612,13 +643,7 @@ class InstagramService:
                 'access_token': page_access_token,
                 'message': message
             }
-            # Use requests in a thread pool for async compatibility
-            import asyncio
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None,
-                lambda: self._session.post(url, data=data, timeout=30)
-            )
+            response = await http_client_service.client.post(url, data=data, timeout=self.request_timeout)
             response.raise_for_status()
             result = response.json()
             return {"success": True, "id": result.get("id")}
@@ -643,11 +668,7 @@ def get_access_token_for_user(instagram_user_id: str):
     return None
 
 async def has_auto_reply(comment_id: str, instagram_user_id: str, db) -> bool:
-    return db.query(InstagramAutoReplyLog).filter_by(comment_id=comment_id, instagram_user_id=instagram_user_id).first() is not None
+    return replied_comment_store.is_handled(db, comment_id)
 
 async def mark_auto_replied(comment_id: str, instagram_user_id: str, db):
-    if not await has_auto_reply(comment_id, instagram_user_id, db):
-        log = InstagramAutoReplyLog(comment_id=comment_id, instagram_user_id=instagram_user_id)
-        db.add(log)
-        db.commit()
-# NOTE: For production, implement persistent storage for replied comment IDs. 
\ No newline at end of file
+    replied_comment_store.mark_handled(db, "instagram", instagram_user_id, comment_id)
@@ -0,0 +1,112 @@
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.scheduler_lease import SchedulerLease
+
+logger = logging.getLogger(__name__)
+
+
+class LeaseService:
+    """Row claiming and leader election shared by every scheduler instance.
+
+    On PostgreSQL due rows are claimed with ``SELECT ... FOR UPDATE SKIP LOCKED``
+    so several API replicas can drain the same backlog in parallel. Other
+    databases (SQLite in development) cannot skip locked rows, so there a single
+    instance is elected through the ``scheduler_leases`` table instead.
+    """
+
+    def __init__(self):
+        self.instance_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    def supports_skip_locked(self, db: Session) -> bool:
+        return db.get_bind().dialect.name == "postgresql"
+
+    def acquire_leadership(self, db: Session, name: str, ttl_seconds: float) -> bool:
+        """Acquire or renew the named leadership lease. Returns True if we hold it."""
+        now = datetime.now(timezone.utc)
+        expires_at = now + timedelta(seconds=ttl_seconds)
+        try:
+            renewed = db.query(SchedulerLease).filter(
+                SchedulerLease.name == name,
+                or_(SchedulerLease.owner == self.instance_id, SchedulerLease.expires_at < now)
+            ).update(
+                {"owner": self.instance_id, "expires_at": expires_at},
+                synchronize_session=False
+            )
+            if renewed:
+                db.commit()
+                return True
+
+            db.add(SchedulerLease(name=name, owner=self.instance_id, expires_at=expires_at))
+            db.commit()
+            logger.info(f"👑 {self.instance_id} acquired scheduler leadership for '{name}'")
+            return True
+        except IntegrityError:
+            # Another live instance holds the lease
+            db.rollback()
+            return False
+        except Exception as e:
+            logger.error(f"Error acquiring scheduler leadership for '{name}': {e}")
+            db.rollback()
+            return False
+
+    def should_run(self, db: Session, name: str, ttl_seconds: float) -> bool:
+        """Whether this instance may run a scheduler that claims rows.
+
+        Row claims are safe to run everywhere on PostgreSQL; elsewhere only the
+        elected leader runs.
+        """
+        if self.supports_skip_locked(db):
+            return True
+        return self.acquire_leadership(db, name, ttl_seconds)
+
+    def claim_due_rows(self, db: Session, model, criteria: list, order_by, limit: int, lease_seconds: float) -> List[int]:
+        """Lease up to ``limit`` rows matching ``criteria`` to this instance.
+
+        Rows whose lease is held by another live instance are skipped. Returns the
+        ids of the rows this instance now owns.
+        """
+        now = datetime.now(timezone.utc)
+        lease_free = or_(model.lease_expires_at.is_(None), model.lease_expires_at < now)
+
+        query = db.query(model.id).filter(*criteria, lease_free).order_by(order_by).limit(limit)
+        if self.supports_skip_locked(db):
+            query = query.with_for_update(skip_locked=True)
+        candidate_ids = [row.id for row in query.all()]
+        if not candidate_ids:
+            db.rollback()
+            return []
+
+        db.query(model).filter(model.id.in_(candidate_ids), lease_free).update(
+            {
+                model.lease_owner: self.instance_id,
+                model.lease_expires_at: now + timedelta(seconds=lease_seconds),
+            },
+            synchronize_session=False
+        )
+        db.commit()
+
+        # Without row locks the conditional UPDATE may lose some rows to another instance
+        return [
+            row.id for row in db.query(model.id).filter(
+                model.id.in_(candidate_ids),
+                model.lease_owner == self.instance_id
+            ).all()
+        ]
+
+    def release(self, row):
+        """Clear the lease on a row (caller commits)."""
+        row.lease_owner = None
+        row.lease_expires_at = None
+
+
+# Global lease service instance
+lease_service = LeaseService()
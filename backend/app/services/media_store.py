@@ -0,0 +1,275 @@
+import asyncio
+import base64
+import binascii
+import hashlib
+import io
+import logging
+import os
+import re
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models.media_blob import MediaBlob
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+try:
+    from PIL import Image
+except ImportError:  # Thumbnails are optional
+    Image = None
+
+DATA_URL_PATTERN = re.compile(r"^data:(?P<content_type>[\w.+-]+/[\w.+-]+)?(?:;[\w-]+=[^;,]*)*;base64,(?P<data>.*)$", re.DOTALL)
+SHA256_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+
+@dataclass
+class StoredBlob:
+    """Result of writing content to disk, before it is registered in the database."""
+    sha256: str
+    content_type: str
+    size_bytes: int
+    has_thumbnail: bool = False
+    width: Optional[int] = None
+    height: Optional[int] = None
+
+
+@dataclass
+class SpooledUpload:
+    """An upload copied to disk, with the digest computed while streaming."""
+    path: Path
+    sha256: str
+    size_bytes: int
+
+
+class MediaStore:
+    """
+    Content-addressed media store.
+
+    Files are keyed by the SHA-256 of their content and laid out like an
+    S3 bucket (``sha256/ab/cd/<digest>``) under ``MEDIA_STORE_PATH``, so
+    identical uploads are stored once and database rows only keep the digest.
+    Image blobs get a small JPEG thumbnail when Pillow is installed.
+    """
+
+    def __init__(self, root: str = settings.media_store_path):
+        self.root = Path(root)
+        self.thumbnail_size = settings.media_thumbnail_size
+
+    # --- Keys and URLs ---------------------------------------------------
+
+    @staticmethod
+    def is_digest(value: Optional[str]) -> bool:
+        return bool(value) and bool(SHA256_PATTERN.match(value))
+
+    def key_for(self, sha256: str) -> str:
+        return f"sha256/{sha256[:2]}/{sha256[2:4]}/{sha256}"
+
+    def path_for(self, sha256: str) -> Path:
+        return self.root / self.key_for(sha256)
+
+    def thumbnail_path_for(self, sha256: str) -> Path:
+        return self.root / f"{self.key_for(sha256)}.thumb.jpg"
+
+    def url_for(self, sha256: str) -> str:
+        return f"{settings.media_public_base_url.rstrip('/')}/api/media/{sha256}"
+
+    def thumbnail_url_for(self, blob: MediaBlob) -> str:
+        """Thumbnail URL, falling back to the full media when there is no thumbnail."""
+        if blob.has_thumbnail:
+            return f"{self.url_for(blob.sha256)}/thumbnail"
+        return self.url_for(blob.sha256)
+
+    # --- Writing ---------------------------------------------------------
+
+    @staticmethod
+    def decode_data_url(data_url: str) -> tuple[bytes, str]:
+        """Split a ``data:<type>;base64,...`` URL into its bytes and content type."""
+        match = DATA_URL_PATTERN.match(data_url.strip())
+        if not match:
+            raise ValueError("Not a base64 data URL")
+        try:
+            data = base64.b64decode(match.group("data"), validate=False)
+        except (binascii.Error, ValueError) as e:
+            raise ValueError(f"Invalid base64 data: {e}")
+        return data, match.group("content_type") or "application/octet-stream"
+
+    def _write_atomic(self, path: Path, data: bytes):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _make_thumbnail(self, sha256: str, data: bytes) -> tuple[bool, Optional[int], Optional[int]]:
+        if Image is None:
+            return False, None, None
+        try:
+            with Image.open(io.BytesIO(data)) as image:
+                width, height = image.size
+                image.thumbnail((self.thumbnail_size, self.thumbnail_size))
+                buffer = io.BytesIO()
+                image.convert("RGB").save(buffer, format="JPEG", quality=80)
+            self._write_atomic(self.thumbnail_path_for(sha256), buffer.getvalue())
+            return True, width, height
+        except Exception as e:
+            logger.warning(f"Could not create thumbnail for media {sha256}: {e}")
+            return False, None, None
+
+    def store_bytes(self, data: bytes, content_type: str) -> StoredBlob:
+        """Write content (and its thumbnail) to disk if it is not stored yet. Safe to run in a thread."""
+        sha256 = hashlib.sha256(data).hexdigest()
+        path = self.path_for(sha256)
+        if not path.exists():
+            self._write_atomic(path, data)
+        blob = StoredBlob(sha256=sha256, content_type=content_type, size_bytes=len(data))
+        if content_type.startswith("image/"):
+            if self.thumbnail_path_for(sha256).exists():
+                blob.has_thumbnail = True
+            else:
+                blob.has_thumbnail, blob.width, blob.height = self._make_thumbnail(sha256, data)
+        return blob
+
+    def register(self, db: Session, stored: StoredBlob) -> MediaBlob:
+        """Record a stored blob's metadata (idempotent)."""
+        blob = db.query(MediaBlob).filter(MediaBlob.sha256 == stored.sha256).first()
+        if blob:
+            return blob
+        blob = MediaBlob(
+            sha256=stored.sha256,
+            content_type=stored.content_type,
+            size_bytes=stored.size_bytes,
+            has_thumbnail=stored.has_thumbnail,
+            width=stored.width,
+            height=stored.height
+        )
+        try:
+            db.add(blob)
+            db.commit()
+        except IntegrityError:
+            # Registered concurrently by another request
+            db.rollback()
+            blob = db.query(MediaBlob).filter(MediaBlob.sha256 == stored.sha256).first()
+        return blob
+
+    def register_many(self, db: Session, stored_blobs: list[StoredBlob]):
+        """Record several stored blobs with one lookup and one commit."""
+        unique = {stored.sha256: stored for stored in stored_blobs}
+        if not unique:
+            return
+        existing = {
+            row.sha256 for row in db.query(MediaBlob.sha256).filter(MediaBlob.sha256.in_(list(unique))).all()
+        }
+        missing = [stored for sha256, stored in unique.items() if sha256 not in existing]
+        if not missing:
+            return
+        try:
+            db.add_all([
+                MediaBlob(
+                    sha256=stored.sha256,
+                    content_type=stored.content_type,
+                    size_bytes=stored.size_bytes,
+                    has_thumbnail=stored.has_thumbnail,
+                    width=stored.width,
+                    height=stored.height
+                )
+                for stored in missing
+            ])
+            db.commit()
+        except IntegrityError:
+            # Some were registered concurrently; fall back to one by one
+            db.rollback()
+            for stored in missing:
+                self.register(db, stored)
+
+    async def astore_data_url(self, data_url: str) -> StoredBlob:
+        """Decode a data URL and write it to disk in a worker thread, without touching the database."""
+        data, content_type = await asyncio.to_thread(self.decode_data_url, data_url)
+        return await asyncio.to_thread(self.store_bytes, data, content_type)
+
+    def put_bytes(self, db: Session, data: bytes, content_type: str) -> MediaBlob:
+        return self.register(db, self.store_bytes(data, content_type))
+
+    def put_data_url(self, db: Session, data_url: str) -> MediaBlob:
+        data, content_type = self.decode_data_url(data_url)
+        return self.put_bytes(db, data, content_type)
+
+    async def aput_data_url(self, db: Session, data_url: str) -> MediaBlob:
+        """Like ``put_data_url`` but decodes, hashes and writes in a worker thread."""
+        return self.register(db, await self.astore_data_url(data_url))
+
+    async def spool_upload(self, upload, directory: str, suffix: str = "") -> SpooledUpload:
+        """Copy an upload (anything with ``async read(n)``) to a temp file chunk by chunk.
+
+        The SHA-256 is computed on the fly, so memory use stays constant
+        regardless of the upload size.
+        """
+        async def chunks():
+            while True:
+                chunk = await upload.read(settings.upload_spool_chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+
+        return await self.spool_stream(chunks(), directory, suffix)
+
+    async def spool_stream(self, chunks: AsyncIterator[bytes], directory: str, suffix: str = "") -> SpooledUpload:
+        """Write an async stream of byte chunks to a temp file, hashing as it goes."""
+        os.makedirs(directory, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=suffix)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                async for chunk in chunks:
+                    digest.update(chunk)
+                    size += len(chunk)
+                    await asyncio.to_thread(f.write, chunk)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        return SpooledUpload(path=Path(tmp_path), sha256=digest.hexdigest(), size_bytes=size)
+
+    def adopt_spooled(self, spooled: SpooledUpload, content_type: str) -> StoredBlob:
+        """Move a spooled file into the store without reading it into memory (thumbnails aside)."""
+        path = self.path_for(spooled.sha256)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.exists():
+            os.remove(spooled.path)
+        else:
+            os.replace(spooled.path, path)
+        blob = StoredBlob(sha256=spooled.sha256, content_type=content_type, size_bytes=spooled.size_bytes)
+        if content_type.startswith("image/"):
+            if self.thumbnail_path_for(spooled.sha256).exists():
+                blob.has_thumbnail = True
+            else:
+                blob.has_thumbnail, blob.width, blob.height = self._make_thumbnail(spooled.sha256, path.read_bytes())
+        return blob
+
+    async def import_stream(self, db: Session, chunks: AsyncIterator[bytes], content_type: str) -> MediaBlob:
+        """Store a streamed file (e.g. a remote download) with constant memory use."""
+        spooled = await self.spool_stream(chunks, str(self.root / "tmp"))
+        stored = await asyncio.to_thread(self.adopt_spooled, spooled, content_type)
+        return self.register(db, stored)
+
+    # --- Reading ---------------------------------------------------------
+
+    def get(self, db: Session, sha256: str) -> Optional[MediaBlob]:
+        if not self.is_digest(sha256):
+            return None
+        return db.query(MediaBlob).filter(MediaBlob.sha256 == sha256).first()
+
+
+# Global media store instance
+media_store = MediaStore()
@@ -0,0 +1,191 @@
+import asyncio
+import logging
+import uuid
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models.notification import Notification, NotificationPlatform, NotificationPreferences, NotificationType
+from app.services.websocket_hub import websocket_hub
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class NotificationBuffer:
+    """
+    Write-behind buffer for publish outcome notifications.
+
+    Success and failure notifications are collected for up to
+    ``NOTIFICATION_BUFFER_WINDOW_SECONDS`` (or ``NOTIFICATION_BUFFER_MAX_SIZE``
+    rows) and written with one bulk insert. Each user then gets a single
+    WebSocket frame: the notification itself when there is one, otherwise a
+    ``notification_batch`` summary ("12 posts published, 1 failed") with the
+    ids of the individual rows, which stay queryable through the API. A batch
+    whose write fails (e.g. a dropped connection) goes back to the front of
+    the buffer and is retried on the next window, up to
+    ``NOTIFICATION_BUFFER_MAX_RETRIES`` times in a row.
+    """
+
+    def __init__(self):
+        self.window_seconds = settings.notification_buffer_window_seconds
+        self.max_size = settings.notification_buffer_max_size
+        self.max_retries = settings.notification_buffer_max_retries
+        self._pending: List[Dict[str, Any]] = []
+        self._failures = 0
+        self._timer: Optional[asyncio.Task] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    def add(
+        self,
+        user_id: int,
+        notification_type: NotificationType,
+        platform: NotificationPlatform,
+        message: str,
+        strategy_name: Optional[str] = None,
+        post_id: Optional[int] = None,
+        error_message: Optional[str] = None
+    ):
+        """Queue a notification; it is stored and pushed on the next flush."""
+        self._pending.append({
+            "id": uuid.uuid4(),
+            "user_id": user_id,
+            "post_id": post_id,
+            "type": notification_type,
+            "platform": platform,
+            "strategy_name": strategy_name,
+            "message": message,
+            "is_read": False,
+            "created_at": datetime.now(timezone.utc),
+            "error_message": error_message,
+        })
+        if len(self._pending) >= self.max_size and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = asyncio.ensure_future(self.flush())
+        else:
+            self._arm_timer()
+
+    def _arm_timer(self):
+        if self._timer is None or self._timer.done():
+            self._timer = asyncio.ensure_future(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.window_seconds)
+        # Let a failed flush arm the next timer
+        self._timer = None
+        await self.flush()
+
+    async def flush(self):
+        """Store everything buffered so far and push one frame per user."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            rows, self._pending = self._pending, []
+            if not rows:
+                return
+            try:
+                rows = await asyncio.to_thread(self._write, rows)
+            except Exception as e:
+                self._failures += 1
+                if self._failures > self.max_retries:
+                    logger.error(f"Dropping {len(rows)} buffered notifications after {self._failures} failed writes: {e}")
+                    self._failures = 0
+                    return
+                logger.error(f"Error writing {len(rows)} buffered notifications, retrying ({self._failures}/{self.max_retries}): {e}")
+                self._pending = rows + self._pending
+                self._arm_timer()
+                return
+            self._failures = 0
+            await self._push(rows)
+
+    def _write(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Drop rows the user opted out of and bulk insert the rest. Returns the stored rows."""
+        from app.services.notification_service import notification_service
+
+        db = SessionLocal()
+        try:
+            user_ids = {row["user_id"] for row in rows}
+            success_disabled = {
+                prefs.user_id for prefs in db.query(NotificationPreferences).filter(
+                    NotificationPreferences.user_id.in_(user_ids),
+                    NotificationPreferences.success_enabled.is_(False)
+                ).all()
+            }
+            # Failure notifications are always sent (cannot be disabled)
+            rows = [
+                row for row in rows
+                if row["type"] != NotificationType.SUCCESS or row["user_id"] not in success_disabled
+            ]
+            if not rows:
+                return rows
+            try:
+                db.execute(insert(Notification), rows)
+                notification_service.bump_unread_counts(db, Counter(row["user_id"] for row in rows))
+                db.commit()
+                return rows
+            except IntegrityError as e:
+                # One bad row (e.g. a post that no longer exists) must not lose the rest
+                db.rollback()
+                logger.warning(f"Bulk notification insert failed, retrying row by row: {e}")
+            stored = []
+            for row in rows:
+                try:
+                    db.execute(insert(Notification), [row])
+                    notification_service.bump_unread_counts(db, {row["user_id"]: 1})
+                    db.commit()
+                    stored.append(row)
+                except IntegrityError as e:
+                    db.rollback()
+                    logger.error(f"Dropping notification for user {row['user_id']}: {e}")
+            return stored
+        finally:
+            db.close()
+
+    @staticmethod
+    def batch_frame(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Single coalesced frame summarizing several notifications for one user."""
+        counts = Counter(row["type"].value for row in rows)
+        parts = []
+        if counts[NotificationType.SUCCESS.value]:
+            published = counts[NotificationType.SUCCESS.value]
+            parts.append(f"{published} post{'s' if published != 1 else ''} published")
+        if counts[NotificationType.FAILURE.value]:
+            parts.append(f"{counts[NotificationType.FAILURE.value]} failed to publish")
+        other = len(rows) - counts[NotificationType.SUCCESS.value] - counts[NotificationType.FAILURE.value]
+        if other:
+            parts.append(f"{other} other notification{'s' if other != 1 else ''}")
+        platforms = Counter(row["platform"].value for row in rows)
+        return {
+            "type": "notification_batch",
+            "count": len(rows),
+            "counts": dict(counts),
+            "platform": platforms.most_common(1)[0][0],
+            "message": ", ".join(parts),
+            "notificationIds": [str(row["id"]) for row in rows],
+        }
+
+    async def _push(self, rows: List[Dict[str, Any]]):
+        from app.services.notification_service import notification_service
+
+        by_user: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+        for row in rows:
+            by_user[row["user_id"]].append(row)
+        for user_id, user_rows in by_user.items():
+            if len(user_rows) == 1:
+                frame = notification_service.notification_frame(Notification(**user_rows[0]))
+            else:
+                frame = self.batch_frame(user_rows)
+            try:
+                await websocket_hub.publish(user_id, frame)
+            except Exception as e:
+                logger.error(f"Error pushing notifications to user {user_id}: {e}")
+        logger.info(f"📬 Stored {len(rows)} notifications for {len(by_user)} users")
+
+
+# Global notification buffer instance
+notification_buffer = NotificationBuffer()
@@ -1,31 +1,29 @@
-import asyncio
+import base64
 import logging
+import uuid
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterable, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, desc
+from sqlalchemy import and_, case, desc, func, tuple_
+from sqlalchemy.exc import IntegrityError
 
 from app.database import get_db
-from app.models.notification import Notification, NotificationPreferences, NotificationType, NotificationPlatform
+from app.models.notification import Notification, NotificationPreferences, NotificationType, NotificationPlatform, NotificationUnreadCount
 from app.models.user import User
 from app.models.scheduled_post import ScheduledPost
+from app.services.notification_buffer import notification_buffer
+from app.services.websocket_hub import websocket_hub
 
 logger = logging.getLogger(__name__)
 
 class NotificationService:
-    def __init__(self):
-        self.websocket_connections: Dict[int, Any] = {}  # user_id -> websocket connection
-    
     async def add_websocket_connection(self, user_id: int, websocket):
-        """Add a WebSocket connection for a user"""
-        self.websocket_connections[user_id] = websocket
-        logger.info(f"Added WebSocket connection for user {user_id}")
+        """Add a WebSocket connection for a user (a user may have several)"""
+        return websocket_hub.connect(user_id, websocket)
     
-    async def remove_websocket_connection(self, user_id: int):
-        """Remove a WebSocket connection for a user"""
-        if user_id in self.websocket_connections:
-            del self.websocket_connections[user_id]
-            logger.info(f"Removed WebSocket connection for user {user_id}")
+    async def remove_websocket_connection(self, connection):
+        """Remove a WebSocket connection returned by add_websocket_connection"""
+        await connection.close()
     
     async def create_notification(
         self,
@@ -53,6 +51,7 @@ class NotificationService:
             )
             
             db.add(notification)
+            self.bump_unread_counts(db, {user_id: 1})
             db.commit()
             db.refresh(notification)
             
@@ -67,218 +66,81 @@ class NotificationService:
             db.rollback()
             raise
     
+    @staticmethod
+    def notification_frame(notification: Notification) -> Dict[str, Any]:
+        """WebSocket frame for a notification"""
+        return {
+            "type": "notification",
+            "notification": {
+                "id": str(notification.id),
+                "type": notification.type.value,
+                "platform": notification.platform.value,
+                "strategyName": notification.strategy_name,
+                "message": notification.message,
+                "timestamp": notification.created_at.isoformat(),
+                "isRead": notification.is_read,
+                "postId": str(notification.post_id) if notification.post_id else None,
+                "scheduledTime": notification.scheduled_time.isoformat() if notification.scheduled_time else None,
+                "error": notification.error_message
+            }
+        }
+    
     async def send_websocket_notification(self, user_id: int, notification: Notification):
-        """Send notification via WebSocket if user is connected"""
-        if user_id in self.websocket_connections:
-            try:
-                websocket = self.websocket_connections[user_id]
-                notification_data = {
-                    "type": "notification",
-                    "notification": {
-                        "id": str(notification.id),
-                        "type": notification.type.value,
-                        "platform": notification.platform.value,
-                        "strategyName": notification.strategy_name,
-                        "message": notification.message,
-                        "timestamp": notification.created_at.isoformat(),
-                        "isRead": notification.is_read,
-                        "postId": str(notification.post_id) if notification.post_id else None,
-                        "scheduledTime": notification.scheduled_time.isoformat() if notification.scheduled_time else None,
-                        "error": notification.error_message
-                    }
-                }
-                
-                await websocket.send_text(str(notification_data).replace("'", '"'))
-                logger.info(f"Sent WebSocket notification to user {user_id}")
-                
-            except Exception as e:
-                logger.error(f"Error sending WebSocket notification to user {user_id}: {e}")
-                # Remove broken connection
-                await self.remove_websocket_connection(user_id)
+        """Push a notification to every connection the user has open, on any replica"""
+        try:
+            await websocket_hub.publish(user_id, self.notification_frame(notification))
+        except Exception as e:
+            logger.error(f"Error sending WebSocket notification to user {user_id}: {e}")
     
     async def schedule_pre_posting_alert(self, db: Session, post_id: int):
         """Schedule a pre-posting alert for 10 minutes before the post"""
         try:
             # Try to find in ScheduledPost first
-            scheduled_post = db.query(ScheduledPost).filter(ScheduledPost.id == post_id).first()
-            if scheduled_post:
-                await self._schedule_scheduled_post_alert(db, scheduled_post)
-                return
-            
-            # Try to find in BulkComposerContent
-            from app.models.bulk_composer_content import BulkComposerContent
-            bulk_post = db.query(BulkComposerContent).filter(BulkComposerContent.id == post_id).first()
-            if bulk_post:
-                await self._schedule_bulk_composer_alert(db, bulk_post)
+            post = db.query(ScheduledPost).filter(ScheduledPost.id == post_id).first()
+            if not post:
+                # Try to find in BulkComposerContent
+                from app.models.bulk_composer_content import BulkComposerContent
+                post = db.query(BulkComposerContent).filter(BulkComposerContent.id == post_id).first()
+            if not post:
+                logger.error(f"Post {post_id} not found in ScheduledPost or BulkComposerContent")
                 return
-                
-            logger.error(f"Post {post_id} not found in ScheduledPost or BulkComposerContent")
-            
+            await self.schedule_pre_posting_alerts(db, [post])
         except Exception as e:
             logger.error(f"Error scheduling pre-posting alert for post {post_id}: {e}")
-    
-    async def _schedule_scheduled_post_alert(self, db: Session, scheduled_post: ScheduledPost):
-        """Schedule alert for ScheduledPost"""
-        try:
-            
-            # Check if we should send pre-posting notification
-            user_prefs = await self.get_user_preferences(db, scheduled_post.user_id)
-            if not user_prefs.pre_posting_enabled:
-                logger.info(f"Pre-posting notifications disabled for user {scheduled_post.user_id}")
-                return
-            
-            # Calculate 10 minutes before scheduled time
-            alert_time = scheduled_post.scheduled_datetime - timedelta(minutes=10)
-            
-            # Handle timezone-aware comparison
-            if scheduled_post.scheduled_datetime.tzinfo is not None:
-                # If scheduled_datetime is timezone-aware, convert to UTC for comparison
-                current_time = datetime.now(scheduled_post.scheduled_datetime.tzinfo)
-            else:
-                # If scheduled_datetime is naive, assume it's in UTC
-                current_time = datetime.utcnow()
-            
-            # Only schedule if alert time is in the future
-            if alert_time > current_time:
-                # Schedule the alert (in a real implementation, you'd use a task queue like Celery)
-                delay_seconds = (alert_time - current_time).total_seconds()
-                asyncio.create_task(self._send_delayed_scheduled_post_alert(delay_seconds, db, scheduled_post))
-                logger.info(f"✅ Scheduled pre-posting alert for Instagram post {scheduled_post.id}")
-                logger.info(f"   📅 Scheduled time: {scheduled_post.scheduled_datetime}")
-                logger.info(f"   ⏰ Alert time: {alert_time}")
-                logger.info(f"   ⏱️ Delay: {delay_seconds} seconds ({delay_seconds/60:.1f} minutes)")
-            else:
-                logger.info(f"Pre-posting alert time has passed for scheduled post {scheduled_post.id}")
-                
-        except Exception as e:
-            logger.error(f"Error scheduling pre-posting alert for scheduled post {scheduled_post.id}: {e}")
-    
-    async def _schedule_bulk_composer_alert(self, db: Session, bulk_post):
-        """Schedule alert for BulkComposerContent"""
-        try:
-            # Check if we should send pre-posting notification
-            user_prefs = await self.get_user_preferences(db, bulk_post.user_id)
-            if not user_prefs.pre_posting_enabled:
-                logger.info(f"Pre-posting notifications disabled for user {bulk_post.user_id}")
-                return
-            
-            # Calculate 10 minutes before scheduled time
-            alert_time = bulk_post.scheduled_datetime - timedelta(minutes=10)
-            
-            # Handle timezone-aware comparison
-            if bulk_post.scheduled_datetime.tzinfo is not None:
-                # If scheduled_datetime is timezone-aware, convert to UTC for comparison
-                current_time = datetime.now(bulk_post.scheduled_datetime.tzinfo)
-            else:
-                # If scheduled_datetime is naive, assume it's in UTC
-                current_time = datetime.utcnow()
-            
-            # Only schedule if alert time is in the future
-            if alert_time > current_time:
-                # Schedule the alert (in a real implementation, you'd use a task queue like Celery)
-                delay_seconds = (alert_time - current_time).total_seconds()
-                asyncio.create_task(self._send_delayed_bulk_composer_alert(delay_seconds, db, bulk_post))
-                logger.info(f"✅ Scheduled pre-posting alert for bulk composer post {bulk_post.id}")
-                logger.info(f"   📅 Scheduled time: {bulk_post.scheduled_datetime}")
-                logger.info(f"   ⏰ Alert time: {alert_time}")
-                logger.info(f"   ⏱️ Delay: {delay_seconds} seconds ({delay_seconds/60:.1f} minutes)")
-            else:
-                logger.info(f"Pre-posting alert time has passed for bulk composer post {bulk_post.id}")
-                
-        except Exception as e:
-            logger.error(f"Error scheduling pre-posting alert for bulk composer post {bulk_post.id}: {e}")
-    
-    async def _send_delayed_scheduled_post_alert(self, delay_seconds: float, db: Session, scheduled_post: ScheduledPost):
-        """Send pre-posting alert after delay for ScheduledPost"""
+
+    async def schedule_pre_posting_alerts(self, db: Session, posts: list):
+        """Queue pre-posting alerts for posts; they are sent by the pre-posting alert loop"""
+        from app.services.pre_posting_alert_service import pre_posting_alert_service
         try:
-            await asyncio.sleep(delay_seconds)
-            
-            # Refresh the scheduled post to get latest status
-            db.refresh(scheduled_post)
-            
-            # Only send if post is still scheduled
-            if scheduled_post.status == "scheduled" and scheduled_post.is_active:
-                strategy_name = getattr(scheduled_post.strategy_plan, 'name', 'Scheduled Post') if hasattr(scheduled_post, 'strategy_plan') and scheduled_post.strategy_plan else "Scheduled Post"
-                platform = NotificationPlatform.INSTAGRAM if scheduled_post.platform == "instagram" else NotificationPlatform.FACEBOOK
-                
-                message = f"Your {strategy_name} strategy will be posted in 10 minutes. If you'd like to change anything before the post is made, now is the time."
-                
-                await self.create_notification(
-                    db=db,
-                    user_id=scheduled_post.user_id,
-                    notification_type=NotificationType.PRE_POSTING,
-                    platform=platform,
-                    message=message,
-                    strategy_name=strategy_name,
-                    post_id=scheduled_post.id,
-                    scheduled_time=scheduled_post.scheduled_datetime
-                )
-                
-                logger.info(f"🔔 Sent pre-posting notification for Instagram post {scheduled_post.id} to user {scheduled_post.user_id}")
-                
+            pre_posting_alert_service.enqueue(db, posts)
         except Exception as e:
-            logger.error(f"Error sending delayed scheduled post alert: {e}")
+            db.rollback()
+            logger.error(f"Error scheduling pre-posting alerts for {len(posts)} posts: {e}")
     
-    async def _send_delayed_bulk_composer_alert(self, delay_seconds: float, db: Session, bulk_post):
-        """Send pre-posting alert after delay for BulkComposerContent"""
-        try:
-            await asyncio.sleep(delay_seconds)
-            
-            # Refresh the bulk post to get latest status
-            db.refresh(bulk_post)
-            
-            # Only send if post is still scheduled
-            if bulk_post.status == "scheduled":
-                # Determine platform from social account
-                platform = NotificationPlatform.FACEBOOK  # Default to Facebook for bulk composer
-                if hasattr(bulk_post, 'social_account') and bulk_post.social_account:
-                    if bulk_post.social_account.platform == 'instagram':
-                        platform = NotificationPlatform.INSTAGRAM
-                
-                strategy_name = "Bulk Scheduled Post"
-                message = f"Your {strategy_name} will be posted in 10 minutes. If you'd like to change anything before the post is made, now is the time."
-                
-                await self.create_notification(
-                    db=db,
-                    user_id=bulk_post.user_id,
-                    notification_type=NotificationType.PRE_POSTING,
-                    platform=platform,
-                    message=message,
-                    strategy_name=strategy_name,
-                    post_id=bulk_post.id,
-                    scheduled_time=bulk_post.scheduled_datetime
-                )
-                
-        except Exception as e:
-            logger.error(f"Error sending delayed bulk composer alert: {e}")
+    def _post_owner(self, db: Session, post_id: int) -> Optional[int]:
+        """User id of a ScheduledPost or BulkComposerContent"""
+        scheduled_post = db.query(ScheduledPost.user_id).filter(ScheduledPost.id == post_id).first()
+        if scheduled_post:
+            return scheduled_post.user_id
+        from app.models.bulk_composer_content import BulkComposerContent
+        bulk_post = db.query(BulkComposerContent.user_id).filter(BulkComposerContent.id == post_id).first()
+        if bulk_post:
+            return bulk_post.user_id
+        logger.error(f"Post {post_id} not found in ScheduledPost or BulkComposerContent")
+        return None
     
     async def send_success_notification(
         self,
         db: Session,
         post_id: int,
         platform: str,
-        strategy_name: str
+        strategy_name: str,
+        user_id: Optional[int] = None
     ):
-        """Send success notification when post is published"""
+        """Queue a success notification when post is published (sent in batches by the notification buffer)"""
         try:
-            # Try to find in ScheduledPost first
-            scheduled_post = db.query(ScheduledPost).filter(ScheduledPost.id == post_id).first()
-            if scheduled_post:
-                user_id = scheduled_post.user_id
-            else:
-                # Try to find in BulkComposerContent
-                from app.models.bulk_composer_content import BulkComposerContent
-                bulk_post = db.query(BulkComposerContent).filter(BulkComposerContent.id == post_id).first()
-                if bulk_post:
-                    user_id = bulk_post.user_id
-                else:
-                    logger.error(f"Post {post_id} not found in ScheduledPost or BulkComposerContent")
-                    return
-            
-            # Check if we should send success notification
-            user_prefs = await self.get_user_preferences(db, user_id)
-            if not user_prefs.success_enabled:
-                logger.info(f"Success notifications disabled for user {user_id}")
+            user_id = user_id or self._post_owner(db, post_id)
+            if user_id is None:
                 return
             
             platform_enum = NotificationPlatform.INSTAGRAM if platform == "instagram" else NotificationPlatform.FACEBOOK
@@ -286,8 +148,8 @@ class NotificationService:
             
             message = f"Your {strategy_name} post has been successfully published at {current_time.strftime('%I:%M %p')}."
             
-            await self.create_notification(
-                db=db,
+            # Users who disabled success notifications are filtered out when the buffer is flushed
+            notification_buffer.add(
                 user_id=user_id,
                 notification_type=NotificationType.SUCCESS,
                 platform=platform_enum,
@@ -305,31 +167,21 @@ class NotificationService:
         post_id: int,
         platform: str,
         strategy_name: str,
-        error: str
+        error: str,
+        user_id: Optional[int] = None
     ):
-        """Send failure notification when post fails to publish"""
+        """Queue a failure notification when post fails to publish (sent in batches by the notification buffer)"""
         try:
-            # Try to find in ScheduledPost first
-            scheduled_post = db.query(ScheduledPost).filter(ScheduledPost.id == post_id).first()
-            if scheduled_post:
-                user_id = scheduled_post.user_id
-            else:
-                # Try to find in BulkComposerContent
-                from app.models.bulk_composer_content import BulkComposerContent
-                bulk_post = db.query(BulkComposerContent).filter(BulkComposerContent.id == post_id).first()
-                if bulk_post:
-                    user_id = bulk_post.user_id
-                else:
-                    logger.error(f"Post {post_id} not found in ScheduledPost or BulkComposerContent")
-                    return
+            user_id = user_id or self._post_owner(db, post_id)
+            if user_id is None:
+                return
             
             # Failure notifications are always sent (cannot be disabled)
             platform_enum = NotificationPlatform.INSTAGRAM if platform == "instagram" else NotificationPlatform.FACEBOOK
             
             message = f"Your {strategy_name} post failed to publish. Reason: {error}. Please check your settings and try again."
             
-            await self.create_notification(
-                db=db,
+            notification_buffer.add(
                 user_id=user_id,
                 notification_type=NotificationType.FAILURE,
                 platform=platform_enum,
@@ -342,27 +194,96 @@ class NotificationService:
         except Exception as e:
             logger.error(f"Error sending failure notification for post {post_id}: {e}")
     
+    @staticmethod
+    def encode_cursor(notification: Notification) -> str:
+        """Opaque cursor pointing just after a notification (newest-first order)"""
+        raw = f"{notification.created_at.isoformat()}|{notification.id}"
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+    
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+        """Raises ValueError for a malformed cursor"""
+        try:
+            created_at, notification_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+            return datetime.fromisoformat(created_at), uuid.UUID(notification_id)
+        except Exception as e:
+            raise ValueError(f"Invalid cursor: {cursor}") from e
+    
     async def get_user_notifications(
         self,
         db: Session,
         user_id: int,
         limit: int = 50,
-        offset: int = 0
+        offset: int = 0,
+        cursor: Optional[str] = None
     ) -> List[Notification]:
-        """Get notifications for a user"""
+        """Get notifications for a user, newest first.
+        
+        Pass the ``cursor`` of the last notification of a page to get the next
+        one; this seeks on the (user_id, created_at, id) index instead of
+        scanning ``offset`` rows.
+        """
+        query = db.query(Notification).filter(Notification.user_id == user_id)
+        if cursor:
+            created_at, notification_id = self.decode_cursor(cursor)
+            query = query.filter(
+                tuple_(Notification.created_at, Notification.id) < tuple_(created_at, notification_id)
+            )
+        elif offset:
+            query = query.offset(offset)
         try:
-            notifications = db.query(Notification).filter(
-                Notification.user_id == user_id
-            ).order_by(
-                desc(Notification.created_at)
-            ).offset(offset).limit(limit).all()
-            
-            return notifications
+            return query.order_by(
+                desc(Notification.created_at),
+                desc(Notification.id)
+            ).limit(limit).all()
             
         except Exception as e:
             logger.error(f"Error getting notifications for user {user_id}: {e}")
             return []
     
+    # --- Unread counters ---------------------------------------------------
+    
+    def bump_unread_counts(self, db: Session, deltas: Dict[int, int]):
+        """Adjust cached unread counts in the caller's transaction (users without a counter yet are skipped)"""
+        for user_id, delta in deltas.items():
+            if delta:
+                # CASE rather than GREATEST, which SQLite does not have
+                new_count = NotificationUnreadCount.unread_count + delta
+                db.query(NotificationUnreadCount).filter(
+                    NotificationUnreadCount.user_id == user_id
+                ).update(
+                    {NotificationUnreadCount.unread_count: case((new_count < 0, 0), else_=new_count)},
+                    synchronize_session=False
+                )
+    
+    def invalidate_unread_counts(self, db: Session, user_ids: Iterable[int]):
+        """Drop cached counters so they are recounted on next read (after bulk deletes)"""
+        user_ids = list(user_ids)
+        if user_ids:
+            db.query(NotificationUnreadCount).filter(
+                NotificationUnreadCount.user_id.in_(user_ids)
+            ).delete(synchronize_session=False)
+    
+    async def get_unread_count(self, db: Session, user_id: int) -> int:
+        """Unread notifications for a user, from the counter (counted once if it does not exist yet)"""
+        counter = db.get(NotificationUnreadCount, user_id)
+        if counter:
+            return counter.unread_count
+        unread = db.query(func.count(Notification.id)).filter(
+            Notification.user_id == user_id,
+            Notification.is_read == False
+        ).scalar()
+        try:
+            db.add(NotificationUnreadCount(user_id=user_id, unread_count=unread))
+            db.commit()
+        except IntegrityError:
+            # Created concurrently by another request
+            db.rollback()
+            counter = db.get(NotificationUnreadCount, user_id)
+            if counter:
+                return counter.unread_count
+        return unread
+    
     async def mark_notification_read(self, db: Session, notification_id: str, user_id: int) -> bool:
         """Mark a notification as read"""
         try:
@@ -374,7 +295,9 @@ class NotificationService:
             ).first()
             
             if notification:
-                notification.is_read = True
+                if not notification.is_read:
+                    notification.is_read = True
+                    self.bump_unread_counts(db, {user_id: -1})
                 db.commit()
                 logger.info(f"Marked notification {notification_id} as read")
                 return True
@@ -396,6 +319,9 @@ class NotificationService:
                     Notification.is_read == False
                 )
             ).update({"is_read": True})
+            db.query(NotificationUnreadCount).filter(
+                NotificationUnreadCount.user_id == user_id
+            ).update({"unread_count": 0})
             
             db.commit()
             logger.info(f"Marked all notifications as read for user {user_id}")
@@ -464,21 +390,12 @@ class NotificationService:
             db.rollback()
             raise
     
-    async def cleanup_old_notifications(self, db: Session, days_old: int = 30):
-        """Clean up notifications older than specified days"""
-        try:
-            cutoff_date = datetime.utcnow() - timedelta(days=days_old)
-            
-            deleted_count = db.query(Notification).filter(
-                Notification.created_at < cutoff_date
-            ).delete()
-            
-            db.commit()
-            logger.info(f"Cleaned up {deleted_count} old notifications")
-            
-        except Exception as e:
-            logger.error(f"Error cleaning up old notifications: {e}")
-            db.rollback()
+    async def cleanup_old_notifications(self, db: Session, days_old: int = 30) -> int:
+        """Clean up notifications older than specified days (in batches, see RetentionService)"""
+        from app.services.retention_service import retention_service
+        deleted_count = await retention_service.purge("notifications", ttl=timedelta(days=days_old))
+        logger.info(f"Cleaned up {deleted_count} old notifications")
+        return deleted_count
 
 # Global notification service instance
 notification_service = NotificationService()
\ No newline at end of file
@@ -0,0 +1,244 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models.bulk_composer_content import BulkComposerContent
+from app.models.notification import NotificationPlatform, NotificationType
+from app.models.pre_posting_alert import PrePostingAlert, PrePostingAlertStatus
+from app.models.scheduled_post import ScheduledPost
+from app.services.due_time_queue import DueTimeQueue, to_utc
+from app.services.lease_service import lease_service
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+ALERT_LEAD_TIME = timedelta(minutes=10)
+
+POST_MODELS = {
+    "scheduled_post": ScheduledPost,
+    "bulk_composer": BulkComposerContent,
+}
+
+
+def post_kind(post) -> str:
+    return "bulk_composer" if isinstance(post, BulkComposerContent) else "scheduled_post"
+
+
+class PrePostingAlertService:
+    """
+    Durable queue of pre-posting alerts.
+
+    Scheduling a post stores one row due 10 minutes before it goes out. A
+    single timer loop sleeps until the earliest due alert, claims due rows in
+    batches with leases and sends them with its own short-lived session, so
+    alerts survive restarts and memory use does not grow with the number of
+    scheduled posts. Whether the post is still scheduled and whether the user
+    still wants pre-posting alerts is checked at send time. Failed sends are
+    retried with exponential backoff.
+    """
+
+    def __init__(self):
+        self.is_running = False
+        self.batch_size = settings.pre_posting_alert_batch_size
+        self.max_attempts = settings.pre_posting_alert_max_attempts
+        self.retry_base_seconds = settings.pre_posting_alert_retry_base_seconds
+        self.lease_seconds = settings.pre_posting_alert_lease_seconds
+        self.lookahead_size = settings.scheduler_lookahead_size
+        self.due_queue = DueTimeQueue("pre_posting_alerts", max_idle_seconds=settings.scheduler_max_idle_seconds)
+
+    # --- Scheduling ------------------------------------------------------
+
+    def enqueue(self, db: Session, posts: list) -> int:
+        """Create or move the alerts of ``posts`` (ScheduledPost or BulkComposerContent). Returns how many are pending."""
+        now = datetime.now(timezone.utc)
+        wanted: Dict[tuple, tuple] = {}
+        for post in posts:
+            if post.scheduled_datetime is None:
+                continue
+            due_at = to_utc(post.scheduled_datetime) - ALERT_LEAD_TIME
+            if due_at <= now:
+                logger.info(f"Pre-posting alert time has passed for {post_kind(post)} {post.id}")
+                continue
+            wanted[(post_kind(post), post.id)] = (post.user_id, due_at)
+        if not wanted:
+            return 0
+
+        existing = {}
+        for kind in {kind for kind, _ in wanted}:
+            post_ids = [post_id for k, post_id in wanted if k == kind]
+            for alert in db.query(PrePostingAlert).filter(
+                PrePostingAlert.post_kind == kind,
+                PrePostingAlert.post_id.in_(post_ids)
+            ).all():
+                existing[(alert.post_kind, alert.post_id)] = alert
+
+        for (kind, post_id), (user_id, due_at) in wanted.items():
+            alert = existing.get((kind, post_id))
+            if alert is None:
+                db.add(PrePostingAlert(user_id=user_id, post_kind=kind, post_id=post_id, due_at=due_at))
+            else:
+                # Rescheduled post: re-arm its alert
+                alert.due_at = due_at
+                alert.status = PrePostingAlertStatus.PENDING.value
+                alert.attempts = 0
+                alert.last_error = None
+                alert.sent_at = None
+        db.commit()
+        self.due_queue.notify(min(due_at for _, due_at in wanted.values()))
+        logger.info(f"⏰ Queued {len(wanted)} pre-posting alerts")
+        return len(wanted)
+
+    # --- Delivery loop ---------------------------------------------------
+
+    async def start(self):
+        """Deliver alerts as they come due."""
+        self.is_running = True
+        logger.info("🚀 Starting pre-posting alert loop...")
+        while self.is_running:
+            try:
+                await self.send_due_alerts()
+                self.load_upcoming_due_times()
+            except Exception as e:
+                logger.error(f"Error in pre-posting alert loop: {e}")
+                self.due_queue.reset([])
+            await self.due_queue.wait()
+
+    def stop(self):
+        self.is_running = False
+        self.due_queue.notify()
+        logger.info("🛑 Stopping pre-posting alert loop...")
+
+    def load_upcoming_due_times(self):
+        db = SessionLocal()
+        try:
+            now = datetime.now(timezone.utc)
+            rows = db.query(PrePostingAlert.due_at).filter(
+                PrePostingAlert.status == PrePostingAlertStatus.PENDING.value,
+                PrePostingAlert.due_at > now
+            ).order_by(PrePostingAlert.due_at).limit(self.lookahead_size).all()
+            self.due_queue.reset(row.due_at for row in rows)
+        finally:
+            db.close()
+
+    async def send_due_alerts(self):
+        """Claim and send due alerts in batches until none are left."""
+        db = SessionLocal()
+        try:
+            while self.is_running:
+                claimed_ids = lease_service.claim_due_rows(
+                    db,
+                    PrePostingAlert,
+                    criteria=[
+                        PrePostingAlert.status == PrePostingAlertStatus.PENDING.value,
+                        PrePostingAlert.due_at <= datetime.now(timezone.utc)
+                    ],
+                    order_by=PrePostingAlert.due_at,
+                    limit=self.batch_size,
+                    lease_seconds=self.lease_seconds
+                )
+                if not claimed_ids:
+                    break
+                await self._send_batch(db, claimed_ids)
+        finally:
+            db.close()
+
+    def _load_posts(self, db: Session, alerts: List[PrePostingAlert]) -> Dict[tuple, object]:
+        posts = {}
+        for kind, model in POST_MODELS.items():
+            post_ids = [alert.post_id for alert in alerts if alert.post_kind == kind]
+            if post_ids:
+                for post in db.query(model).filter(model.id.in_(post_ids)).all():
+                    posts[(kind, post.id)] = post
+        return posts
+
+    @staticmethod
+    def _is_still_scheduled(kind: str, post) -> bool:
+        if post is None or post.status != "scheduled":
+            return False
+        return kind != "scheduled_post" or bool(post.is_active)
+
+    @staticmethod
+    def _alert_content(kind: str, post) -> tuple:
+        """(platform, strategy_name, message) for a post's alert."""
+        if kind == "scheduled_post":
+            strategy_name = getattr(post.strategy_plan, "name", None) if getattr(post, "strategy_plan", None) else None
+            strategy_name = strategy_name or "Scheduled Post"
+            platform = NotificationPlatform.INSTAGRAM if post.platform == "instagram" else NotificationPlatform.FACEBOOK
+            message = f"Your {strategy_name} strategy will be posted in 10 minutes. If you'd like to change anything before the post is made, now is the time."
+        else:
+            strategy_name = "Bulk Scheduled Post"
+            platform = NotificationPlatform.FACEBOOK  # Default to Facebook for bulk composer
+            if post.social_account and post.social_account.platform == "instagram":
+                platform = NotificationPlatform.INSTAGRAM
+            message = f"Your {strategy_name} will be posted in 10 minutes. If you'd like to change anything before the post is made, now is the time."
+        return platform, strategy_name, message
+
+    def _retry_delay(self, attempts: int) -> timedelta:
+        return timedelta(seconds=self.retry_base_seconds * 2 ** (attempts - 1))
+
+    async def _send_batch(self, db: Session, alert_ids: List[int]):
+        from app.services.notification_service import notification_service
+
+        alerts = db.query(PrePostingAlert).filter(
+            PrePostingAlert.id.in_(alert_ids),
+            PrePostingAlert.lease_owner == lease_service.instance_id
+        ).all()
+        posts = self._load_posts(db, alerts)
+        prefs_by_user = {}
+        # Plain values, so sending (which commits) never needs to reload expired rows
+        pending = [(alert.id, alert.user_id, alert.post_kind, alert.post_id) for alert in alerts]
+        outcomes: Dict[int, tuple] = {}
+
+        for alert_id, user_id, kind, post_id in pending:
+            post = posts.get((kind, post_id))
+            try:
+                if not self._is_still_scheduled(kind, post):
+                    outcomes[alert_id] = (PrePostingAlertStatus.SKIPPED, None)
+                    continue
+                if user_id not in prefs_by_user:
+                    prefs_by_user[user_id] = (await notification_service.get_user_preferences(db, user_id)).pre_posting_enabled
+                if not prefs_by_user[user_id]:
+                    outcomes[alert_id] = (PrePostingAlertStatus.SKIPPED, None)
+                    continue
+                platform, strategy_name, message = self._alert_content(kind, post)
+                await notification_service.create_notification(
+                    db=db,
+                    user_id=user_id,
+                    notification_type=NotificationType.PRE_POSTING,
+                    platform=platform,
+                    message=message,
+                    strategy_name=strategy_name,
+                    post_id=post_id,
+                    scheduled_time=post.scheduled_datetime
+                )
+                outcomes[alert_id] = (PrePostingAlertStatus.SENT, None)
+                logger.info(f"🔔 Sent pre-posting notification for {kind} {post_id} to user {user_id}")
+            except Exception as e:
+                db.rollback()
+                outcomes[alert_id] = (None, str(e))
+                logger.error(f"Error sending pre-posting alert {alert_id}: {e}")
+
+        now = datetime.now(timezone.utc)
+        for alert in db.query(PrePostingAlert).filter(PrePostingAlert.id.in_(list(outcomes))).all():
+            status, error = outcomes[alert.id]
+            alert.attempts += 1
+            if status is None:
+                alert.last_error = error
+                if alert.attempts >= self.max_attempts:
+                    alert.status = PrePostingAlertStatus.FAILED.value
+                else:
+                    # Stays pending; moving it out of the due window keeps the claim loop from retrying it at once
+                    alert.due_at = now + self._retry_delay(alert.attempts)
+            else:
+                alert.status = status.value
+                alert.sent_at = now if status == PrePostingAlertStatus.SENT else None
+            lease_service.release(alert)
+        db.commit()
+
+
+# Global pre-posting alert instance
+pre_posting_alert_service = PrePostingAlertService()
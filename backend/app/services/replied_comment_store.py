@@ -0,0 +1,79 @@
+import logging
+import threading
+from typing import Iterable, Set
+
+from cachetools import LRUCache
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models.instagram_auto_reply_log import AutoReplyLog
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class RepliedCommentStore:
+    """
+    Persistent index of comments we have already auto-replied to.
+
+    Backed by the ``AutoReplyLog`` table so dedup survives restarts and is
+    shared by every replica. A bounded LRU of known-handled comment ids sits in
+    front of it; only positive results are cached because another replica may
+    reply to a comment at any time.
+    """
+
+    def __init__(self, cache_size: int = settings.replied_comment_cache_size):
+        self._cache: LRUCache = LRUCache(maxsize=cache_size)
+        self._lock = threading.Lock()
+
+    def _cache_has(self, comment_id: str) -> bool:
+        with self._lock:
+            return self._cache.get(comment_id, False)
+
+    def _cache_add(self, comment_ids: Iterable[str]):
+        with self._lock:
+            for comment_id in comment_ids:
+                self._cache[comment_id] = True
+
+    def filter_handled(self, db: Session, comment_ids: Iterable[str]) -> Set[str]:
+        """Return which of ``comment_ids`` have already been replied to (one query for cache misses)."""
+        ids = {comment_id for comment_id in comment_ids if comment_id}
+        handled = {comment_id for comment_id in ids if self._cache_has(comment_id)}
+        missing = ids - handled
+        if missing:
+            found = {
+                row.comment_id for row in db.query(AutoReplyLog.comment_id).filter(
+                    AutoReplyLog.comment_id.in_(missing)
+                ).all()
+            }
+            self._cache_add(found)
+            handled |= found
+        return handled
+
+    def is_handled(self, db: Session, comment_id: str) -> bool:
+        return comment_id in self.filter_handled(db, [comment_id])
+
+    def mark_handled(self, db: Session, platform: str, account_id: str, comment_id: str) -> bool:
+        """Record a reply. Returns False if the comment was already recorded (e.g. by another replica)."""
+        if self.is_handled(db, comment_id):
+            return False
+        try:
+            db.add(AutoReplyLog(comment_id=comment_id, platform=platform, account_id=account_id))
+            db.commit()
+            recorded = True
+        except IntegrityError:
+            db.rollback()
+            recorded = False
+        self._cache_add([comment_id])
+        return recorded
+
+    def clear_cache(self):
+        """Drop the in-memory index; the database stays authoritative."""
+        with self._lock:
+            self._cache.clear()
+        logger.info("🧹 Cleared replied comment cache")
+
+
+# Global replied comment store instance
+replied_comment_store = RepliedCommentStore()
@@ -0,0 +1,316 @@
+import asyncio
+import logging
+import os
+import re
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import column, func, select, table, text
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models.bulk_composer_content import BulkComposerContent, BulkComposerStatus
+from app.models.instagram_auto_reply_log import AutoReplyLog
+from app.models.notification import Notification
+from app.services.lease_service import lease_service
+from app.services.media_store import media_store
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+PARTITION_NAME_PATTERN = re.compile(r"_p(?P<year>\d{4})(?P<month>\d{2})$")
+
+
+@dataclass
+class RetentionPolicy:
+    """How old rows of one table may get before they are purged."""
+    name: str
+    model: Any
+    timestamp: Any  # Column (or expression) compared against the cutoff
+    ttl: timedelta
+    criteria: Callable[[], list] = lambda: []  # Extra filters, e.g. only failed posts
+    partitioned: bool = False  # Time-partitioned on PostgreSQL (monthly <table>_pYYYYMM partitions)
+    before_delete: Optional[Callable[[Session, Any], None]] = None  # Gets the ids (list or subquery) about to go
+
+
+@dataclass
+class RetentionStats:
+    rows_purged: int = 0
+    partitions_dropped: int = 0
+    files_purged: int = 0
+    seconds: float = 0.0
+    last_run_at: Optional[str] = None
+    last_error: Optional[str] = None
+    runs: int = 0
+
+
+def _invalidate_unread_counts(db: Session, ids):
+    """Deleting unread notifications makes the cached unread counters stale."""
+    from app.services.notification_service import notification_service
+
+    user_ids = [
+        row.user_id for row in db.query(Notification.user_id).filter(
+            Notification.id.in_(ids),
+            Notification.is_read == False
+        ).distinct()
+    ]
+    notification_service.invalidate_unread_counts(db, user_ids)
+
+
+class RetentionService:
+    """
+    Background purge of old rows and temporary files.
+
+    Each table has its own TTL (``*_RETENTION_DAYS``, 0 keeps rows forever).
+    Rows are deleted in batches of ``RETENTION_BATCH_SIZE`` with a commit and a
+    short pause between batches, so a purge never holds long locks or starves
+    the API. When ``RETENTION_USE_PARTITIONS`` is on and a table is range
+    partitioned on PostgreSQL, whole monthly partitions past the TTL are
+    dropped and the next months' partitions are created ahead of time. Only
+    one instance runs the purge at a time.
+    """
+
+    def __init__(self):
+        self.is_running = False
+        self._stop_requested = False  # Also ends a purge that is part-way through its batches
+        self.interval_seconds = settings.retention_interval_seconds
+        self.batch_size = settings.retention_batch_size
+        self.batch_pause_seconds = settings.retention_batch_pause_seconds
+        self.use_partitions = settings.retention_use_partitions
+        self.temp_media_ttl = timedelta(hours=settings.temp_media_retention_hours)
+        self.temp_media_dirs = [Path("temp_images"), media_store.root / "tmp"]
+        self.policies = {
+            policy.name: policy
+            for policy in [
+                RetentionPolicy(
+                    name="notifications",
+                    model=Notification,
+                    timestamp=Notification.created_at,
+                    ttl=timedelta(days=settings.notification_retention_days),
+                    partitioned=True,
+                    before_delete=_invalidate_unread_counts
+                ),
+                RetentionPolicy(
+                    name="auto_reply_logs",
+                    model=AutoReplyLog,
+                    timestamp=AutoReplyLog.replied_at,
+                    ttl=timedelta(days=settings.reply_log_retention_days),
+                    partitioned=True
+                ),
+                RetentionPolicy(
+                    name="failed_bulk_posts",
+                    model=BulkComposerContent,
+                    timestamp=func.coalesce(BulkComposerContent.updated_at, BulkComposerContent.created_at),
+                    ttl=timedelta(days=settings.failed_post_retention_days),
+                    criteria=lambda: [BulkComposerContent.status == BulkComposerStatus.FAILED.value]
+                ),
+            ]
+        }
+        self.stats_by_name: Dict[str, RetentionStats] = {
+            name: RetentionStats() for name in [*self.policies, "temp_media"]
+        }
+
+    # --- Loop ------------------------------------------------------------
+
+    async def start(self):
+        """Purge on a fixed interval while this instance holds the retention lease."""
+        self.is_running = True
+        logger.info("🚀 Starting retention purge loop...")
+        while self.is_running:
+            try:
+                if await asyncio.to_thread(self._acquire_leadership):
+                    await self.run_once()
+            except Exception as e:
+                logger.error(f"Error in retention loop: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+    def stop(self):
+        self.is_running = False
+        self._stop_requested = True
+        logger.info("🛑 Stopping retention purge loop...")
+
+    def _acquire_leadership(self) -> bool:
+        db = SessionLocal()
+        try:
+            return lease_service.acquire_leadership(db, "retention", self.interval_seconds * 2)
+        finally:
+            db.close()
+
+    async def run_once(self) -> Dict[str, Any]:
+        """Purge every table and the temp media directories once."""
+        for name, policy in self.policies.items():
+            if policy.ttl.total_seconds() > 0:
+                await self.purge(name)
+        await self.purge_temp_media()
+        return self.stats()
+
+    # --- Tables ----------------------------------------------------------
+
+    async def purge(self, name: str, ttl: Optional[timedelta] = None) -> int:
+        """Purge one table's rows older than its TTL (or ``ttl``). Returns rows deleted."""
+        policy = self.policies[name]
+        stats = self.stats_by_name[name]
+        cutoff = datetime.now(timezone.utc) - (ttl or policy.ttl)
+        started = time.monotonic()
+        purged = 0
+        try:
+            if self.use_partitions and policy.partitioned:
+                stats.partitions_dropped += await asyncio.to_thread(self._manage_partitions, policy, cutoff)
+            while not self._stop_requested:
+                deleted = await asyncio.to_thread(self._delete_batch, policy, cutoff)
+                purged += deleted
+                if deleted < self.batch_size:
+                    break
+                await asyncio.sleep(self.batch_pause_seconds)
+            stats.last_error = None
+        except Exception as e:
+            stats.last_error = str(e)
+            logger.error(f"Error purging {name}: {e}")
+        elapsed = time.monotonic() - started
+        stats.rows_purged += purged
+        stats.seconds += elapsed
+        stats.runs += 1
+        stats.last_run_at = datetime.now(timezone.utc).isoformat()
+        if purged:
+            logger.info(f"🧹 Purged {purged} rows from {name} in {elapsed:.1f}s")
+        return purged
+
+    def _delete_batch(self, policy: RetentionPolicy, cutoff: datetime) -> int:
+        """Delete up to one batch of expired rows in its own short transaction."""
+        model = policy.model
+        db = SessionLocal()
+        try:
+            ids = [
+                row.id for row in db.query(model.id).filter(
+                    policy.timestamp < cutoff,
+                    *policy.criteria()
+                ).limit(self.batch_size).all()
+            ]
+            if not ids:
+                return 0
+            if policy.before_delete:
+                policy.before_delete(db, ids)
+            deleted = db.query(model).filter(model.id.in_(ids)).delete(synchronize_session=False)
+            db.commit()
+            return deleted
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    # --- PostgreSQL partitions ---------------------------------------------
+
+    @staticmethod
+    def _month_start(value: datetime, months_ahead: int = 0) -> datetime:
+        month_index = value.year * 12 + value.month - 1 + months_ahead
+        return datetime(month_index // 12, month_index % 12 + 1, 1, tzinfo=timezone.utc)
+
+    def _manage_partitions(self, policy: RetentionPolicy, cutoff: datetime) -> int:
+        """Create upcoming monthly partitions and drop those entirely older than the cutoff.
+
+        Only applies to tables created with ``PARTITION BY RANGE`` on the
+        policy's timestamp column; plain tables are left to batched deletes.
+        Returns the number of partitions dropped.
+        """
+        table_name = policy.model.__tablename__
+        db = SessionLocal()
+        try:
+            if db.get_bind().dialect.name != "postgresql":
+                return 0
+            is_partitioned = db.execute(
+                text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table)"),
+                {"table": table_name}
+            ).first()
+            if not is_partitioned:
+                return 0
+
+            now = datetime.now(timezone.utc)
+            for months_ahead in range(settings.retention_partitions_ahead + 1):
+                start = self._month_start(now, months_ahead)
+                end = self._month_start(now, months_ahead + 1)
+                db.execute(text(
+                    f'CREATE TABLE IF NOT EXISTS "{table_name}_p{start:%Y%m}" PARTITION OF "{table_name}" '
+                    f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+                ))
+
+            partitions = db.execute(
+                text(
+                    "SELECT child.relname FROM pg_inherits "
+                    "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                    "WHERE pg_inherits.inhparent = to_regclass(:table)"
+                ),
+                {"table": table_name}
+            ).scalars().all()
+            dropped = 0
+            for partition in partitions:
+                match = PARTITION_NAME_PATTERN.search(partition)
+                if not match:
+                    continue
+                partition_end = self._month_start(
+                    datetime(int(match.group("year")), int(match.group("month")), 1, tzinfo=timezone.utc), 1
+                )
+                if partition_end <= cutoff:
+                    if policy.before_delete:
+                        policy.before_delete(db, select(table(partition, column("id")).c.id))
+                    db.execute(text(f'ALTER TABLE "{table_name}" DETACH PARTITION "{partition}"'))
+                    db.execute(text(f'DROP TABLE "{partition}"'))
+                    dropped += 1
+                    logger.info(f"🧹 Dropped partition {partition}")
+            db.commit()
+            return dropped
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    # --- Temporary files ---------------------------------------------------
+
+    async def purge_temp_media(self) -> int:
+        """Delete temp uploads and spooled files older than ``TEMP_MEDIA_RETENTION_HOURS``."""
+        stats = self.stats_by_name["temp_media"]
+        started = time.monotonic()
+        try:
+            purged = await asyncio.to_thread(self._purge_temp_files)
+            stats.last_error = None
+        except Exception as e:
+            purged = 0
+            stats.last_error = str(e)
+            logger.error(f"Error purging temp media: {e}")
+        elapsed = time.monotonic() - started
+        stats.files_purged += purged
+        stats.seconds += elapsed
+        stats.runs += 1
+        stats.last_run_at = datetime.now(timezone.utc).isoformat()
+        if purged:
+            logger.info(f"🧹 Purged {purged} temp media files in {elapsed:.1f}s")
+        return purged
+
+    def _purge_temp_files(self) -> int:
+        if self.temp_media_ttl.total_seconds() <= 0:
+            return 0
+        cutoff = time.time() - self.temp_media_ttl.total_seconds()
+        purged = 0
+        for directory in self.temp_media_dirs:
+            if not directory.is_dir():
+                continue
+            for entry in os.scandir(directory):
+                try:
+                    if entry.is_file() and entry.stat().st_mtime < cutoff:
+                        os.remove(entry.path)
+                        purged += 1
+                except FileNotFoundError:
+                    pass  # Removed concurrently
+        return purged
+
+    def stats(self) -> Dict[str, Any]:
+        return {name: vars(stats).copy() for name, stats in self.stats_by_name.items()}
+
+
+# Global retention service instance
+retention_service = RetentionService()
@@ -3,7 +3,8 @@ import logging
 from datetime import datetime, timedelta
 from typing import List
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.config import get_settings
+from app.database import get_db, SessionLocal
 from app.models.scheduled_post import ScheduledPost, FrequencyType
 from app.models.social_account import SocialAccount
 from app.models.post import Post, PostStatus, PostType
@@ -11,19 +12,26 @@ from app.services.groq_service import groq_service
 from app.services.facebook_service import facebook_service
 from app.services.auto_reply_service import auto_reply_service
 from app.services.instagram_service import instagram_service
-from app.services.cloudinary_service import cloudinary_service
+from app.services.cloudinary_upload_service import cloudinary_upload_service
+from app.services.carousel_service import carousel_generation_service
 from app.services.notification_service import notification_service
+from app.services.due_time_queue import DueTimeQueue
+from app.services.lease_service import lease_service
 import pytz
 from pytz import timezone, UTC
 import base64
 import io
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
 
 class SchedulerService:
     def __init__(self):
         self.running = False
-        self.check_interval = 60  # Check every 60 seconds
+        self.check_interval = 60  # Auto-reply sweep every 60 seconds
+        self.lookahead_size = settings.scheduler_lookahead_size
+        self.due_queue = DueTimeQueue("instagram_scheduler", max_idle_seconds=settings.scheduler_max_idle_seconds)
+        self._auto_reply_task: asyncio.Task | None = None
     
     def is_base64_image(self, data):
         return data and isinstance(data, str) and data.startswith("data:image/")
@@ -40,57 +48,111 @@ class SchedulerService:
             return
         
         self.running = True
-        logger.info("🚀 Scheduler service started - checking every 30 seconds")
+        logger.info("🚀 Scheduler service started - publishing at due times, auto-replies every 60 seconds")
+        
+        # Auto-replies are a periodic sweep; scheduled posts are driven by their due times
+        self._auto_reply_task = asyncio.create_task(self._auto_reply_loop())
         
         while self.running:
             try:
                 await self.process_scheduled_posts()
-                await self.process_auto_replies()
-                await asyncio.sleep(self.check_interval)
+                self.load_upcoming_due_times()
             except Exception as e:
                 logger.error(f"Error in scheduler loop: {e}")
-                await asyncio.sleep(self.check_interval)
+                # Fall back to the idle sweep instead of spinning on stale due times
+                self.due_queue.reset([])
+            await self.due_queue.wait()
+    
+    async def _auto_reply_loop(self):
+        """Run the auto-reply sweep on a fixed interval"""
+        while self.running:
+            try:
+                await self.process_auto_replies()
+            except Exception as e:
+                logger.error(f"Error in auto-reply loop: {e}")
+            await asyncio.sleep(self.check_interval)
     
     def stop(self):
         """Stop the scheduler service"""
         self.running = False
+        self.due_queue.notify()
+        if self._auto_reply_task:
+            self._auto_reply_task.cancel()
+            self._auto_reply_task = None
         logger.info("🛑 Scheduler service stopped")
     
+    def notify_schedule_changed(self, due_at: datetime | None = None):
+        """Wake the scheduler after posts were scheduled or rescheduled"""
+        self.due_queue.notify(due_at)
+    
+    def load_upcoming_due_times(self):
+        """Load the next ``lookahead_size`` Instagram due times into the due-time queue"""
+        db = SessionLocal()
+        try:
+            now_utc = datetime.now(UTC)
+            rows = db.query(ScheduledPost.scheduled_datetime).filter(
+                ScheduledPost.status.in_(['scheduled', 'ready']),
+                ScheduledPost.platform == 'instagram',
+                ScheduledPost.is_active == True,
+                ScheduledPost.scheduled_datetime > now_utc
+            ).order_by(ScheduledPost.scheduled_datetime).limit(self.lookahead_size).all()
+            self.due_queue.reset(row.scheduled_datetime for row in rows)
+        finally:
+            db.close()
+    
     async def process_scheduled_posts(self):
         """Process all scheduled posts that are due for execution"""
         db: Session = None
         try:
             # Get database session
             db = next(get_db())
+            # Without SKIP LOCKED (SQLite) only the elected leader publishes
+            if not lease_service.should_run(db, "instagram_scheduler", settings.scheduler_max_idle_seconds * 2):
+                return
             # Find all scheduled Instagram posts that are due for execution
             now_local = datetime.now(timezone("Asia/Kolkata"))
             logger.info(f"[DEBUG] Scheduler now (Asia/Kolkata): {now_local}")
-            all_posts = db.query(ScheduledPost).filter(
-                ScheduledPost.is_active == True,
-                ScheduledPost.status == "scheduled",
-                ScheduledPost.platform == "instagram"
-            ).all()
-            for post in all_posts:
-                logger.info(f"[DEBUG] Post {post.id} scheduled_datetime: {post.scheduled_datetime} (type: {type(post.scheduled_datetime)})")
             # Query for due posts (works with Asia/Kolkata or UTC depending on now)
             now_utc = now_local.astimezone(UTC)
-            due_posts = db.query(ScheduledPost).filter(
-                ScheduledPost.status.in_(['scheduled', 'ready']),
-                ScheduledPost.platform == 'instagram',
-                ScheduledPost.scheduled_datetime <= now_utc,
-                ScheduledPost.is_active == True
-            ).all()
-            logger.info(f"✅ Found {len(due_posts)} posts ready to publish at {now_local}")
             # NOTE: If you migrate all scheduled_datetime to UTC, set now = datetime.utcnow() and ensure all DB times are UTC.
-            if due_posts:
-                logger.info(f"📅 Found {len(due_posts)} scheduled Instagram posts due for execution")
-            else:
+            seen_ids: set[int] = set()
+            while True:
+                # Claim due posts so other replicas skip them
+                claimed_ids = lease_service.claim_due_rows(
+                    db,
+                    ScheduledPost,
+                    criteria=[
+                        ScheduledPost.id.notin_(list(seen_ids)),
+                        ScheduledPost.status.in_(['scheduled', 'ready']),
+                        ScheduledPost.platform == 'instagram',
+                        ScheduledPost.scheduled_datetime <= now_utc,
+                        ScheduledPost.is_active == True
+                    ],
+                    order_by=ScheduledPost.scheduled_datetime,
+                    limit=self.lookahead_size,
+                    lease_seconds=settings.scheduler_lease_seconds
+                )
+                # Posts that stay scheduled (e.g. disconnected account) are retried next sweep
+                if not claimed_ids:
+                    break
+                seen_ids.update(claimed_ids)
+                logger.info(f"📅 Claimed {len(claimed_ids)} scheduled Instagram posts due for execution")
+                for post_id in claimed_ids:
+                    scheduled_post = db.query(ScheduledPost).filter(
+                        ScheduledPost.id == post_id,
+                        ScheduledPost.lease_owner == lease_service.instance_id
+                    ).first()
+                    if not scheduled_post:
+                        continue
+                    try:
+                        await self.execute_scheduled_instagram_post(scheduled_post, db)
+                    except Exception as e:
+                        logger.error(f"Failed to execute scheduled Instagram post {post_id}: {e}")
+                    finally:
+                        lease_service.release(scheduled_post)
+                        db.commit()
+            if not seen_ids:
                 logger.info(f"🔍 No scheduled Instagram posts due for execution at {now_local}")
-            for scheduled_post in due_posts:
-                try:
-                    await self.execute_scheduled_instagram_post(scheduled_post, db)
-                except Exception as e:
-                    logger.error(f"Failed to execute scheduled Instagram post {scheduled_post.id}: {e}")
         except Exception as e:
             logger.error(f"Error processing scheduled Instagram posts: {e}")
         finally:
@@ -113,7 +175,7 @@ class SchedulerService:
             image_data = base64.b64decode(image_base64)
             
             # Upload to Cloudinary
-            upload_result = cloudinary_service.upload_image_with_instagram_transform(image_data)
+            upload_result = await cloudinary_upload_service.upload_image(image_data)
             
             if not upload_result["success"]:
                 return {"success": False, "error": f"Cloudinary upload failed: {upload_result.get('error')}"}
@@ -173,7 +235,7 @@ class SchedulerService:
                     try:
                         base64_data = self.extract_base64(scheduled_post.image_url)
                         image_data = base64.b64decode(base64_data)
-                        upload_result = cloudinary_service.upload_image_with_instagram_transform(image_data)
+                        upload_result = await cloudinary_upload_service.upload_image(image_data)
                         if upload_result["success"]:
                             scheduled_post.image_url = upload_result["url"]
                             db.commit()
@@ -212,24 +274,15 @@ class SchedulerService:
             elif post_type == "carousel":
                 if not scheduled_post.media_urls or len(scheduled_post.media_urls) == 0:
                     logger.info(f"🎨 No media URLs found for carousel post, generating AI images...")
-                    # Generate 3-5 images for carousel
+                    # Generate 3-5 images for carousel, concurrently
                     num_images = min(5, max(3, len(scheduled_post.prompt) // 100 + 3))  # Dynamic number based on prompt length
-                    carousel_urls = []
-                    
-                    for i in range(num_images):
-                        # Create variations of the prompt for diversity
-                        variation_prompt = f"{scheduled_post.prompt} - variation {i+1}"
-                        image_result = await self.generate_and_upload_image(variation_prompt, "feed")
-                        if image_result["success"]:
-                            carousel_urls.append(image_result["cloudinary_url"])
-                        else:
-                            logger.error(f"❌ Failed to generate carousel image {i+1}: {image_result.get('error')}")
+                    carousel_result = await carousel_generation_service.generate(scheduled_post.prompt, num_images, "feed")
                     
-                    if len(carousel_urls) >= 3:
-                        scheduled_post.media_urls = carousel_urls
-                        logger.info(f"✅ Updated scheduled post with {len(carousel_urls)} Cloudinary image URLs for carousel")
+                    if carousel_result["success"]:
+                        scheduled_post.media_urls = carousel_result["image_urls"]
+                        logger.info(f"✅ Updated scheduled post with {len(scheduled_post.media_urls)} image URLs for carousel")
                     else:
-                        logger.error(f"❌ Failed to generate enough images for carousel")
+                        logger.error(f"❌ Failed to generate enough images for carousel: {carousel_result.get('error')}")
                         scheduled_post.status = "failed"
                         scheduled_post.is_active = False
                         scheduled_post.last_executed = datetime.utcnow()
@@ -260,7 +313,7 @@ class SchedulerService:
                     try:
                         base64_data = self.extract_base64(scheduled_post.reel_thumbnail_url)
                         thumbnail_data = base64.b64decode(base64_data)
-                        upload_result = cloudinary_service.upload_thumbnail_with_instagram_transform(thumbnail_data)
+                        upload_result = await cloudinary_upload_service.upload_thumbnail(thumbnail_data)
                         if upload_result["success"]:
                             scheduled_post.reel_thumbnail_url = upload_result["url"]
                             db.commit()
@@ -350,6 +403,7 @@ class SchedulerService:
                         await notification_service.send_success_notification(
                             db=db,
                             post_id=scheduled_post.id,
+                            user_id=scheduled_post.user_id,
                             platform="instagram",
                             strategy_name=strategy_name
                         )
@@ -366,6 +420,7 @@ class SchedulerService:
                         await notification_service.send_failure_notification(
                             db=db,
                             post_id=scheduled_post.id,
+                            user_id=scheduled_post.user_id,
                             platform="instagram",
                             strategy_name=strategy_name,
                             error=error_message
@@ -382,6 +437,7 @@ class SchedulerService:
                     await notification_service.send_failure_notification(
                         db=db,
                         post_id=scheduled_post.id,
+                        user_id=scheduled_post.user_id,
                         platform="instagram",
                         strategy_name=strategy_name,
                         error=str(ig_error)
@@ -435,6 +491,10 @@ class SchedulerService:
             # Get database session
             db = next(get_db())
             
+            # Only one replica sweeps comments, otherwise each would reply
+            if not lease_service.acquire_leadership(db, "auto_reply_sweep", ttl_seconds=self.check_interval * 3):
+                return
+            
             # Process Facebook auto-replies
             await auto_reply_service.process_auto_replies(db)
             
@@ -1,131 +1,252 @@
-import requests
+import asyncio
+import base64
 import logging
-from typing import Dict, Optional
-from app.config import get_settings
-import os
-from dotenv import load_dotenv
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+import httpx
 
-load_dotenv()
+from app.config import get_settings
+from app.services.generation_cache import generation_cache
+from app.services.http_client import http_client_service
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# SDXL only accepts its fixed set of sizes; the Facebook sizes need v1.6
+SDXL_ENGINE = "stable-diffusion-xl-1024-v1-0"
+SD16_ENGINE = "stable-diffusion-v1-6"
+
+MAX_RETRY_DELAY_SECONDS = 60
+
+
 class StabilityService:
-    """Service for Stability AI image generation."""
-    
+    """
+    Async Stability AI client shared by the Facebook and Instagram paths.
+
+    Requests go through the pooled application HTTP client with explicit
+    timeouts. At most ``STABILITY_MAX_CONCURRENCY`` generations run at once.
+    Responses with 429 or 5xx are retried up to ``STABILITY_MAX_RETRIES``
+    times, waiting for ``Retry-After`` when the API sends it and backing off
+    exponentially otherwise. Identical requests are served from the
+    generation cache.
+    """
+
     def __init__(self):
-        self.api_key = os.getenv('STABILITY_API_KEY')
         self.api_host = "https://api.stability.ai"
-        self.engine_id = "stable-diffusion-xl-1024-v1-0"
-        
+        self.api_key = settings.stability_api_key.strip() if settings.stability_api_key else None
+        self.engine_id = SDXL_ENGINE
+        self.max_retries = settings.stability_max_retries
+        self.timeout = httpx.Timeout(settings.stability_timeout_seconds, connect=settings.http_connect_timeout_seconds)
+        # Bounds concurrent generations so bursts (carousels, bulk scheduling) stay within rate limits
+        self._semaphore = asyncio.Semaphore(settings.stability_max_concurrency)
+
+    def is_configured(self) -> bool:
+        """Check if Stability service is properly configured."""
+        return bool(self.api_key)
+
     async def generate_image(
-        self, 
-        prompt: str, 
-        negative_prompt: str = None,
+        self,
+        prompt: str,
+        negative_prompt: Optional[str] = None,
         width: int = 1024,
         height: int = 1024,
         cfg_scale: float = 7.0,
         steps: int = 30,
-        samples: int = 1
-    ) -> Dict:
-        """Generate an image using Stability AI."""
-        try:
-            # Check if API key is configured
-            if not self.api_key:
-                logger.error("Stability AI API key not configured")
-                return {
-                    "success": False,
-                    "error": "Stability AI API key not configured. Please set STABILITY_API_KEY environment variable."
-                }
-            
-            # Log API key status (without exposing the full key)
-            api_key_status = "Configured" if self.api_key else "Not configured"
-            logger.info(f"Stability AI API key status: {api_key_status}")
-            if self.api_key:
-                logger.info(f"API key starts with: {self.api_key[:10]}...")
-            
-            url = f"{self.api_host}/v1/generation/{self.engine_id}/text-to-image"
-            
-            headers = {
-                "Content-Type": "application/json",
-                "Accept": "application/json",
-                "Authorization": f"Bearer {self.api_key}"
-            }
-            
-            # Prepare text prompts
-            text_prompts = [{"text": prompt, "weight": 1.0}]
-            
-            # Add negative prompt if provided
-            if negative_prompt:
-                text_prompts.append({"text": negative_prompt, "weight": -1.0})
-            
-            payload = {
-                "text_prompts": text_prompts,
-                "cfg_scale": cfg_scale,
-                "height": height,
-                "width": width,
-                "samples": samples,
-                "steps": steps,
-            }
-            
-            logger.info(f"Making request to Stability AI with prompt: {prompt[:50]}...")
-            logger.info(f"Dimensions: {width}x{height}, Steps: {steps}, CFG: {cfg_scale}")
-            response = requests.post(url, headers=headers, json=payload)
-            
-            # Handle different HTTP status codes
-            if response.status_code == 401:
-                logger.error("Stability AI API key is invalid or expired")
-                return {
-                    "success": False,
-                    "error": "Invalid or expired Stability AI API key. Please check your API key in the .env file."
-                }
-            elif response.status_code == 429:
-                logger.error("Stability AI rate limit exceeded")
-                return {
-                    "success": False,
-                    "error": "Rate limit exceeded. Please wait a few minutes before trying again."
-                }
-            elif response.status_code != 200:
-                logger.error(f"Stability AI API error: {response.status_code} - {response.text}")
-                return {
-                    "success": False,
-                    "error": f"Stability AI API error: {response.status_code} - {response.text}"
-                }
-            
-            response.raise_for_status()
-            
-            # Extract base64 image from response
-            result = response.json()
-            if "artifacts" in result and len(result["artifacts"]) > 0:
-                logger.info("Image generated successfully")
-                return {
-                    "success": True,
-                    "image_base64": result["artifacts"][0]["base64"],
-                    "seed": result["artifacts"][0].get("seed"),
-                    "finish_reason": result["artifacts"][0].get("finishReason")
-                }
-            
-            return {
-                "success": False,
-                "error": "No image generated"
-            }
-            
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Stability AI request failed: {e}")
-            return {
-                "success": False,
-                "error": f"Request failed: {str(e)}"
-            }
-        except Exception as e:
-            logger.error(f"Stability AI image generation failed: {e}")
+        samples: int = 1,
+        style_preset: Optional[str] = None,
+        engine_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Generate an image using Stability AI.
+
+        Args:
+            prompt: Text description of the image to generate
+            negative_prompt: What to avoid in the image
+            width: Image width (must be a size supported by the engine)
+            height: Image height (must be a size supported by the engine)
+            cfg_scale: How strictly the diffusion process adheres to the prompt (0-35)
+            steps: Number of diffusion steps (10-150)
+            samples: Number of images to generate (1-10)
+            style_preset: Style preset to apply
+            engine_id: Engine to use (defaults to SDXL)
+
+        Returns:
+            Dict containing generation result and image data
+        """
+        if not self.api_key:
+            logger.error("Stability AI API key not configured")
             return {
                 "success": False,
-                "error": str(e)
+                "error": "Stability AI API key not configured. Please set STABILITY_API_KEY environment variable."
             }
-    
-    def is_configured(self) -> bool:
-        """Check if Stability service is properly configured."""
-        return bool(self.api_key)
+
+        engine_id = engine_id or self.engine_id
+        params = {
+            "prompt": prompt,
+            "negative_prompt": negative_prompt,
+            "width": width,
+            "height": height,
+            "cfg_scale": cfg_scale,
+            "steps": steps,
+            "samples": samples,
+            "style_preset": style_preset
+        }
+        result = await generation_cache.get_or_generate(
+            engine_id, params, lambda: self._generate_image(engine_id, **params)
+        )
+        if result.get("success"):
+            result.update(prompt=prompt, width=width, height=height, cfg_scale=cfg_scale, steps=steps)
+        return result
+
+    @staticmethod
+    def _retry_after_seconds(response: httpx.Response) -> Optional[float]:
+        value = response.headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return None
+
+    def _retry_delay(self, response: Optional[httpx.Response], attempt: int) -> float:
+        delay = self._retry_after_seconds(response) if response is not None else None
+        if delay is None:
+            delay = 2 ** attempt + random.uniform(0, 1)
+        return min(delay, MAX_RETRY_DELAY_SECONDS)
+
+    async def _generate_image(
+        self,
+        engine_id: str,
+        prompt: str,
+        negative_prompt: Optional[str],
+        width: int,
+        height: int,
+        cfg_scale: float,
+        steps: int,
+        samples: int,
+        style_preset: Optional[str]
+    ) -> Dict[str, Any]:
+        """Call the text-to-image API with retries."""
+        headers = {
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+            "Authorization": f"Bearer {self.api_key}"
+        }
+        text_prompts = [{"text": prompt, "weight": 1.0}]
+        if negative_prompt:
+            text_prompts.append({"text": negative_prompt, "weight": -1.0})
+        payload = {
+            "text_prompts": text_prompts,
+            "cfg_scale": cfg_scale,
+            "height": height,
+            "width": width,
+            "samples": samples,
+            "steps": steps,
+        }
+        if style_preset:
+            payload["style_preset"] = style_preset
+        url = f"{self.api_host}/v1/generation/{engine_id}/text-to-image"
+
+        for attempt in range(self.max_retries + 1):
+            response = None
+            try:
+                async with self._semaphore:
+                    logger.info(f"Making request to Stability AI ({engine_id}) with prompt: {prompt[:50]}...")
+                    logger.info(f"Dimensions: {width}x{height}, Steps: {steps}, CFG: {cfg_scale}")
+                    response = await http_client_service.client.post(url, headers=headers, json=payload, timeout=self.timeout)
+            except httpx.TimeoutException as e:
+                error = f"Request timed out: {e}"
+            except httpx.HTTPError as e:
+                error = f"Request failed: {e}"
+            else:
+                if response.status_code == 200:
+                    artifacts = response.json().get("artifacts", [])
+                    if not artifacts:
+                        return {"success": False, "error": "No image generated"}
+                    logger.info("Image generated successfully")
+                    return {
+                        "success": True,
+                        "image_base64": artifacts[0].get("base64"),
+                        "seed": artifacts[0].get("seed"),
+                        "finish_reason": artifacts[0].get("finishReason")
+                    }
+                if response.status_code == 401:
+                    logger.error("Stability AI API key is invalid or expired")
+                    return {
+                        "success": False,
+                        "error": "Invalid or expired Stability AI API key. Please check your API key in the .env file."
+                    }
+                if response.status_code == 429:
+                    error = "Rate limit exceeded. Please wait a few minutes before trying again."
+                elif response.status_code >= 500:
+                    error = f"Stability AI API error: {response.status_code} - {response.text}"
+                else:
+                    logger.error(f"Stability AI API error: {response.status_code} - {response.text}")
+                    return {"success": False, "error": f"Stability AI API error: {response.status_code} - {response.text}"}
+
+            if attempt == self.max_retries:
+                break
+            delay = self._retry_delay(response, attempt)
+            logger.warning(f"⚠️ Stability AI attempt {attempt + 1} failed ({error}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+        logger.error(f"Stability AI image generation failed: {error}")
+        return {"success": False, "error": error}
+
+    async def generate_image_with_facebook_optimization(
+        self,
+        prompt: str,
+        post_type: str = "feed"
+    ) -> Dict[str, Any]:
+        """
+        Generate an image optimized for Facebook posts.
+
+        Args:
+            prompt: Text description of the image
+            post_type: Type of Facebook post (feed, story, cover)
+
+        Returns:
+            Dict containing generation result
+        """
+        # Facebook-optimized dimensions (must be multiples of 64)
+        dimensions = {
+            "feed": (1216, 640),      # Standard Facebook post (close to 1200x630)
+            "story": (1088, 1920),    # Facebook Story (close to 1080x1920)
+            "cover": (1664, 832),     # Facebook Cover Photo (close to 1640x859)
+            "profile": (384, 384),    # Profile picture (close to 400x400)
+            "square": (1088, 1088)    # Square post (close to 1080x1080)
+        }
+
+        width, height = dimensions.get(post_type, dimensions["feed"])
+
+        # Enhance prompt for social media
+        enhanced_prompt = f"High-quality, engaging, professional social media image: {prompt}, vibrant colors, good lighting, visually appealing"
+
+        # Add negative prompt for better quality
+        negative_prompt = "blurry, low quality, distorted, text overlay, watermark, ugly, bad anatomy"
+
+        return await self.generate_image(
+            prompt=enhanced_prompt,
+            negative_prompt=negative_prompt,
+            width=width,
+            height=height,
+            cfg_scale=8.0,  # Slightly higher for better prompt adherence
+            steps=40,       # More steps for better quality
+            samples=1,
+            engine_id=SD16_ENGINE
+        )
+
+    def convert_base64_to_bytes(self, base64_string: str) -> bytes:
+        """Convert base64 string to bytes."""
+        return base64.b64decode(base64_string)
+
 
 # Global service instance
 stability_service = StabilityService()
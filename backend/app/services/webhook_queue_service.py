@@ -0,0 +1,263 @@
+import asyncio
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models.webhook_event import WebhookEvent, WebhookEventStatus
+from app.services.due_time_queue import DueTimeQueue
+from app.services.lease_service import lease_service
+from app.services.instagram_auto_reply_service import handle_incoming_comment_webhook, handle_incoming_dm_webhook
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Retry delays grow exponentially from the base up to this cap
+MAX_RETRY_DELAY_SECONDS = 3600
+
+
+class WebhookQueueService:
+    """
+    Durable queue between the webhook endpoint and the auto-reply handlers.
+
+    The endpoint only splits a delivery into one row per comment/DM (keyed on
+    the comment or message id, so redeliveries are dropped) and returns. A
+    dispatcher claims due rows with leases and hands them to a fixed pool of
+    consumers through a bounded in-memory queue, which provides backpressure.
+    Failed events are retried with exponential backoff.
+    """
+
+    def __init__(self):
+        self.is_running = False
+        self.consumer_count = settings.webhook_consumer_count
+        self.max_attempts = settings.webhook_max_attempts
+        self.retry_base_seconds = settings.webhook_retry_base_seconds
+        self.lease_seconds = settings.webhook_lease_seconds
+        self.lookahead_size = settings.scheduler_lookahead_size
+        self.due_queue = DueTimeQueue("webhook_events", max_idle_seconds=settings.scheduler_max_idle_seconds)
+        self.handlers = {
+            "comment": handle_incoming_comment_webhook,
+            "dm": handle_incoming_dm_webhook,
+        }
+        self._work: Optional[asyncio.Queue] = None
+        self._consumers: List[asyncio.Task] = []
+
+    # --- Ingestion -------------------------------------------------------
+
+    def split_events(self, data: Dict[str, Any]) -> List[Tuple[str, str, Dict[str, Any]]]:
+        """Split a webhook delivery into (event_type, dedup_key, payload) per comment/DM.
+
+        Each payload keeps the delivery's shape with a single change, so the
+        existing handlers process it unchanged.
+        """
+        events = []
+        for entry in data.get("entry", []):
+            for change in entry.get("changes", []):
+                field = change.get("field")
+                value = change.get("value") or {}
+                if field == "comments":
+                    event_type, event_id = "comment", value.get("id")
+                elif field == "messages":
+                    event_type, event_id = "dm", (value.get("message") or {}).get("mid")
+                else:
+                    continue
+                if not event_id:
+                    # No natural id: fall back to the content so identical redeliveries still collapse
+                    event_id = hashlib.sha256(json.dumps(change, sort_keys=True).encode()).hexdigest()
+                payload = {
+                    "object": data.get("object"),
+                    "entry": [{"id": entry.get("id"), "time": entry.get("time"), "changes": [change]}],
+                }
+                events.append((event_type, f"instagram:{event_type}:{event_id}", payload))
+        return events
+
+    def enqueue(self, db: Session, data: Dict[str, Any]) -> int:
+        """Store the relevant events of a delivery. Returns how many new events were queued."""
+        events = {key: (event_type, payload) for event_type, key, payload in self.split_events(data)}
+        if not events:
+            return 0
+
+        existing = {
+            row.dedup_key for row in db.query(WebhookEvent.dedup_key).filter(
+                WebhookEvent.dedup_key.in_(list(events))
+            ).all()
+        }
+        now = datetime.now(timezone.utc)
+        new_events = [
+            WebhookEvent(
+                source="instagram",
+                event_type=event_type,
+                dedup_key=key,
+                payload=payload,
+                next_attempt_at=now
+            )
+            for key, (event_type, payload) in events.items() if key not in existing
+        ]
+        if not new_events:
+            logger.info(f"🔁 Dropped {len(events)} redelivered webhook events")
+            return 0
+
+        try:
+            db.add_all(new_events)
+            db.commit()
+            queued = len(new_events)
+        except IntegrityError:
+            # A concurrent delivery inserted some of them; insert one by one
+            db.rollback()
+            queued = 0
+            for event in new_events:
+                try:
+                    db.add(event)
+                    db.commit()
+                    queued += 1
+                except IntegrityError:
+                    db.rollback()
+
+        if queued:
+            self.due_queue.notify()
+        logger.info(f"📥 Queued {queued} webhook events")
+        return queued
+
+    # --- Consumers -------------------------------------------------------
+
+    async def start(self):
+        """Start the dispatcher and the consumer pool."""
+        self.is_running = True
+        logger.info(f"🚀 Starting webhook queue with {self.consumer_count} consumers...")
+        self._work = asyncio.Queue(maxsize=self.consumer_count * 2)
+        self._consumers = [asyncio.create_task(self._consume()) for _ in range(self.consumer_count)]
+
+        while self.is_running:
+            try:
+                await self.dispatch_due_events()
+                self.load_upcoming_due_times()
+            except Exception as e:
+                logger.error(f"Error in webhook queue dispatcher: {e}")
+                self.due_queue.reset([])
+            await self.due_queue.wait()
+
+    def stop(self):
+        """Stop the dispatcher and cancel the consumers (unfinished events are retried after their lease)."""
+        self.is_running = False
+        self.due_queue.notify()
+        for task in self._consumers:
+            task.cancel()
+        self._consumers = []
+        logger.info("🛑 Stopping webhook queue...")
+
+    def load_upcoming_due_times(self):
+        """Load the next retry times into the due-time queue."""
+        db = SessionLocal()
+        try:
+            now = datetime.now(timezone.utc)
+            rows = db.query(WebhookEvent.next_attempt_at).filter(
+                WebhookEvent.status == WebhookEventStatus.PENDING.value,
+                WebhookEvent.next_attempt_at > now
+            ).order_by(WebhookEvent.next_attempt_at).limit(self.lookahead_size).all()
+            self.due_queue.reset(row.next_attempt_at for row in rows)
+        finally:
+            db.close()
+
+    async def dispatch_due_events(self):
+        """Claim due events and feed them to the consumers.
+
+        Events are claimed in batches no larger than the consumer pool, and
+        ``put`` blocks while the consumers are busy, so a burst of deliveries
+        never holds more leases than can be worked off promptly.
+        """
+        db = SessionLocal()
+        try:
+            while self.is_running:
+                now = datetime.now(timezone.utc)
+                claimed_ids = lease_service.claim_due_rows(
+                    db,
+                    WebhookEvent,
+                    criteria=[
+                        WebhookEvent.status.in_([
+                            WebhookEventStatus.PENDING.value,
+                            # Left behind by a crashed instance once its lease expired
+                            WebhookEventStatus.PROCESSING.value,
+                        ]),
+                        WebhookEvent.next_attempt_at <= now
+                    ],
+                    order_by=WebhookEvent.next_attempt_at,
+                    limit=self.consumer_count,
+                    lease_seconds=self.lease_seconds
+                )
+                if not claimed_ids:
+                    break
+                for event_id in claimed_ids:
+                    await self._work.put(event_id)
+        finally:
+            db.close()
+
+    async def _consume(self):
+        while True:
+            event_id = await self._work.get()
+            try:
+                await self.process_event(event_id)
+            except Exception as e:
+                logger.error(f"❌ Webhook consumer failed for event {event_id}: {e}")
+            finally:
+                self._work.task_done()
+
+    def _retry_delay(self, attempts: int) -> timedelta:
+        return timedelta(seconds=min(self.retry_base_seconds * 2 ** (attempts - 1), MAX_RETRY_DELAY_SECONDS))
+
+    async def process_event(self, event_id: int):
+        """Run the handler for one claimed event and record the outcome."""
+        db = SessionLocal()
+        try:
+            event = db.query(WebhookEvent).filter(
+                WebhookEvent.id == event_id,
+                WebhookEvent.lease_owner == lease_service.instance_id
+            ).first()
+            if not event:
+                # Lease was taken over by another instance
+                return
+
+            event.status = WebhookEventStatus.PROCESSING.value
+            event.attempts += 1
+            db.commit()
+
+            handler = self.handlers.get(event.event_type)
+            error = None
+            if handler is None:
+                error = f"No handler for event type '{event.event_type}'"
+            else:
+                try:
+                    result = await handler(event.payload)
+                    if isinstance(result, dict) and result.get("status") == "error":
+                        error = result.get("detail") or "Handler reported an error"
+                except Exception as e:
+                    error = str(e)
+
+            now = datetime.now(timezone.utc)
+            if error is None:
+                event.status = WebhookEventStatus.DONE.value
+                event.processed_at = now
+                event.last_error = None
+            elif event.attempts >= self.max_attempts or handler is None:
+                event.status = WebhookEventStatus.FAILED.value
+                event.last_error = error
+                logger.error(f"❌ Webhook event {event.dedup_key} failed permanently: {error}")
+            else:
+                event.status = WebhookEventStatus.PENDING.value
+                event.next_attempt_at = now + self._retry_delay(event.attempts)
+                event.last_error = error
+                self.due_queue.notify(event.next_attempt_at)
+                logger.warning(f"⚠️ Webhook event {event.dedup_key} failed (attempt {event.attempts}), retrying at {event.next_attempt_at}")
+            lease_service.release(event)
+            db.commit()
+        finally:
+            db.close()
+
+
+# Global webhook queue instance
+webhook_queue_service = WebhookQueueService()
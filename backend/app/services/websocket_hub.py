@@ -0,0 +1,233 @@
+import asyncio
+import logging
+import uuid
+from collections import defaultdict
+from typing import Any, Dict, Optional, Set
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+try:
+    import orjson
+
+    def dumps(value: Any) -> str:
+        return orjson.dumps(value).decode()
+
+    loads = orjson.loads
+except ImportError:  # orjson is optional; the standard library is slower but equivalent
+    import json
+
+    def dumps(value: Any) -> str:
+        return json.dumps(value, separators=(",", ":"), default=str)
+
+    loads = json.loads
+
+# WebSocket close code asking the client to reconnect later
+CLOSE_TRY_AGAIN_LATER = 1013
+
+
+class Connection:
+    """One WebSocket with its own bounded send queue and sender task."""
+
+    def __init__(self, hub: "WebSocketHub", user_id: int, websocket):
+        self.hub = hub
+        self.user_id = user_id
+        self.websocket = websocket
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.websocket_send_queue_size)
+        self.closed = False
+        self._sender = asyncio.create_task(self._send_loop())
+
+    def offer(self, text: str) -> bool:
+        """Queue a frame without waiting. A client that falls this far behind is disconnected."""
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait(text)
+            return True
+        except asyncio.QueueFull:
+            logger.warning(f"⚠️ WebSocket send queue full for user {self.user_id}, closing slow connection")
+            self.hub.dropped_connections += 1
+            self.hub.disconnect(self)
+            self.closed = True
+            asyncio.create_task(self._close_socket(CLOSE_TRY_AGAIN_LATER, "Too slow"))
+            return False
+
+    async def _send_loop(self):
+        try:
+            while True:
+                text = await self.queue.get()
+                await asyncio.wait_for(self.websocket.send_text(text), timeout=settings.websocket_send_timeout_seconds)
+                self.hub.frames_sent += 1
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"Error sending WebSocket frame to user {self.user_id}: {e}")
+            await self.close()
+
+    async def close(self, code: int = 1000, reason: str = ""):
+        if self.closed:
+            return
+        self.closed = True
+        self.hub.disconnect(self)
+        await self._close_socket(code, reason)
+
+    async def _close_socket(self, code: int, reason: str):
+        if self._sender is not asyncio.current_task():
+            self._sender.cancel()
+        try:
+            await self.websocket.close(code=code, reason=reason)
+        except Exception:
+            pass
+
+
+class InProcessBackplane:
+    """Pub/sub for a single process: published frames are only delivered locally."""
+
+    async def start(self, hub: "WebSocketHub"):
+        pass
+
+    async def publish(self, message: Dict[str, Any]):
+        pass
+
+    async def stop(self):
+        pass
+
+
+class RedisBackplane:
+    """
+    Pub/sub over Redis (or any server speaking its protocol) so notifications
+    reach users connected to another replica. Each replica delivers its own
+    frames locally and ignores them when they come back from the channel.
+    """
+
+    def __init__(self, url: str, channel: str):
+        import redis.asyncio as redis  # Optional dependency, only needed for PUBSUB_BACKEND=redis
+
+        self.redis = redis.from_url(url)
+        self.channel = channel
+        self._listener: Optional[asyncio.Task] = None
+
+    async def start(self, hub: "WebSocketHub"):
+        self._listener = asyncio.create_task(self._listen(hub))
+
+    async def _listen(self, hub: "WebSocketHub"):
+        delay = 1
+        while True:
+            try:
+                pubsub = self.redis.pubsub()
+                await pubsub.subscribe(self.channel)
+                logger.info(f"📡 Subscribed to notification channel {self.channel}")
+                delay = 1
+                async for item in pubsub.listen():
+                    if item.get("type") != "message":
+                        continue
+                    message = loads(item["data"])
+                    if message.get("origin") != hub.instance_id:
+                        hub.deliver_local(message["user_id"], message["payload"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Notification channel error, resubscribing in {delay}s: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30)
+
+    async def publish(self, message: Dict[str, Any]):
+        await self.redis.publish(self.channel, dumps(message))
+
+    async def stop(self):
+        if self._listener:
+            self._listener.cancel()
+        await self.redis.close()
+
+
+class WebSocketHub:
+    """
+    Fan-out of real-time frames to every socket a user has open.
+
+    A user may have many connections (tabs, devices). Each frame is
+    serialized once and queued on every connection without waiting, so a slow
+    client never blocks the code that published the frame; a connection whose
+    queue overflows is closed and the client reconnects. Frames are also
+    published on the pub/sub backplane (``PUBSUB_BACKEND``) so users connected
+    to other replicas receive them too.
+    """
+
+    def __init__(self):
+        self.instance_id = uuid.uuid4().hex
+        self.connections: Dict[int, Set[Connection]] = defaultdict(set)
+        self.backplane = None
+        self.frames_sent = 0
+        self.dropped_connections = 0
+        self.publish_errors = 0
+
+    def _build_backplane(self):
+        if settings.pubsub_backend == "redis":
+            try:
+                return RedisBackplane(settings.redis_url, settings.pubsub_channel)
+            except ImportError:
+                logger.warning("redis not installed; notifications are only delivered to this process")
+        return InProcessBackplane()
+
+    async def start(self):
+        self.backplane = self._build_backplane()
+        await self.backplane.start(self)
+        logger.info(f"🔌 WebSocket hub started ({type(self.backplane).__name__})")
+
+    async def stop(self):
+        for connection in [c for conns in self.connections.values() for c in conns]:
+            await connection.close(code=1001, reason="Server shutting down")
+        if self.backplane:
+            await self.backplane.stop()
+            self.backplane = None
+
+    # --- Connections -----------------------------------------------------
+
+    def connect(self, user_id: int, websocket) -> Connection:
+        """Register an accepted WebSocket for a user."""
+        connection = Connection(self, user_id, websocket)
+        self.connections[user_id].add(connection)
+        logger.info(f"Added WebSocket connection for user {user_id} ({len(self.connections[user_id])} open)")
+        return connection
+
+    def disconnect(self, connection: Connection):
+        connections = self.connections.get(connection.user_id)
+        if connections is None or connection not in connections:
+            return
+        connections.discard(connection)
+        if not connections:
+            del self.connections[connection.user_id]
+        logger.info(f"Removed WebSocket connection for user {connection.user_id}")
+
+    # --- Sending ---------------------------------------------------------
+
+    def deliver_local(self, user_id: int, text: str) -> int:
+        """Queue a serialized frame on this process's connections for a user."""
+        return sum(connection.offer(text) for connection in list(self.connections.get(user_id, ())))
+
+    async def publish(self, user_id: int, frame: Dict[str, Any]) -> int:
+        """Send a frame to all of a user's connections on every replica. Returns the local deliveries."""
+        text = dumps(frame)
+        delivered = self.deliver_local(user_id, text)
+        if self.backplane is not None:
+            try:
+                await self.backplane.publish({"origin": self.instance_id, "user_id": user_id, "payload": text})
+            except Exception as e:
+                self.publish_errors += 1
+                logger.error(f"Error publishing notification for user {user_id}: {e}")
+        return delivered
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": type(self.backplane).__name__ if self.backplane else None,
+            "users": len(self.connections),
+            "connections": sum(len(conns) for conns in self.connections.values()),
+            "frames_sent": self.frames_sent,
+            "dropped_connections": self.dropped_connections,
+            "publish_errors": self.publish_errors,
+        }
+
+
+# Global WebSocket hub instance
+websocket_hub = WebSocketHub()
@@ -11,6 +11,9 @@ import sys
 import os
 from pathlib import Path
 
+# Revision matching the tables create_tables() used to build; later revisions alter them
+BASELINE_REVISION = "284c357a3e64"
+
 def run_command(command, description):
     """Run a command and handle errors"""
     print(f"\n🔄 {description}...")
@@ -73,9 +76,9 @@ def main():
     if db_state == "no_alembic_version":
         print("ℹ️  Database has tables but Alembic doesn't know about them.")
         print("   This happens when you used create_tables() before setting up Alembic.")
-        print("   Marking current state as up-to-date...")
+        print("   Marking it as the baseline schema, then applying later migrations...")
         
-        if not run_command("python -m alembic stamp head", "Marking current state as up-to-date"):
+        if not run_command(f"python -m alembic stamp {BASELINE_REVISION}", "Marking current state as the baseline schema"):
             print("❌ Failed to stamp database. Exiting.")
             sys.exit(1)
             
@@ -0,0 +1,93 @@
+"""Shared test setup: a throwaway SQLite database migrated with Alembic and a temporary media store."""
+import os
+import sys
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_DIR))
+
+# Settings are read at import time, so the environment is set before any app module is imported
+_tmp_dir = tempfile.mkdtemp(prefix="automation-dash-tests-")
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{_tmp_dir}/test.db",
+    "DB_PASSWORD": "test",
+    "SECRET_KEY": "test-secret",
+    "ALGORITHM": "HS256",
+    "DEBUG": "False",
+    "MEDIA_STORE_PATH": os.path.join(_tmp_dir, "media_store"),
+})
+
+from alembic import command  # noqa: E402
+from alembic.config import Config  # noqa: E402
+
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.models import BulkComposerContent, BulkComposerStatus, SocialAccount, User  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def migrated_database():
+    """Build the schema through the migration chain, as a deployment would."""
+    config = Config()
+    config.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+    config.set_main_option("sqlalchemy.url", os.environ["DATABASE_URL"])
+    command.upgrade(config, "head")
+    yield
+
+
+@pytest.fixture(autouse=True)
+def clean_tables():
+    yield
+    with engine.begin() as connection:
+        for table in reversed(Base.metadata.sorted_tables):
+            connection.execute(table.delete())
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def user(db):
+    user = User(email="owner@example.com", username="owner", hashed_password="x")
+    db.add(user)
+    db.commit()
+    return user
+
+
+@pytest.fixture
+def social_account(db, user):
+    account = SocialAccount(user_id=user.id, platform="facebook", platform_user_id="page-1", access_token="token")
+    db.add(account)
+    db.commit()
+    return account
+
+
+@pytest.fixture
+def bulk_post(db, social_account):
+    """Factory for scheduled bulk composer posts; keyword arguments override the column values."""
+    def make(**overrides):
+        values = dict(
+            user_id=social_account.user_id,
+            social_account_id=social_account.id,
+            caption="Hello",
+            scheduled_date="2026-01-01",
+            scheduled_time="10:00",
+            scheduled_datetime=datetime(2026, 1, 1, 4, 30, tzinfo=timezone.utc),
+            status=BulkComposerStatus.SCHEDULED.value,
+        )
+        values.update(overrides)
+        post = BulkComposerContent(**values)
+        db.add(post)
+        db.commit()
+        return post
+
+    return make
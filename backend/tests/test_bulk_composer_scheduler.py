@@ -0,0 +1,67 @@
+import asyncio
+from collections import Counter
+
+from app.models import BulkComposerContent, BulkComposerStatus, SocialAccount
+from app.services.bulk_composer_scheduler import BulkComposerScheduler
+from app.services.lease_service import lease_service
+
+
+def make_scheduler(max_concurrency=3, per_account_concurrency=2):
+    scheduler = BulkComposerScheduler()
+    scheduler.max_concurrency = max_concurrency
+    scheduler.per_account_concurrency = per_account_concurrency
+    return scheduler
+
+
+def test_worker_pool_caps_global_and_per_account_concurrency(db, user, social_account, bulk_post):
+    other_account = SocialAccount(user_id=user.id, platform="facebook", platform_user_id="page-2", access_token="token")
+    db.add(other_account)
+    db.commit()
+    owned = {"lease_owner": lease_service.instance_id}
+    posts = [bulk_post(**owned) for _ in range(5)] + [bulk_post(social_account_id=other_account.id, **owned) for _ in range(5)]
+
+    scheduler = make_scheduler(max_concurrency=3, per_account_concurrency=2)
+    active = Counter()
+    peaks = Counter()
+
+    async def fake_publish(post, session):
+        account_id = post.social_account_id
+        active["all"] += 1
+        active[account_id] += 1
+        peaks["all"] = max(peaks["all"], active["all"])
+        peaks[account_id] = max(peaks[account_id], active[account_id])
+        await asyncio.sleep(0.02)
+        active["all"] -= 1
+        active[account_id] -= 1
+        post.status = BulkComposerStatus.PUBLISHED.value
+
+    scheduler.publish_post = fake_publish
+    asyncio.run(scheduler.publish_posts_concurrently([(post.id, post.social_account_id) for post in posts]))
+
+    assert peaks["all"] == 3
+    assert peaks[social_account.id] <= 2
+    assert peaks[other_account.id] <= 2
+    db.expire_all()
+    rows = db.query(BulkComposerContent).all()
+    assert {row.status for row in rows} == {BulkComposerStatus.PUBLISHED.value}
+    assert all(row.lease_owner is None for row in rows)
+
+
+def test_worker_skips_posts_it_does_not_own(bulk_post):
+    owned = bulk_post(lease_owner=lease_service.instance_id)
+    taken_over = bulk_post(lease_owner="another-instance")
+    in_flight = bulk_post(lease_owner=lease_service.instance_id)
+
+    scheduler = make_scheduler()
+    scheduler._in_flight.add(in_flight.id)
+    published = []
+
+    async def fake_publish(post, session):
+        published.append(post.id)
+
+    scheduler.publish_post = fake_publish
+    asyncio.run(scheduler.publish_posts_concurrently([
+        (post.id, post.social_account_id) for post in (owned, taken_over, in_flight)
+    ]))
+
+    assert published == [owned.id]
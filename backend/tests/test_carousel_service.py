@@ -0,0 +1,70 @@
+import asyncio
+
+from app.services.carousel_service import CarouselGenerationService
+
+
+def make_service(outcomes, straggler_grace_seconds=0.05):
+    """Service whose image ``index`` sleeps ``delay`` then succeeds or fails, per ``outcomes[index]``."""
+    service = CarouselGenerationService()
+    service.straggler_grace_seconds = straggler_grace_seconds
+    service.cancelled = []
+
+    async def fake_generate_one(prompt, index, post_type):
+        delay, ok = outcomes[index]
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            service.cancelled.append(index)
+            raise
+        if not ok:
+            raise Exception(f"image {index} failed")
+        return {"url": f"https://img/{index}", "width": 1080, "height": 1080}
+
+    service._generate_one = fake_generate_one
+    return service
+
+
+def test_results_keep_prompt_order_and_tolerate_failures_above_the_minimum():
+    service = make_service({0: (0.03, True), 1: (0.01, False), 2: (0.02, True), 3: (0, True)})
+    events = []
+
+    result = asyncio.run(service.generate("sunset", count=4, min_count=3, on_progress=events.append))
+
+    assert result["success"]
+    assert result["image_urls"] == ["https://img/0", "https://img/2", "https://img/3"]
+    assert (result["count"], result["failed"]) == (3, 1)
+    assert len(events) == 4
+    assert events[-1]["succeeded"] == 3 and events[-1]["failed"] == 1
+
+
+def test_stops_early_and_cancels_the_rest_once_the_minimum_is_unreachable():
+    service = make_service({0: (0, False), 1: (0.01, False), 2: (5, True), 3: (5, True)})
+
+    result = asyncio.run(asyncio.wait_for(service.generate("sunset", count=4, min_count=3), timeout=1))
+
+    assert not result["success"]
+    assert "Only 0 of 4" in result["error"]
+    assert sorted(service.cancelled) == [2, 3]
+
+
+def test_stragglers_are_cancelled_after_the_grace_period():
+    service = make_service({0: (0, True), 1: (0, True), 2: (0.01, True), 3: (5, True)})
+
+    result = asyncio.run(asyncio.wait_for(service.generate("sunset", count=4, min_count=3), timeout=1))
+
+    assert result["success"]
+    assert result["image_urls"] == ["https://img/0", "https://img/1", "https://img/2"]
+    assert service.cancelled == [3]
+
+
+def test_min_count_is_capped_at_count_and_async_progress_callbacks_are_awaited():
+    service = make_service({0: (0, True), 1: (0, True)})
+    events = []
+
+    async def on_progress(event):
+        events.append(event["index"])
+
+    result = asyncio.run(service.generate("sunset", count=2, min_count=3, on_progress=on_progress))
+
+    assert result["success"] and result["count"] == 2
+    assert sorted(events) == [0, 1]
@@ -0,0 +1,40 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.config import get_settings
+from app.models.comment_cursor import CommentCursor
+from app.services.comment_cursor_service import comment_cursor_service, parse_graph_timestamp
+
+settings = get_settings()
+NOW = datetime(2026, 6, 1, 12, 0, tzinfo=timezone.utc)
+HOT = timedelta(seconds=settings.comment_sweep_hot_seconds)
+WARM = timedelta(seconds=settings.comment_sweep_warm_seconds)
+COLD = timedelta(seconds=settings.comment_sweep_cold_seconds)
+
+
+@pytest.mark.parametrize("cursor, interval", [
+    # A recent comment makes an old post hot again
+    (CommentCursor(post_created_at=NOW - timedelta(days=365), last_comment_at=NOW - timedelta(hours=1)), HOT),
+    (CommentCursor(post_created_at=NOW - timedelta(days=3)), WARM),
+    # Starting to track an old post is not activity
+    (CommentCursor(post_created_at=NOW - timedelta(days=365), created_at=NOW), COLD),
+    # Without a post time, when we started tracking it stands in
+    (CommentCursor(created_at=NOW - timedelta(hours=2)), HOT),
+    (CommentCursor(), HOT),
+])
+def test_check_interval_follows_post_activity(cursor, interval):
+    assert comment_cursor_service.check_interval(cursor, NOW) == interval
+
+
+def test_advance_moves_past_the_newest_comment():
+    cursor = CommentCursor(post_created_at=datetime.now(timezone.utc) - timedelta(days=365))
+
+    comment_cursor_service.advance(cursor, [
+        {"id": "c1", "created_time": "2026-05-01T10:00:00+0000"},
+        {"id": "c2", "created_time": "2026-05-02T10:00:00+0000"},
+    ], "created_time")
+
+    assert cursor.last_comment_id == "c2"
+    assert cursor.last_comment_at == parse_graph_timestamp("2026-05-02T10:00:00+0000")
+    assert cursor.next_check_at > cursor.last_checked_at
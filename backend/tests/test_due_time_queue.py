@@ -0,0 +1,64 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from app.services.due_time_queue import DueTimeQueue, to_utc
+
+
+def test_to_utc_treats_naive_values_as_utc():
+    naive = datetime(2026, 1, 1, 12, 0)
+    ist = datetime(2026, 1, 1, 17, 30, tzinfo=timezone(timedelta(hours=5, minutes=30)))
+
+    assert to_utc(naive) == datetime(2026, 1, 1, 12, 0, tzinfo=timezone.utc)
+    assert to_utc(ist) == datetime(2026, 1, 1, 12, 0, tzinfo=timezone.utc)
+    assert to_utc(ist).tzinfo == timezone.utc
+
+
+def test_next_due_is_the_earliest_known_time():
+    now = datetime.now(timezone.utc)
+    queue = DueTimeQueue("test")
+    queue.reset([now + timedelta(minutes=5), None, now + timedelta(minutes=1)])
+    queue.notify(now + timedelta(minutes=3))
+
+    assert queue.next_due() == now + timedelta(minutes=1)
+
+    queue.reset([])
+    assert queue.next_due() is None
+
+
+def test_seconds_until_next_is_capped_and_never_negative():
+    now = datetime.now(timezone.utc)
+    queue = DueTimeQueue("test", max_idle_seconds=60)
+
+    assert queue.seconds_until_next() == 60
+
+    queue.reset([now + timedelta(hours=1)])
+    assert queue.seconds_until_next() == 60
+
+    queue.reset([now + timedelta(seconds=30)])
+    assert 0 < queue.seconds_until_next() <= 30
+
+    queue.reset([now - timedelta(minutes=1)])
+    assert queue.seconds_until_next() == 0
+
+
+def test_wait_returns_immediately_when_something_is_overdue():
+    queue = DueTimeQueue("test", max_idle_seconds=60)
+    queue.reset([datetime.now(timezone.utc) - timedelta(seconds=1)])
+
+    asyncio.run(asyncio.wait_for(queue.wait(), timeout=1))
+
+
+def test_notify_wakes_a_waiting_loop():
+    async def scenario():
+        queue = DueTimeQueue("test", max_idle_seconds=60)
+        waiter = asyncio.create_task(queue.wait())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+
+        queue.notify()
+        await asyncio.wait_for(waiter, timeout=1)
+
+        # The wakeup is consumed, so the next wait sleeps again
+        assert not queue._wakeup.is_set()
+
+    asyncio.run(scenario())
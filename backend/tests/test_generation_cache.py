@@ -0,0 +1,108 @@
+import asyncio
+import base64
+from datetime import datetime, timedelta, timezone
+
+from app.models.generation_cache_entry import GenerationCacheEntry
+from app.services.generation_cache import GenerationCache
+from app.services.media_store import media_store
+
+IMAGE_BASE64 = base64.b64encode(b"generated image").decode()
+
+
+def make_cache(max_entries=10, ttl=timedelta(days=1)):
+    cache = GenerationCache()
+    cache.enabled = True
+    cache.max_entries = max_entries
+    cache.ttl = ttl
+    return cache
+
+
+def counting_generator(result=None):
+    calls = []
+
+    async def generate():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return result or {"success": True, "image_base64": IMAGE_BASE64, "seed": 7, "finish_reason": "SUCCESS"}
+
+    return generate, calls
+
+
+def test_key_is_stable_and_covers_every_parameter():
+    key = GenerationCache.key_for("sdxl", prompt="a cat", steps=30, seed=1)
+
+    assert key == GenerationCache.key_for("sdxl", seed=1, steps=30, prompt="a cat")
+    assert key != GenerationCache.key_for("sdxl", prompt="a cat", steps=30, seed=2)
+    assert key != GenerationCache.key_for("sd3", prompt="a cat", steps=30, seed=1)
+    assert len(key) == 64
+
+
+def test_identical_requests_are_generated_once():
+    cache = make_cache()
+    generate, calls = counting_generator()
+    params = {"prompt": "a cat", "steps": 30}
+
+    first = asyncio.run(cache.get_or_generate("sdxl", params, generate))
+    second = asyncio.run(cache.get_or_generate("sdxl", params, generate))
+
+    assert len(calls) == 1
+    assert (first["cached"], second["cached"]) == (False, True)
+    assert second["image_base64"] == IMAGE_BASE64 and second["seed"] == 7
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_concurrent_identical_requests_share_one_generation():
+    cache = make_cache()
+    generate, calls = counting_generator()
+
+    async def scenario():
+        return await asyncio.gather(*[cache.get_or_generate("sdxl", {"prompt": "a dog"}, generate) for _ in range(3)])
+
+    results = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    assert all(result["image_base64"] == IMAGE_BASE64 for result in results)
+
+
+def test_failed_generations_are_not_cached(db):
+    cache = make_cache()
+    generate, calls = counting_generator({"success": False, "error": "rate limited"})
+
+    asyncio.run(cache.get_or_generate("sdxl", {"prompt": "a cat"}, generate))
+    asyncio.run(cache.get_or_generate("sdxl", {"prompt": "a cat"}, generate))
+
+    assert len(calls) == 2
+    assert db.query(GenerationCacheEntry).count() == 0
+
+
+def test_expired_entries_are_regenerated(db):
+    cache = make_cache(ttl=timedelta(seconds=-1))
+    generate, calls = counting_generator()
+
+    asyncio.run(cache.get_or_generate("sdxl", {"prompt": "a cat"}, generate))
+    result = asyncio.run(cache.get_or_generate("sdxl", {"prompt": "a cat"}, generate))
+
+    assert len(calls) == 2
+    assert result["cached"] is False
+
+
+def test_eviction_drops_least_recently_used_entries_beyond_the_limit(db):
+    blob = media_store.put_bytes(db, b"generated image", "image/png")
+    now = datetime.now(timezone.utc)
+    for index in range(4):
+        db.add(GenerationCacheEntry(
+            cache_key=f"key-{index}",
+            engine="sdxl",
+            prompt="a cat",
+            media_sha256=blob.sha256,
+            hit_count=0,
+            last_used_at=now - timedelta(minutes=index),
+        ))
+    db.commit()
+
+    cache = make_cache(max_entries=2)
+    cache._evict(db)
+
+    remaining = sorted(row.cache_key for row in db.query(GenerationCacheEntry.cache_key).all())
+    assert remaining == ["key-0", "key-1"]
+    assert cache.evictions == 2
@@ -0,0 +1,68 @@
+import asyncio
+import io
+
+import pytest
+
+from app.services import bulk_composer_scheduler as scheduler_module
+from app.services.bulk_composer_scheduler import BulkComposerScheduler
+from app.services.image_transform_service import Image, ImageTransformService, is_public_url, transform_image
+
+requires_pillow = pytest.mark.skipif(Image is None, reason="Pillow is not installed")
+
+
+def png_bytes(width, height):
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 40, 40)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("https://api.example.com", True),
+    ("http://localhost:8000", False),
+    ("http://127.0.0.1:8000", False),
+    ("http://[::1]:8000", False),
+    ("http://app.localhost", False),
+    ("not a url", False),
+])
+def test_is_public_url(url, expected):
+    assert is_public_url(url) is expected
+
+
+@requires_pillow
+def test_local_transforms_stay_off_behind_a_loopback_base_url():
+    service = ImageTransformService()
+    service.requested, service.public_base_url = True, False
+    assert not service.supports("image")
+
+    service.public_base_url = True
+    assert service.supports("image")
+    assert not service.supports("video")
+
+
+@requires_pillow
+@pytest.mark.parametrize("preset, size", [("image", (1080, 1080)), ("thumbnail", (1080, 1920))])
+def test_transform_image_fills_the_preset_size(preset, size):
+    output = transform_image(png_bytes(1600, 900), preset, max_bytes=1_000_000)
+
+    with Image.open(io.BytesIO(output)) as image:
+        assert image.format == "JPEG"
+        assert image.size == size
+
+
+def test_publish_reuses_hosted_media_urls(monkeypatch):
+    uploads = []
+
+    async def fake_upload(source):
+        uploads.append(source)
+        return {"success": True, "url": "https://res.cloudinary.com/new.jpg"}
+
+    monkeypatch.setattr(scheduler_module.cloudinary_upload_service, "upload_image", fake_upload)
+    scheduler = BulkComposerScheduler()
+
+    hosted = scheduler_module.BulkComposerContent(media_file="https://res.cloudinary.com/old.jpg")
+    assert asyncio.run(scheduler.resolve_media_url(hosted)) == ("https://res.cloudinary.com/old.jpg", None)
+    assert uploads == []
+
+    stored = scheduler_module.BulkComposerContent(media_sha256="ab" * 32)
+    assert asyncio.run(scheduler.resolve_media_url(stored)) == ("https://res.cloudinary.com/new.jpg", None)
+    assert uploads == [str(scheduler_module.media_store.path_for("ab" * 32))]
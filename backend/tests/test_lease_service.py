@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta, timezone
+
+from app.models import BulkComposerContent, BulkComposerStatus
+from app.services.lease_service import LeaseService
+
+
+def claim(lease_service, db, limit=10):
+    return lease_service.claim_due_rows(
+        db,
+        BulkComposerContent,
+        criteria=[BulkComposerContent.status == BulkComposerStatus.SCHEDULED.value],
+        order_by=BulkComposerContent.scheduled_datetime,
+        limit=limit,
+        lease_seconds=60,
+    )
+
+
+def test_claim_due_rows_leases_matching_rows_in_order(db, bulk_post):
+    later = bulk_post(scheduled_datetime=datetime(2026, 1, 2, tzinfo=timezone.utc))
+    earlier = bulk_post(scheduled_datetime=datetime(2026, 1, 1, tzinfo=timezone.utc))
+    bulk_post(status=BulkComposerStatus.PUBLISHED.value)
+    leases = LeaseService()
+
+    assert claim(leases, db, limit=1) == [earlier.id]
+    assert claim(leases, db) == [later.id]
+    assert claim(leases, db) == []
+
+    db.expire_all()
+    assert db.get(BulkComposerContent, earlier.id).lease_owner == leases.instance_id
+
+
+def test_claim_due_rows_skips_live_leases_and_takes_over_expired_ones(db, bulk_post):
+    now = datetime.now(timezone.utc)
+    held = bulk_post(lease_owner="other", lease_expires_at=now + timedelta(minutes=5))
+    expired = bulk_post(lease_owner="other", lease_expires_at=now - timedelta(minutes=5))
+    leases = LeaseService()
+
+    assert claim(leases, db) == [expired.id]
+
+    db.expire_all()
+    assert db.get(BulkComposerContent, held.id).lease_owner == "other"
+
+
+def test_release_clears_the_lease(db, bulk_post):
+    leases = LeaseService()
+    post = bulk_post()
+    claim(leases, db)
+    db.refresh(post)
+
+    leases.release(post)
+    db.commit()
+
+    assert post.lease_owner is None and post.lease_expires_at is None
+    assert claim(leases, db) == [post.id]
+
+
+def test_leadership_is_exclusive_until_it_expires(db):
+    first, second = LeaseService(), LeaseService()
+
+    assert first.acquire_leadership(db, "scheduler", ttl_seconds=60)
+    assert first.acquire_leadership(db, "scheduler", ttl_seconds=60)
+    assert not second.acquire_leadership(db, "scheduler", ttl_seconds=60)
+    # SQLite cannot skip locked rows, so only the leader runs
+    assert not second.should_run(db, "scheduler", ttl_seconds=60)
+
+    assert first.acquire_leadership(db, "scheduler", ttl_seconds=-1)
+    assert second.acquire_leadership(db, "scheduler", ttl_seconds=60)
+    assert not first.acquire_leadership(db, "scheduler", ttl_seconds=60)
@@ -0,0 +1,38 @@
+import asyncio
+import base64
+import hashlib
+
+from app.models import BulkComposerContent, MediaBlob
+from app.services.bulk_composer_scheduler import BulkComposerScheduler
+from app.services.media_store import media_store
+
+PNG_BYTES = b"\x89PNG\r\n\x1a\n not really an image"
+DATA_URL = "data:image/png;base64," + base64.b64encode(PNG_BYTES).decode()
+
+
+def test_identical_content_is_stored_once(db):
+    first = media_store.put_data_url(db, DATA_URL)
+    second = media_store.put_bytes(db, PNG_BYTES, "image/png")
+
+    assert first.sha256 == second.sha256 == hashlib.sha256(PNG_BYTES).hexdigest()
+    assert db.query(MediaBlob).count() == 1
+    assert media_store.path_for(first.sha256).read_bytes() == PNG_BYTES
+    assert media_store.decode_data_url(DATA_URL) == (PNG_BYTES, "image/png")
+
+
+def test_backfill_moves_inline_media_and_skips_bad_rows(db, bulk_post):
+    inline = bulk_post(media_file=DATA_URL)
+    broken = bulk_post(media_file="data:not-base64")
+    hosted = bulk_post(media_file="https://cdn.example.com/a.png")
+
+    scheduler = BulkComposerScheduler()
+    scheduler.is_running = True
+    moved = asyncio.run(scheduler.backfill_inline_media(batch_size=1))
+
+    assert moved == 1
+    db.expire_all()
+    inline = db.get(BulkComposerContent, inline.id)
+    assert inline.media_file is None
+    assert inline.media_sha256 == hashlib.sha256(PNG_BYTES).hexdigest()
+    assert db.get(BulkComposerContent, broken.id).media_file == "data:not-base64"
+    assert db.get(BulkComposerContent, hosted.id).media_file == "https://cdn.example.com/a.png"
@@ -0,0 +1,85 @@
+import asyncio
+
+from app.models.notification import NotificationPlatform, NotificationType
+from app.services.notification_buffer import NotificationBuffer
+
+
+def make_buffer(write_failures, max_retries=3, max_size=100):
+    """Buffer whose first ``write_failures`` writes raise; records what gets stored and pushed."""
+    buffer = NotificationBuffer()
+    buffer.window_seconds = 0.01
+    buffer.max_size = max_size
+    buffer.max_retries = max_retries
+    buffer.writes = 0
+    buffer.pushed = []
+
+    def fake_write(rows):
+        buffer.writes += 1
+        if buffer.writes <= write_failures:
+            raise ConnectionError("server closed the connection unexpectedly")
+        return rows
+
+    async def fake_push(rows):
+        buffer.pushed.extend(rows)
+
+    buffer._write = fake_write
+    buffer._push = fake_push
+    return buffer
+
+
+def add(buffer, count):
+    for index in range(count):
+        buffer.add(
+            user_id=1,
+            notification_type=NotificationType.SUCCESS,
+            platform=NotificationPlatform.FACEBOOK,
+            message=f"Published {index}",
+        )
+
+
+async def settle(buffer):
+    for _ in range(50):
+        await asyncio.sleep(0.01)
+        if not buffer._pending and (buffer._timer is None or buffer._timer.done()):
+            return
+
+
+def test_failed_writes_are_retried_in_order():
+    buffer = make_buffer(write_failures=2)
+
+    async def scenario():
+        add(buffer, 3)
+        await settle(buffer)
+
+    asyncio.run(scenario())
+
+    assert buffer.writes == 3
+    assert [row["message"] for row in buffer.pushed] == ["Published 0", "Published 1", "Published 2"]
+
+
+def test_rows_are_dropped_after_max_retries():
+    buffer = make_buffer(write_failures=10, max_retries=2)
+
+    async def scenario():
+        add(buffer, 2)
+        await settle(buffer)
+
+    asyncio.run(scenario())
+
+    assert buffer.writes == 3
+    assert buffer.pushed == []
+    assert buffer._pending == []
+
+
+def test_a_full_buffer_flushes_without_waiting_for_the_window():
+    buffer = make_buffer(write_failures=0, max_size=2)
+    buffer.window_seconds = 60
+
+    async def scenario():
+        add(buffer, 2)
+        await asyncio.wait_for(buffer._flush_task, timeout=1)
+        buffer._timer.cancel()
+
+    asyncio.run(scenario())
+
+    assert len(buffer.pushed) == 2
@@ -0,0 +1,78 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models.notification import Notification, NotificationPlatform, NotificationType, NotificationUnreadCount
+from app.services.notification_service import notification_service
+
+
+def add_notifications(db, user, created_times):
+    notifications = []
+    for created_at in created_times:
+        notification = Notification(
+            user_id=user.id,
+            type=NotificationType.SUCCESS,
+            platform=NotificationPlatform.FACEBOOK,
+            message="Published",
+            created_at=created_at,
+        )
+        db.add(notification)
+        notifications.append(notification)
+    db.commit()
+    return notifications
+
+
+def test_cursor_round_trips():
+    notification = Notification(id=uuid.uuid4(), created_at=datetime(2026, 1, 1, 12, 30, 15, 123456, tzinfo=timezone.utc))
+
+    cursor = notification_service.encode_cursor(notification)
+
+    assert notification_service.decode_cursor(cursor) == (notification.created_at, notification.id)
+
+
+@pytest.mark.parametrize("cursor", ["", "not base64!", "bm8tc2VwYXJhdG9y", "MjAyNi0wMS0wMXxub3QtYS11dWlk"])
+def test_malformed_cursors_raise_value_error(cursor):
+    with pytest.raises(ValueError):
+        notification_service.decode_cursor(cursor)
+
+
+def test_keyset_pages_cover_every_notification_once(db, user):
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    # Two notifications share a timestamp, so pages must tie-break on id
+    add_notifications(db, user, [start, start + timedelta(minutes=1), start + timedelta(minutes=1), start + timedelta(minutes=2), start + timedelta(minutes=3)])
+    expected = [n.id for n in asyncio.run(notification_service.get_user_notifications(db, user.id, limit=10))]
+
+    seen = []
+    cursor = None
+    while True:
+        page = asyncio.run(notification_service.get_user_notifications(db, user.id, limit=2, cursor=cursor))
+        if not page:
+            break
+        seen.extend(notification.id for notification in page)
+        cursor = notification_service.encode_cursor(page[-1])
+
+    assert len(expected) == 5
+    assert seen == expected
+
+
+def test_unread_counter_is_counted_once_then_kept_in_step(db, user):
+    add_notifications(db, user, [datetime(2026, 1, 1, tzinfo=timezone.utc)] * 2)
+
+    assert asyncio.run(notification_service.get_unread_count(db, user.id)) == 2
+
+    notification_service.bump_unread_counts(db, {user.id: 1})
+    db.commit()
+    assert asyncio.run(notification_service.get_unread_count(db, user.id)) == 3
+
+
+def test_unread_counter_never_goes_negative(db, user):
+    db.add(NotificationUnreadCount(user_id=user.id, unread_count=1))
+    db.commit()
+
+    notification_service.bump_unread_counts(db, {user.id: -3})
+    db.commit()
+    db.expire_all()
+
+    assert db.get(NotificationUnreadCount, user.id).unread_count == 0
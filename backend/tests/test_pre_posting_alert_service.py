@@ -0,0 +1,134 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models import BulkComposerStatus
+from app.models.pre_posting_alert import PrePostingAlert, PrePostingAlertStatus
+from app.services import notification_service as notification_module
+from app.services.due_time_queue import to_utc
+from app.services.pre_posting_alert_service import ALERT_LEAD_TIME, PrePostingAlertService
+
+
+@pytest.fixture
+def post(bulk_post):
+    return bulk_post(scheduled_datetime=datetime.now(timezone.utc) + timedelta(hours=1))
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    """Notifications "sent" by the service; set ``sent.error`` to make sending fail."""
+    class Sent(list):
+        error = None
+
+    sent = Sent()
+
+    async def fake_create_notification(db, user_id, post_id, **kwargs):
+        if sent.error:
+            raise Exception(sent.error)
+        sent.append(post_id)
+
+    monkeypatch.setattr(notification_module.notification_service, "create_notification", fake_create_notification)
+    return sent
+
+
+def make_service(max_attempts=3):
+    service = PrePostingAlertService()
+    service.is_running = True
+    service.max_attempts = max_attempts
+    service.retry_base_seconds = 15
+    return service
+
+
+def make_due(db, alert):
+    alert.due_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+    db.commit()
+
+
+def test_enqueue_creates_one_alert_and_rearms_it_on_reschedule(db, post):
+    service = make_service()
+
+    assert service.enqueue(db, [post]) == 1
+    alert = db.query(PrePostingAlert).one()
+    assert to_utc(alert.due_at) == to_utc(post.scheduled_datetime) - ALERT_LEAD_TIME
+
+    alert.status = PrePostingAlertStatus.SENT.value
+    post.scheduled_datetime = post.scheduled_datetime + timedelta(hours=1)
+    db.commit()
+    assert service.enqueue(db, [post]) == 1
+
+    alert = db.query(PrePostingAlert).one()
+    assert alert.status == PrePostingAlertStatus.PENDING.value
+    assert to_utc(alert.due_at) == to_utc(post.scheduled_datetime) - ALERT_LEAD_TIME
+
+
+def test_enqueue_ignores_posts_inside_the_lead_time(db, post):
+    post.scheduled_datetime = datetime.now(timezone.utc) + timedelta(minutes=5)
+    db.commit()
+
+    assert make_service().enqueue(db, [post]) == 0
+    assert db.query(PrePostingAlert).count() == 0
+
+
+def test_due_alerts_are_sent_once(db, post, sent):
+    service = make_service()
+    service.enqueue(db, [post])
+    make_due(db, db.query(PrePostingAlert).one())
+
+    asyncio.run(service.send_due_alerts())
+    asyncio.run(service.send_due_alerts())
+
+    assert sent == [post.id]
+    db.expire_all()
+    alert = db.query(PrePostingAlert).one()
+    assert alert.status == PrePostingAlertStatus.SENT.value
+    assert alert.lease_owner is None
+
+
+def test_alerts_for_posts_no_longer_scheduled_are_skipped(db, post, sent):
+    service = make_service()
+    service.enqueue(db, [post])
+    make_due(db, db.query(PrePostingAlert).one())
+    post.status = BulkComposerStatus.PUBLISHED.value
+    db.commit()
+
+    asyncio.run(service.send_due_alerts())
+
+    assert sent == []
+    db.expire_all()
+    assert db.query(PrePostingAlert).one().status == PrePostingAlertStatus.SKIPPED.value
+
+
+def test_failed_alerts_back_off_then_fail_after_max_attempts(db, post, sent):
+    service = make_service(max_attempts=2)
+    service.enqueue(db, [post])
+    make_due(db, db.query(PrePostingAlert).one())
+    sent.error = "socket closed"
+
+    before = datetime.now(timezone.utc)
+    asyncio.run(service.send_due_alerts())
+
+    db.expire_all()
+    alert = db.query(PrePostingAlert).one()
+    assert alert.status == PrePostingAlertStatus.PENDING.value
+    assert alert.attempts == 1 and alert.last_error == "socket closed"
+    assert to_utc(alert.due_at) >= before + timedelta(seconds=15)
+
+    # Not due again until the backoff has passed
+    asyncio.run(service.send_due_alerts())
+    db.expire_all()
+    assert db.query(PrePostingAlert).one().attempts == 1
+
+    make_due(db, alert)
+    asyncio.run(service.send_due_alerts())
+
+    db.expire_all()
+    alert = db.query(PrePostingAlert).one()
+    assert alert.status == PrePostingAlertStatus.FAILED.value
+    assert alert.attempts == 2
+
+
+def test_retry_delay_doubles_per_attempt():
+    service = make_service()
+
+    assert [service._retry_delay(attempts).total_seconds() for attempts in (1, 2, 3)] == [15, 30, 60]
@@ -0,0 +1,119 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+from sqlalchemy.sql import Select
+
+from app.models import BulkComposerContent, BulkComposerStatus
+from app.models.notification import Notification, NotificationPlatform, NotificationType, NotificationUnreadCount
+from app.services import retention_service as retention_module
+from app.services.retention_service import RetentionService
+
+OLD = datetime.now(timezone.utc) - timedelta(days=400)
+NEW = datetime.now(timezone.utc)
+
+
+def make_service(batch_size=2):
+    service = RetentionService()
+    service.batch_size = batch_size
+    service.batch_pause_seconds = 0
+    service.use_partitions = False
+    return service
+
+
+def add_notification(db, user, created_at, is_read=True):
+    db.add(Notification(
+        user_id=user.id,
+        type=NotificationType.SUCCESS,
+        platform=NotificationPlatform.FACEBOOK,
+        message="Published",
+        created_at=created_at,
+        is_read=is_read,
+    ))
+
+
+def test_purge_deletes_expired_rows_in_batches(db, user, monkeypatch):
+    for _ in range(5):
+        add_notification(db, user, OLD)
+    add_notification(db, user, NEW)
+    db.commit()
+    service = make_service(batch_size=2)
+    batches = []
+    delete_batch = service._delete_batch
+
+    def recording_delete_batch(policy, cutoff):
+        batches.append(delete_batch(policy, cutoff))
+        return batches[-1]
+
+    monkeypatch.setattr(service, "_delete_batch", recording_delete_batch)
+
+    purged = asyncio.run(service.purge("notifications", ttl=timedelta(days=30)))
+
+    assert purged == 5
+    assert batches == [2, 2, 1]
+    assert db.query(Notification).count() == 1
+    assert service.stats()["notifications"]["rows_purged"] == 5
+
+
+def test_purging_unread_notifications_invalidates_unread_counters(db, user):
+    add_notification(db, user, OLD, is_read=False)
+    db.add(NotificationUnreadCount(user_id=user.id, unread_count=1))
+    db.commit()
+
+    asyncio.run(make_service().purge("notifications", ttl=timedelta(days=30)))
+
+    assert db.get(NotificationUnreadCount, user.id) is None
+
+
+def test_policy_criteria_limit_what_is_purged(db, bulk_post):
+    for status in (BulkComposerStatus.FAILED, BulkComposerStatus.PUBLISHED):
+        bulk_post(status=status.value, scheduled_datetime=OLD, created_at=OLD)
+
+    purged = asyncio.run(make_service().purge("failed_bulk_posts", ttl=timedelta(days=30)))
+
+    assert purged == 1
+    assert [row.status for row in db.query(BulkComposerContent).all()] == [BulkComposerStatus.PUBLISHED.value]
+
+
+def test_stop_ends_a_purge_between_batches(db, user):
+    for _ in range(3):
+        add_notification(db, user, OLD)
+    db.commit()
+    service = make_service(batch_size=1)
+    service.stop()
+
+    assert asyncio.run(service.purge("notifications", ttl=timedelta(days=30))) == 0
+    assert db.query(Notification).count() == 3
+
+
+def test_expired_partitions_are_dropped_after_before_delete(monkeypatch):
+    statements = []
+    session = MagicMock()
+    session.get_bind.return_value.dialect.name = "postgresql"
+
+    def execute(statement, params=None):
+        sql = str(statement)
+        statements.append(sql)
+        result = MagicMock()
+        if "pg_inherits" in sql:
+            result.scalars.return_value.all.return_value = [
+                "notifications_p200001", f"notifications_p{NEW:%Y%m}", "notifications_default"
+            ]
+        return result
+
+    session.execute.side_effect = execute
+    monkeypatch.setattr(retention_module, "SessionLocal", lambda: session)
+    service = make_service()
+    policy = service.policies["notifications"]
+    doomed = []
+    monkeypatch.setattr(policy, "before_delete", lambda db, ids: doomed.append(ids))
+
+    dropped = service._manage_partitions(policy, NEW - timedelta(days=30))
+
+    assert dropped == 1
+    assert len(doomed) == 1 and isinstance(doomed[0], Select)
+    assert "FROM notifications_p200001" in str(doomed[0])
+    assert 'DROP TABLE "notifications_p200001"' in statements
+    assert not any(f"DROP TABLE \"notifications_p{NEW:%Y%m}\"" in sql for sql in statements)
+    assert any(f'CREATE TABLE IF NOT EXISTS "notifications_p{NEW:%Y%m}"' in sql for sql in statements)
+    session.commit.assert_called_once()
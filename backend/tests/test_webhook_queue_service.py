@@ -0,0 +1,147 @@
+import asyncio
+import hashlib
+import hmac
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import webhook as webhook_module
+from app.models.webhook_event import WebhookEvent, WebhookEventStatus
+from app.services.due_time_queue import to_utc
+from app.services.lease_service import lease_service
+from app.services.webhook_queue_service import WebhookQueueService
+
+APP_SECRET = "app-secret"
+
+
+def comment_delivery(*comment_ids):
+    return {
+        "object": "instagram",
+        "entry": [{
+            "id": "ig-account",
+            "time": 1767225600,
+            "changes": [
+                {"field": "comments", "value": {"id": comment_id, "text": "Nice post!"}}
+                for comment_id in comment_ids
+            ],
+        }],
+    }
+
+
+def sign(body: bytes, secret: str = APP_SECRET) -> str:
+    return "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(webhook_module.settings, "facebook_app_secret", APP_SECRET)
+    monkeypatch.setattr(webhook_module.settings, "instagram_app_secret", None)
+    app = FastAPI()
+    app.include_router(webhook_module.router, prefix="/api")
+    return TestClient(app)
+
+
+def post_webhook(client, body: bytes, signature=None):
+    headers = {"Content-Type": "application/json"}
+    if signature is not None:
+        headers["X-Hub-Signature-256"] = signature
+    return client.post("/api/webhook/instagram", content=body, headers=headers)
+
+
+def test_valid_signature_is_accepted_and_queued(client, db):
+    body = json.dumps(comment_delivery("c-1")).encode()
+
+    response = post_webhook(client, body, sign(body))
+
+    assert response.status_code == 200
+    assert response.json() == {"status": "queued", "queued": 1}
+    assert [event.dedup_key for event in db.query(WebhookEvent).all()] == ["instagram:comment:c-1"]
+
+
+def test_tampered_signature_is_rejected(client, db):
+    body = json.dumps(comment_delivery("c-1")).encode()
+    signature = sign(body)
+    tampered = json.dumps(comment_delivery("c-2")).encode()
+
+    assert post_webhook(client, tampered, signature).status_code == 403
+    assert post_webhook(client, body, sign(body, "wrong-secret")).status_code == 403
+    assert db.query(WebhookEvent).count() == 0
+
+
+def test_missing_signature_is_rejected(client, db):
+    body = json.dumps(comment_delivery("c-1")).encode()
+
+    assert post_webhook(client, body).status_code == 403
+    assert db.query(WebhookEvent).count() == 0
+
+
+def test_invalid_json_is_rejected(client):
+    body = b"{not json"
+
+    assert post_webhook(client, body, sign(body)).status_code == 400
+
+
+def test_redelivered_comments_are_stored_once(client, db):
+    body = json.dumps(comment_delivery("c-1")).encode()
+
+    assert post_webhook(client, body, sign(body)).json()["queued"] == 1
+    assert post_webhook(client, body, sign(body)).json()["queued"] == 0
+    assert db.query(WebhookEvent).count() == 1
+
+
+def test_deliveries_are_split_per_comment():
+    events = WebhookQueueService().split_events(comment_delivery("c-1", "c-2"))
+
+    assert [(event_type, key) for event_type, key, _ in events] == [
+        ("comment", "instagram:comment:c-1"),
+        ("comment", "instagram:comment:c-2"),
+    ]
+    # Each payload keeps the delivery shape with only its own change
+    assert [len(payload["entry"][0]["changes"]) for _, _, payload in events] == [1, 1]
+
+
+def claim_all(db):
+    return lease_service.claim_due_rows(
+        db,
+        WebhookEvent,
+        criteria=[
+            WebhookEvent.status == WebhookEventStatus.PENDING.value,
+            WebhookEvent.next_attempt_at <= datetime.now(timezone.utc),
+        ],
+        order_by=WebhookEvent.next_attempt_at,
+        limit=10,
+        lease_seconds=60,
+    )
+
+
+def test_handler_errors_are_requeued_with_backoff(db):
+    service = WebhookQueueService()
+    service.retry_base_seconds = 30
+    service.max_attempts = 3
+    calls = []
+
+    async def failing_handler(payload):
+        calls.append(payload)
+        return {"status": "error", "detail": "Graph API timeout"}
+
+    service.handlers["comment"] = failing_handler
+    service.enqueue(db, comment_delivery("c-1"))
+    [event_id] = claim_all(db)
+
+    before = datetime.now(timezone.utc)
+    asyncio.run(service.process_event(event_id))
+
+    db.expire_all()
+    event = db.get(WebhookEvent, event_id)
+    assert len(calls) == 1
+    assert event.status == WebhookEventStatus.PENDING.value
+    assert event.attempts == 1
+    assert event.last_error == "Graph API timeout"
+    assert event.lease_owner is None
+    assert to_utc(event.next_attempt_at) >= before + timedelta(seconds=30)
+    # Not due again until the backoff has passed
+    assert claim_all(db) == []
+    assert service._retry_delay(2) == timedelta(seconds=60)
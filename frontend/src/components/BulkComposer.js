@@ -1904,7 +1904,13 @@ function BulkComposer({ selectedPage, onClose, availablePages, onPageChange }) {
                                     <span className="schedule-time">{post.scheduled_time}</span>
                                   </div>
                                   <div className="grid-cell media-cell">
-                                    {post.media_file ? (
+                                    {post.media_content_type && post.media_content_type.startsWith('image/') ? (
+                                      <a href={post.media_url} target="_blank" rel="noopener noreferrer">
+                                        <img src={post.thumbnail_url} alt="Media" loading="lazy" style={{ maxWidth: 60, maxHeight: 60, borderRadius: 6, border: '1px solid #eee' }} />
+                                      </a>
+                                    ) : post.media_content_type && post.media_content_type.startsWith('video/') ? (
+                                      <video src={post.media_url} preload="metadata" controls style={{ maxWidth: 80, maxHeight: 60, borderRadius: 6, border: '1px solid #eee' }} />
+                                    ) : post.media_file ? (
                                       post.media_file.startsWith('data:image') || post.media_file.match(/\.(jpg|jpeg|png|gif|webp)$/i) ? (
                                         <img src={post.media_file} alt="Media" style={{ maxWidth: 60, maxHeight: 60, borderRadius: 6, border: '1px solid #eee' }} />
                                       ) : post.media_file.startsWith('data:video') || post.media_file.match(/\.(mp4|webm|ogg)$/i) ? (
@@ -206,6 +206,19 @@ export const NotificationProvider = ({ children }) => {
     }
   }, []);
 
+  // Load notifications from backend
+  const loadNotifications = useCallback(async () => {
+    try {
+      const response = await apiClient.getNotifications();
+      if (response.success) {
+        setNotifications(response.data);
+        setUnreadCount(response.unread_count);
+      }
+    } catch (error) {
+      console.error('Failed to load notifications:', error);
+    }
+  }, []);
+
   // Setup WebSocket connection for real-time notifications
   const setupWebSocket = useCallback(() => {
     if (websocket) return;
@@ -226,6 +239,19 @@ export const NotificationProvider = ({ children }) => {
         const data = JSON.parse(event.data);
         if (data.type === 'notification') {
           addNotification(data.notification);
+        } else if (data.type === 'notification_batch') {
+          // Several notifications were stored at once: reload them and show one summary
+          loadNotifications();
+          const type = data.counts.failure ? 'failure' : 'success';
+          if (permissions.granted && shouldShowBrowserNotification(type)) {
+            showBrowserNotification({
+              id: `batch-${Date.now()}`,
+              type,
+              platform: data.platform,
+              strategyName: 'Scheduled Posts',
+              message: data.message
+            });
+          }
         }
       } catch (error) {
         console.error('Error parsing WebSocket message:', error);
@@ -242,7 +268,7 @@ export const NotificationProvider = ({ children }) => {
     ws.onerror = (error) => {
       console.error('WebSocket error:', error);
     };
-  }, [websocket, addNotification]);
+  }, [websocket, addNotification, loadNotifications, permissions, shouldShowBrowserNotification, showBrowserNotification]);
 
   // Cleanup WebSocket on unmount
   useEffect(() => {
@@ -253,19 +279,6 @@ export const NotificationProvider = ({ children }) => {
     };
   }, [websocket]);
 
-  // Load notifications from backend
-  const loadNotifications = useCallback(async () => {
-    try {
-      const response = await apiClient.getNotifications();
-      if (response.success) {
-        setNotifications(response.data);
-        setUnreadCount(response.data.filter(n => !n.isRead).length);
-      }
-    } catch (error) {
-      console.error('Failed to load notifications:', error);
-    }
-  }, []);
-
   // Initialize notifications and WebSocket when user is authenticated
   useEffect(() => {
     const token = localStorage.getItem('authToken');
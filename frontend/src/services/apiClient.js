@@ -912,14 +912,20 @@ class ApiClient {
   }
 
   // Notification endpoints
-  async getNotifications(limit = 50, offset = 0) {
+  async getNotifications(limit = 50, cursor = null) {
     const params = new URLSearchParams();
     params.append('limit', limit.toString());
-    params.append('offset', offset.toString());
+    if (cursor) {
+      params.append('cursor', cursor);
+    }
     
     return this.request(`/notifications?${params.toString()}`);
   }
 
+  async getUnreadNotificationCount() {
+    return this.request('/notifications/unread-count');
+  }
+
   async markNotificationRead(notificationId) {
     return this.request(`/notifications/${notificationId}/mark-read`, {
       method: 'POST',